@@ -0,0 +1,30 @@
+"""Load priceanalyzer modules without Home Assistant."""
+
+from __future__ import annotations
+
+import importlib
+import sys
+import types
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from types import ModuleType
+
+PACKAGE = "priceanalyzer"
+PACKAGE_PATH = Path(__file__).parent.parent / "custom_components" / PACKAGE
+
+
+def load(name: str) -> ModuleType:
+    """
+    Import a submodule of the integration.
+
+    The package __init__ sets up Home Assistant platforms, so an empty package
+    module is registered instead and only the pure computation modules are
+    imported from it.
+    """
+    if PACKAGE not in sys.modules:
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [str(PACKAGE_PATH)]
+        sys.modules[PACKAGE] = package
+    return importlib.import_module(f"{PACKAGE}.{name}")
@@ -0,0 +1,138 @@
+"""
+Micro-benchmark of the per-refresh cost before and after the timestamp index.
+
+Run from the repository root:
+
+    python benchmarks/bench_refresh.py
+
+"legacy" is the original dict based sensor: calculate_day parsed ISO strings
+and called datetime.now() for every hour, and one state write ran it four
+times for today and once for tomorrow. "ingest" is the work now done once per
+price change and source (PriceSeries, analysis and the heating schedule of an
+entry left at its defaults), "write" the first state write after it, which
+builds the attribute rows from that schedule with integer date checks, and
+"cached" every later write until the data or the day changes.
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from _loader import load
+from fixtures import LONG_DAY, NORMAL_DAY, nordpool_attributes
+
+attributes_module = load("attributes")
+computation = load("computation")
+series_module = load("series")
+ATTRIBUTE_MODE_FULL = load("const").ATTRIBUTE_MODE_FULL
+REASONS = attributes_module.REASONS
+# The options of an entry left at its defaults.
+PROFILE = computation.Profile()
+
+
+def legacy_state_write(attributes: dict) -> tuple[list, list]:
+    """Return today and tomorrow the way one state write used to build them."""
+    raw_today = attributes["raw_today"]
+    raw_tomorrow = attributes["raw_tomorrow"]
+
+    def get_hour(hour: int) -> dict | None:
+        if 0 <= hour < len(raw_today):
+            return raw_today[hour]
+        if 0 <= hour - len(raw_today) < len(raw_tomorrow):
+            return raw_tomorrow[hour - len(raw_today)]
+        return None
+
+    def correction(time: int) -> int:
+        hour, following = get_hour(time), get_hour(time + 1)
+        if following is None:
+            return 0
+        if hour["value"] < following["value"]:
+            return 1
+        if hour["value"] > following["value"]:
+            return -1
+        return 0
+
+    def calculate_day(raw: list) -> list:
+        calculated = []
+        for time, hour in enumerate(raw):
+            start_time = datetime.fromisoformat(hour["start"])
+            today = datetime.now().date()  # noqa: DTZ005
+            following = get_hour(time + 1)
+            calculated.append(
+                {
+                    "start": hour["start"],
+                    "end": hour["end"],
+                    "temp": correction(time),
+                    "reason": REASONS[correction(time)],
+                    "value": hour["value"],
+                    "price_next_hour": following["value"] if following else None,
+                    "is_tomorrow": start_time.date() != today,
+                }
+            )
+        return calculated
+
+    # native_value read current_hour twice, extra_state_attributes read
+    # current_hour, today and tomorrow; each rebuilt the day from scratch.
+    for _ in range(3):
+        calculate_day(raw_today)
+    return calculate_day(raw_today), calculate_day(raw_tomorrow)
+
+
+def ingest(attributes: dict) -> Any:
+    """Return the computation a refresh builds once per price change."""
+    return computation.compute(attributes, profiles=(PROFILE,))
+
+
+def state_write(result: Any) -> tuple:
+    """Return today and tomorrow the way PriceAnalyzerSensor builds them."""
+    today = series_module.local_day(datetime.now().astimezone())
+    priced = result.priced(PROFILE.tariff)
+    return attributes_module.build_days(
+        priced.series, priced.plan(PROFILE.heating), today, ATTRIBUTE_MODE_FULL
+    )
+
+
+def cached_write(cache: dict, key: tuple) -> tuple[list, list]:
+    """Return the rows of a write that hits the per-entity cache."""
+    return cache[key]
+
+
+def measure(function: object) -> float:
+    """Return the best time per call in seconds."""
+    timer = timeit.Timer(function)
+    loops, _ = timer.autorange()
+    return min(timer.repeat(5, loops)) / loops
+
+
+def main() -> None:
+    """Print the per-refresh cost of both implementations."""
+    cases = {
+        "24 slots/day": nordpool_attributes(NORMAL_DAY, 3600),
+        "96 slots/day": nordpool_attributes(NORMAL_DAY, 900),
+        "DST 25h day": nordpool_attributes(LONG_DAY, 3600),
+    }
+    header = ("case", "legacy", "ingest", "write", "cached")
+    print("{:<14}{:>12}{:>12}{:>12}{:>12}".format(*header))  # noqa: T201
+    for name, attributes in cases.items():
+        result = ingest(attributes)
+        key = (id(result), 0)
+        cache = {key: state_write(result)}
+        timings = (
+            measure(lambda attributes=attributes: legacy_state_write(attributes)),
+            measure(lambda attributes=attributes: ingest(attributes)),
+            measure(lambda result=result: state_write(result)),
+            measure(lambda cache=cache, key=key: cached_write(cache, key)),
+        )
+        print(  # noqa: T201
+            f"{name:<14}" + "".join(f"{timing * 1e6:>10.1f}us" for timing in timings)
+        )
+
+
+if __name__ == "__main__":
+    main()
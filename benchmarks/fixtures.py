@@ -0,0 +1,413 @@
+"""Generated Nordpool fixtures for the benchmarks."""
+
+from __future__ import annotations
+
+import copy
+import math
+import random
+from datetime import UTC, date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+TIME_ZONE = ZoneInfo("Europe/Oslo")
+
+# A normal day, the 25 hour autumn day and the 23 hour spring day.
+NORMAL_DAY = date(2024, 10, 17)
+LONG_DAY = date(2024, 10, 27)
+SHORT_DAY = date(2024, 3, 31)
+
+
+def nordpool_day(
+    day: date, resolution: int = 3600, seed: int | None = None
+) -> list[dict]:
+    """Return one day of prices in the Nordpool raw_today format."""
+    generator = random.Random(seed if seed is not None else day.toordinal())  # noqa: S311
+    start = datetime(day.year, day.month, day.day, tzinfo=TIME_ZONE).astimezone(UTC)
+    stop = datetime.combine(day + timedelta(days=1), datetime.min.time(), TIME_ZONE)
+    step = timedelta(seconds=resolution)
+    slots = []
+    while start < stop:
+        local = start.astimezone(TIME_ZONE)
+        # A morning and an evening peak with some noise on top.
+        hour = local.hour + local.minute / 60
+        base = 0.2 + 0.08 * math.sin((hour - 6) / 24 * 2 * math.pi) ** 2
+        slots.append(
+            {
+                "start": local.isoformat(),
+                "end": (start + step).astimezone(TIME_ZONE).isoformat(),
+                "value": round(base + generator.uniform(-0.05, 0.05), 3),
+            }
+        )
+        start += step
+    return slots
+
+
+def nordpool_attributes(
+    day: date = NORMAL_DAY, resolution: int = 3600, *, tomorrow: bool = True
+) -> dict:
+    """Return Nordpool state attributes for a day and, optionally, the next."""
+    raw_today = nordpool_day(day, resolution)
+    raw_tomorrow = nordpool_day(day + timedelta(days=1), resolution) if tomorrow else []
+    return {
+        "raw_today": raw_today,
+        "raw_tomorrow": raw_tomorrow,
+        "current_price": raw_today[0]["value"],
+        "unit_of_measurement": "NOK/kWh",
+        "friendly_name": "nordpool",
+    }
+
+
+def season(
+    first: date = NORMAL_DAY, days: int = 30, resolution: int = 3600
+) -> dict[date, list[dict]]:
+    """Return the prices of consecutive days by day, for replay.day_ahead()."""
+    return {
+        day: nordpool_day(day, resolution)
+        for day in (first + timedelta(days=offset) for offset in range(days))
+    }
+
+
+def snapshot(attributes: dict) -> dict:
+    """Return a Nordpool state snapshot as the API client hands it over."""
+    return {
+        "entity_id": "sensor.nordpool_kwh_no3_nok",
+        "state": str(attributes["current_price"]),
+        "attributes": attributes,
+    }
+
+
+# Nordpool attributes recorded for NO3 on 2024-10-16, with the state value.
+RECORDED_NO3 = {
+    "state": 0.24,
+    "state_class": "total",
+    "average": 0.20145833333333332,
+    "off_peak_1": 0.16025,
+    "off_peak_2": 0.1795,
+    "peak": 0.23625,
+    "min": 0.067,
+    "max": 0.296,
+    "mean": 0.2045,
+    "unit": "kWh",
+    "currency": "NOK",
+    "country": "Norway",
+    "region": "NO3",
+    "low_price": False,
+    "price_percent_to_average": 1.211168562564633,
+    "today": [
+        0.162,
+        0.136,
+        0.078,
+        0.067,
+        0.149,
+        0.157,
+        0.249,
+        0.284,
+        0.294,
+        0.296,
+        0.287,
+        0.209,
+        0.203,
+        0.203,
+        0.206,
+        0.207,
+        0.244,
+        0.239,
+        0.237,
+        0.21,
+        0.198,
+        0.192,
+        0.177,
+        0.151,
+    ],
+    "tomorrow": [
+        0.175,
+        0.168,
+        0.167,
+        0.15,
+        0.15,
+        0.164,
+        0.175,
+        0.195,
+        0.198,
+        0.199,
+        0.201,
+        0.199,
+        0.181,
+        0.17,
+        0.168,
+        0.163,
+        0.163,
+        0.167,
+        0.162,
+        0.165,
+        0.166,
+        0.165,
+        0.17,
+        0.15,
+    ],
+    "tomorrow_valid": True,
+    "raw_today": [
+        {
+            "start": "2024-10-16T00:00:00+02:00",
+            "end": "2024-10-16T01:00:00+02:00",
+            "value": 0.162,
+        },
+        {
+            "start": "2024-10-16T01:00:00+02:00",
+            "end": "2024-10-16T02:00:00+02:00",
+            "value": 0.136,
+        },
+        {
+            "start": "2024-10-16T02:00:00+02:00",
+            "end": "2024-10-16T03:00:00+02:00",
+            "value": 0.078,
+        },
+        {
+            "start": "2024-10-16T03:00:00+02:00",
+            "end": "2024-10-16T04:00:00+02:00",
+            "value": 0.067,
+        },
+        {
+            "start": "2024-10-16T04:00:00+02:00",
+            "end": "2024-10-16T05:00:00+02:00",
+            "value": 0.149,
+        },
+        {
+            "start": "2024-10-16T05:00:00+02:00",
+            "end": "2024-10-16T06:00:00+02:00",
+            "value": 0.157,
+        },
+        {
+            "start": "2024-10-16T06:00:00+02:00",
+            "end": "2024-10-16T07:00:00+02:00",
+            "value": 0.249,
+        },
+        {
+            "start": "2024-10-16T07:00:00+02:00",
+            "end": "2024-10-16T08:00:00+02:00",
+            "value": 0.284,
+        },
+        {
+            "start": "2024-10-16T08:00:00+02:00",
+            "end": "2024-10-16T09:00:00+02:00",
+            "value": 0.294,
+        },
+        {
+            "start": "2024-10-16T09:00:00+02:00",
+            "end": "2024-10-16T10:00:00+02:00",
+            "value": 0.296,
+        },
+        {
+            "start": "2024-10-16T10:00:00+02:00",
+            "end": "2024-10-16T11:00:00+02:00",
+            "value": 0.287,
+        },
+        {
+            "start": "2024-10-16T11:00:00+02:00",
+            "end": "2024-10-16T12:00:00+02:00",
+            "value": 0.209,
+        },
+        {
+            "start": "2024-10-16T12:00:00+02:00",
+            "end": "2024-10-16T13:00:00+02:00",
+            "value": 0.203,
+        },
+        {
+            "start": "2024-10-16T13:00:00+02:00",
+            "end": "2024-10-16T14:00:00+02:00",
+            "value": 0.203,
+        },
+        {
+            "start": "2024-10-16T14:00:00+02:00",
+            "end": "2024-10-16T15:00:00+02:00",
+            "value": 0.206,
+        },
+        {
+            "start": "2024-10-16T15:00:00+02:00",
+            "end": "2024-10-16T16:00:00+02:00",
+            "value": 0.207,
+        },
+        {
+            "start": "2024-10-16T16:00:00+02:00",
+            "end": "2024-10-16T17:00:00+02:00",
+            "value": 0.244,
+        },
+        {
+            "start": "2024-10-16T17:00:00+02:00",
+            "end": "2024-10-16T18:00:00+02:00",
+            "value": 0.239,
+        },
+        {
+            "start": "2024-10-16T18:00:00+02:00",
+            "end": "2024-10-16T19:00:00+02:00",
+            "value": 0.237,
+        },
+        {
+            "start": "2024-10-16T19:00:00+02:00",
+            "end": "2024-10-16T20:00:00+02:00",
+            "value": 0.21,
+        },
+        {
+            "start": "2024-10-16T20:00:00+02:00",
+            "end": "2024-10-16T21:00:00+02:00",
+            "value": 0.198,
+        },
+        {
+            "start": "2024-10-16T21:00:00+02:00",
+            "end": "2024-10-16T22:00:00+02:00",
+            "value": 0.192,
+        },
+        {
+            "start": "2024-10-16T22:00:00+02:00",
+            "end": "2024-10-16T23:00:00+02:00",
+            "value": 0.177,
+        },
+        {
+            "start": "2024-10-16T23:00:00+02:00",
+            "end": "2024-10-17T00:00:00+02:00",
+            "value": 0.151,
+        },
+    ],
+    "raw_tomorrow": [
+        {
+            "start": "2024-10-17T00:00:00+02:00",
+            "end": "2024-10-17T01:00:00+02:00",
+            "value": 0.175,
+        },
+        {
+            "start": "2024-10-17T01:00:00+02:00",
+            "end": "2024-10-17T02:00:00+02:00",
+            "value": 0.168,
+        },
+        {
+            "start": "2024-10-17T02:00:00+02:00",
+            "end": "2024-10-17T03:00:00+02:00",
+            "value": 0.167,
+        },
+        {
+            "start": "2024-10-17T03:00:00+02:00",
+            "end": "2024-10-17T04:00:00+02:00",
+            "value": 0.15,
+        },
+        {
+            "start": "2024-10-17T04:00:00+02:00",
+            "end": "2024-10-17T05:00:00+02:00",
+            "value": 0.15,
+        },
+        {
+            "start": "2024-10-17T05:00:00+02:00",
+            "end": "2024-10-17T06:00:00+02:00",
+            "value": 0.164,
+        },
+        {
+            "start": "2024-10-17T06:00:00+02:00",
+            "end": "2024-10-17T07:00:00+02:00",
+            "value": 0.175,
+        },
+        {
+            "start": "2024-10-17T07:00:00+02:00",
+            "end": "2024-10-17T08:00:00+02:00",
+            "value": 0.195,
+        },
+        {
+            "start": "2024-10-17T08:00:00+02:00",
+            "end": "2024-10-17T09:00:00+02:00",
+            "value": 0.198,
+        },
+        {
+            "start": "2024-10-17T09:00:00+02:00",
+            "end": "2024-10-17T10:00:00+02:00",
+            "value": 0.199,
+        },
+        {
+            "start": "2024-10-17T10:00:00+02:00",
+            "end": "2024-10-17T11:00:00+02:00",
+            "value": 0.201,
+        },
+        {
+            "start": "2024-10-17T11:00:00+02:00",
+            "end": "2024-10-17T12:00:00+02:00",
+            "value": 0.199,
+        },
+        {
+            "start": "2024-10-17T12:00:00+02:00",
+            "end": "2024-10-17T13:00:00+02:00",
+            "value": 0.181,
+        },
+        {
+            "start": "2024-10-17T13:00:00+02:00",
+            "end": "2024-10-17T14:00:00+02:00",
+            "value": 0.17,
+        },
+        {
+            "start": "2024-10-17T14:00:00+02:00",
+            "end": "2024-10-17T15:00:00+02:00",
+            "value": 0.168,
+        },
+        {
+            "start": "2024-10-17T15:00:00+02:00",
+            "end": "2024-10-17T16:00:00+02:00",
+            "value": 0.163,
+        },
+        {
+            "start": "2024-10-17T16:00:00+02:00",
+            "end": "2024-10-17T17:00:00+02:00",
+            "value": 0.163,
+        },
+        {
+            "start": "2024-10-17T17:00:00+02:00",
+            "end": "2024-10-17T18:00:00+02:00",
+            "value": 0.167,
+        },
+        {
+            "start": "2024-10-17T18:00:00+02:00",
+            "end": "2024-10-17T19:00:00+02:00",
+            "value": 0.162,
+        },
+        {
+            "start": "2024-10-17T19:00:00+02:00",
+            "end": "2024-10-17T20:00:00+02:00",
+            "value": 0.165,
+        },
+        {
+            "start": "2024-10-17T20:00:00+02:00",
+            "end": "2024-10-17T21:00:00+02:00",
+            "value": 0.166,
+        },
+        {
+            "start": "2024-10-17T21:00:00+02:00",
+            "end": "2024-10-17T22:00:00+02:00",
+            "value": 0.165,
+        },
+        {
+            "start": "2024-10-17T22:00:00+02:00",
+            "end": "2024-10-17T23:00:00+02:00",
+            "value": 0.17,
+        },
+        {
+            "start": "2024-10-17T23:00:00+02:00",
+            "end": "2024-10-18T00:00:00+02:00",
+            "value": 0.15,
+        },
+    ],
+    "current_price": 0.244,
+    "additional_costs_current_hour": 0.0,
+    "price_in_cents": False,
+    "unit_of_measurement": "NOK/kWh",
+    "device_class": "monetary",
+    "icon": "mdi:flash",
+    "friendly_name": "nordpool",
+}
+
+
+# Named fixtures: hourly and 15 minute days, two-day horizons, DST days and
+# a recorded Nordpool state.
+FIXTURES = {
+    "24": lambda: nordpool_attributes(NORMAL_DAY, 3600, tomorrow=False),
+    "48": lambda: nordpool_attributes(NORMAL_DAY, 3600),
+    "96": lambda: nordpool_attributes(NORMAL_DAY, 900, tomorrow=False),
+    "192": lambda: nordpool_attributes(NORMAL_DAY, 900),
+    "dst-23h": lambda: nordpool_attributes(SHORT_DAY, 3600, tomorrow=False),
+    "dst-25h": lambda: nordpool_attributes(LONG_DAY, 3600, tomorrow=False),
+    "dst-100": lambda: nordpool_attributes(LONG_DAY, 900, tomorrow=False),
+    "recorded": lambda: copy.deepcopy(RECORDED_NO3),
+}
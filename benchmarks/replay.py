@@ -0,0 +1,116 @@
+"""
+Replay recorded Nordpool prices through priceanalyzer on a virtual clock.
+
+Runs without a Home Assistant instance and without network access:
+
+    python benchmarks/replay.py dump.jsonl              # one state per line
+    python benchmarks/replay.py no3_3600.bin            # a price history file
+    python benchmarks/replay.py dump.jsonl --json       # the report as JSON
+    python benchmarks/replay.py dump.jsonl --options '{"vat": 25}'
+
+A JSONL dump holds one Nordpool state per line, as Home Assistant exports
+it; a history file (.bin) is rebuilt into the snapshots a Nordpool entity
+shows, with the next day's prices from 13:00. The report lists the
+decisions and estimated savings of every day, the counters and the time
+spent per section. Savings are estimates: the offsets are priced at
+--kwh-per-degree and the water heater at --heater-kw.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from _loader import load
+
+computation = load("computation")
+replay_module = load("replay")
+
+
+def main() -> int:
+    """Replay a dump and print the report; return the process exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", type=Path, help="JSONL dump or .bin history file")
+    parser.add_argument(
+        "--options", type=json.loads, default={}, help="entry options as JSON"
+    )
+    parser.add_argument("--country", help="country of the public holidays")
+    parser.add_argument(
+        "--timezone",
+        type=ZoneInfo,
+        default=ZoneInfo("Europe/Oslo"),
+        help="local time zone of a history file (default Europe/Oslo)",
+    )
+    parser.add_argument(
+        "--kwh-per-degree",
+        type=float,
+        default=replay_module.DEFAULT_ENERGY_PER_DEGREE,
+    )
+    parser.add_argument(
+        "--heater-kw", type=float, default=replay_module.DEFAULT_HEATER_POWER
+    )
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument(
+        "--slots", action="store_true", help="include every slot in the JSON report"
+    )
+    args = parser.parse_args()
+
+    replay = replay_module.Replay(
+        computation.Profile.from_options(args.options, args.country),
+        energy_per_degree=args.kwh_per_degree,
+        heater_power=args.heater_kw,
+    )
+    try:
+        if args.path.suffix == ".bin":
+            snapshots = replay_module.load_history(args.path, args.timezone)
+        else:
+            snapshots = replay_module.load_jsonl(args.path)
+        report = replay.run(snapshots).as_dict(slots=args.slots)
+    except (OSError, ValueError) as exception:
+        print(f"error: {exception}", file=sys.stderr)  # noqa: T201
+        return 1
+
+    if args.json:
+        print(json.dumps(report, indent=2))  # noqa: T201
+        return 0
+    print(  # noqa: T201
+        f"{'day':<12}{'slots':>6}{'mean':>9}{'lowered':>9}{'raised':>8}"
+        f"{'heater':>8}{'heating':>10}{'heater':>10}"
+    )
+    for day in report["days"]:
+        mean = "" if day["mean_price"] is None else f"{day['mean_price']:.4f}"
+        print(  # noqa: T201
+            f"{day['day']:<12}{day['slots']:>6}{mean:>9}{day['lowered']:>9}"
+            f"{day['raised']:>8}{day['heater_on']:>8}"
+            f"{day['heating_savings']:>10.3f}{day['heater_savings']:>10.3f}"
+        )
+    print(  # noqa: T201
+        f"savings: heating {report['heating_savings']:.3f}, "
+        f"water heater {report['heater_savings']:.3f}"
+    )
+    print(  # noqa: T201
+        "counters: "
+        + ", ".join(f"{name} {count}" for name, count in report["counters"].items())
+    )
+    for name, timing in report["timings_ms"].items():
+        print(  # noqa: T201
+            f"{name:<8} n={timing['count']:<6} mean {timing['mean']:.3f}ms "
+            f"p50 {timing['p50']:.3f}ms p95 {timing['p95']:.3f}ms "
+            f"max {timing['max']:.3f}ms"
+        )
+    speedup = report["speedup"]
+    print(  # noqa: T201
+        f"{report['simulated_hours']:.0f} simulated hours in "
+        f"{report['wall_seconds']:.2f}s"
+        + ("" if speedup is None else f", {speedup:,.0f}x real time")
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,605 @@
+"""
+Benchmark suite for the priceanalyzer hot path.
+
+Runs without a Home Assistant instance and without network access:
+
+    python benchmarks/run.py                    # compare with baseline.json
+    python benchmarks/run.py --update-baseline  # store the current results
+    python benchmarks/run.py -k ingest          # only cases containing "ingest"
+
+Each case records the wall time per call, the memory allocated by one call
+(tracemalloc) and, for attribute cases, the serialized payload size. A case
+fails when it is slower or allocates more than the baseline allows; payload
+sizes must not grow at all. Timings are machine specific, so refresh the
+baseline when moving to another machine. Every entry also records whether
+NumPy was importable; a case is not compared with an entry recorded the
+other way, as several hot paths fall back to the standard library.
+
+The PriceAnalyzerSensor cases need the homeassistant package (it is in
+requirements.txt); they are skipped when it cannot be imported.
+
+Import cases run a fresh interpreter with -X importtime and record the time
+spent importing the integration once Home Assistant itself is loaded.
+
+Setup cases store config entries of one source, then boot a bare Home
+Assistant core from them and record the time async_setup_component takes
+to set them all up, as they add it to startup; the goal is under 50 ms for
+100 entries.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from array import array
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from _loader import load
+from fixtures import FIXTURES, TIME_ZONE, nordpool_attributes, season, snapshot
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+BASELINE = Path(__file__).parent / "baseline.json"
+ENTRY_COUNTS = (1, 10, 50, 200)
+# Nordpool areas compared by one entry: two, the Norwegian ones, all of them.
+AREA_COUNTS = (2, 5, 15)
+# Days of prices the replay cases play through.
+REPLAY_DAYS = 30
+# Interpreter runs per import case; the fastest one counts.
+IMPORT_RUNS = 5
+# Config entries set up at boot by the setup cases, and boots per case; the
+# fastest one counts.
+SETUP_ENTRY_COUNTS = (1, 100)
+SETUP_RUNS = 5
+# Home Assistant modules that are loaded before any integration is.
+HA_PRELUDE = (
+    "import homeassistant.config_entries, homeassistant.helpers.storage, "
+    "homeassistant.helpers.update_coordinator, homeassistant.components.sensor"
+)
+
+analysis = load("analysis")
+areas_module = load("areas")
+attributes_module = load("attributes")
+computation = load("computation")
+const = load("const")
+heater = load("heater")
+optimizer = load("optimizer")
+replay_module = load("replay")
+series_module = load("series")
+solver_module = load("solver")
+tariff_module = load("tariff")
+# Whether the cases run the NumPy paths.
+NUMPY = analysis.load_numpy() is not None
+# The options of an entry left at its defaults.
+PROFILE = computation.Profile()
+
+
+@dataclass
+class Result:
+    """Measurements of one case."""
+
+    seconds: float
+    allocated: int
+    payload: int | None = None
+    numpy: bool = NUMPY
+
+
+@dataclass
+class Case:
+    """A named callable to measure; it may return attributes to size."""
+
+    name: str
+    function: Callable[[], Any]
+    payload: bool = False
+
+
+@dataclass
+class ImportCase:
+    """A statement to import in a fresh interpreter after a prelude."""
+
+    name: str
+    statement: str
+    prelude: str = ""
+
+
+@dataclass
+class SetupCase:
+    """Config entries of one source, set up as Home Assistant boots them."""
+
+    name: str
+    entries: int
+
+
+def measure(case: Case) -> Result:
+    """Return the timing, allocations and payload size of a case."""
+    timer = timeit.Timer(case.function)
+    loops, _ = timer.autorange()
+    seconds = min(timer.repeat(5, loops)) / loops
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        output = case.function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    payload = None
+    if case.payload:
+        payload = len(json.dumps(output, default=str, separators=(",", ":")))
+    return Result(seconds, peak - before, payload)
+
+
+def measure_import(case: ImportCase) -> Result:
+    """Return the time spent in imports made by the statement of a case."""
+    marker = "import-case-start"
+    script = (
+        f"{case.prelude}\nimport sys\nsys.stderr.write({marker!r})\n{case.statement}"
+    )
+    runs = []
+    for _ in range(IMPORT_RUNS):
+        output = subprocess.run(  # noqa: S603
+            [sys.executable, "-X", "importtime", "-c", script],
+            capture_output=True,
+            check=True,
+            cwd=Path(__file__).parent.parent,
+            text=True,
+        ).stderr
+        # Lines read "import time: self [us] | cumulative | name".
+        runs.append(
+            sum(
+                int(line.split("|")[0].rsplit(":", 1)[1])
+                for line in output.split(marker, 1)[1].splitlines()
+                if line.startswith("import time:")
+            )
+        )
+    return Result(min(runs) / 1e6, 0)
+
+
+def import_cases() -> Iterator[ImportCase]:
+    """Yield the import of the computation modules and of the integration."""
+    yield ImportCase(
+        "import/computation",
+        "load('computation')",
+        # dataclasses and logging are always loaded in Home Assistant.
+        "import dataclasses, logging, sys\n"
+        "sys.path.insert(0, 'benchmarks')\n"
+        "from _loader import load",
+    )
+    try:
+        import homeassistant  # noqa: F401
+    except ImportError:
+        return
+    yield ImportCase(
+        "import/integration",
+        "import custom_components.priceanalyzer.sensor",
+        HA_PRELUDE,
+    )
+    yield ImportCase(
+        "import/config_flow",
+        "import custom_components.priceanalyzer.config_flow",
+        HA_PRELUDE,
+    )
+
+
+def measure_setup(case: SetupCase) -> Result:
+    """Return the time a bare Home Assistant core takes to set up the entries."""
+    # Home Assistant finds the integration in the custom_components package
+    # of the repository; the configuration directory only holds storage.
+    root = str(Path(__file__).resolve().parent.parent)
+    if root not in sys.path:
+        sys.path.append(root)
+    # Every boot warns that the custom integration is untested.
+    logging.getLogger("homeassistant.loader").setLevel(logging.ERROR)
+    with tempfile.TemporaryDirectory() as config:
+        # The first setup stores the entries and the source's snapshot.
+        asyncio.run(_async_setup_entries(config, case.entries))
+        return Result(
+            min(asyncio.run(_async_boot(config)) for _ in range(SETUP_RUNS)), 0
+        )
+
+
+async def _async_core(config: str) -> Any:
+    """Return a Home Assistant core with its registries and config entries loaded."""
+    from homeassistant import loader
+    from homeassistant.config_entries import ConfigEntries
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers import (
+        area_registry,
+        category_registry,
+        device_registry,
+        entity_registry,
+        floor_registry,
+        issue_registry,
+        label_registry,
+    )
+
+    hass = HomeAssistant(config)
+    hass.config.skip_pip = True
+    await hass.config.async_set_time_zone(str(TIME_ZONE))
+    loader.async_setup(hass)
+    await asyncio.gather(
+        *(
+            registry.async_load(hass)
+            for registry in (
+                area_registry,
+                category_registry,
+                device_registry,
+                entity_registry,
+                floor_registry,
+                issue_registry,
+                label_registry,
+            )
+        )
+    )
+    hass.config_entries = ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    hass.states.async_set(
+        "sensor.nordpool",
+        "1.0",
+        nordpool_attributes(datetime.now(TIME_ZONE).date(), 900),
+    )
+    return hass
+
+
+async def _async_setup_entries(config: str, entries: int) -> None:
+    """Add config entries reading one source and write them to storage."""
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.const import CONF_ENTITY_ID
+
+    hass = await _async_core(config)
+    await hass.async_start()
+    for _ in range(entries):
+        await hass.config_entries.async_add(
+            ConfigEntry(
+                version=1,
+                minor_version=1,
+                domain=const.DOMAIN,
+                title="benchmark",
+                data={CONF_ENTITY_ID: "sensor.nordpool"},
+                source="user",
+                # No payload budget: the warning would flood the output.
+                options={const.CONF_PAYLOAD_BUDGET: 0},
+                unique_id=None,
+            )
+        )
+    await hass.async_block_till_done()
+    await hass.async_stop()
+
+
+async def _async_boot(config: str) -> float:
+    """Return the seconds the stored entries take to set up at boot."""
+    from homeassistant.setup import async_setup_component
+
+    hass = await _async_core(config)
+    start = time.perf_counter()
+    await async_setup_component(hass, const.DOMAIN, {})
+    seconds = time.perf_counter() - start
+    await hass.async_stop()
+    return seconds
+
+
+def setup_cases() -> Iterator[SetupCase]:
+    """Yield the boot of entries sharing a source, with Home Assistant."""
+    try:
+        import homeassistant  # noqa: F401
+    except ImportError:
+        return
+    for entries in SETUP_ENTRY_COUNTS:
+        yield SetupCase(f"setup/{entries}", entries)
+
+
+def ingest_cases() -> Iterator[Case]:
+    """Yield the coordinator refresh path: fingerprint, parse, analyse and plan."""
+    for name, fixture in FIXTURES.items():
+        data = snapshot(fixture())
+        fingerprint = computation.price_fingerprint(data)
+        yield Case(f"refresh-hit/{name}", partial(computation.price_fingerprint, data))
+        yield Case(
+            f"refresh-miss/{name}",
+            partial(computation.compute, data, fingerprint, (PROFILE,)),
+        )
+
+
+def solve(series: Any) -> tuple:
+    """Return the cheapest 3 hour window and slots of a fresh solver."""
+    solver = solver_module.PriceSolver(series)
+    start = series.starts[0]
+    return (
+        solver.cheapest_window(3 * 3600, start),
+        solver.cheapest_slots(3 * 3600, start),
+    )
+
+
+def attribute_cases() -> Iterator[Case]:
+    """Yield calculate_day in every attribute format and the solver."""
+    for name, fixture in FIXTURES.items():
+        result = computation.compute(snapshot(fixture()), profiles=(PROFILE,))
+        today = result.series.local_days[0]
+        for mode in const.ATTRIBUTE_MODES:
+            yield Case(
+                f"calculate_day/{mode}/{name}",
+                partial(
+                    attributes_module.build_days,
+                    result.series,
+                    result.plan(PROFILE.heating),
+                    today,
+                    mode,
+                ),
+                payload=True,
+            )
+        yield Case(f"solver/{name}", partial(solve, result.series))
+
+
+def optimizer_cases() -> Iterator[Case]:
+    """
+    Yield a full heating schedule solve with the default limits.
+
+    The optimizer/python cases force the standard library pass, which must
+    stay under 5 ms for 192 slots.
+    """
+    limits = optimizer.HeatingLimits()
+    for name, fixture in FIXTURES.items():
+        series = computation.compute(snapshot(fixture())).series
+        yield Case(
+            f"optimizer/{name}",
+            partial(optimizer.optimize, series.values, series.resolution, limits),
+        )
+        yield Case(
+            f"optimizer/python/{name}",
+            partial(
+                optimizer.optimize,
+                series.values,
+                series.resolution,
+                limits,
+                use_numpy=False,
+            ),
+        )
+
+
+def heater_cases() -> Iterator[Case]:
+    """Yield a water heater schedule per fixture and batches of entries."""
+    for name, fixture in FIXTURES.items():
+        series = computation.compute(snapshot(fixture())).series
+        yield Case(
+            f"heater/{name}",
+            partial(heater.schedule, series, [heater.WaterHeaterLimits()]),
+        )
+    series = computation.compute(snapshot(FIXTURES["192"]())).series
+    for entries in ENTRY_COUNTS:
+        limits = [
+            heater.WaterHeaterLimits(10 + entry % 40, 2 + entry % 8)
+            for entry in range(entries)
+        ]
+        yield Case(f"heater-batch/{entries}", partial(heater.schedule, series, limits))
+
+
+def tariff_cases() -> Iterator[Case]:
+    """Yield the effective prices of a day and night tariff with VAT."""
+    tariff = tariff_module.Tariff(0.35, 0.25, surcharge=0.05, vat=25.0)
+    for name, fixture in FIXTURES.items():
+        series = computation.compute(snapshot(fixture())).series
+        yield Case(f"tariff/{name}", partial(tariff.apply, series))
+
+
+def area_cases() -> Iterator[Case]:
+    """Yield the alignment and comparison of areas at mixed resolutions."""
+    quarter = computation.compute(snapshot(FIXTURES["192"]())).series
+    hourly = computation.compute(snapshot(FIXTURES["48"]())).series
+    for areas in AREA_COUNTS:
+        series = []
+        for area in range(areas):
+            source = quarter if area % 2 else hourly
+            scale = 1 + area / 10
+            series.append(
+                source.with_values(
+                    array("d", (value * scale for value in source.values))  # noqa: PD011
+                )
+            )
+        labels = [f"area{area}" for area in range(areas)]
+        yield Case(
+            f"areas/{areas}", partial(areas_module.compare_areas, labels, series)
+        )
+
+
+def replay_cases() -> Iterator[Case]:
+    """Yield a month of day-ahead snapshots replayed on the virtual clock."""
+    for resolution in (3600, 900):
+        snapshots = list(
+            replay_module.day_ahead(
+                season(days=REPLAY_DAYS, resolution=resolution), TIME_ZONE
+            )
+        )
+        yield Case(
+            f"replay/{REPLAY_DAYS}d-{resolution}s",
+            partial(replay_module.replay, snapshots),
+        )
+
+
+def entry_cases() -> Iterator[Case]:
+    """Yield one shared refresh followed by a first state write per entry."""
+    data = snapshot(FIXTURES["192"]())
+
+    def refresh(entries: int) -> None:
+        result = computation.compute(data, profiles=(PROFILE,))
+        plan = result.plan(PROFILE.heating)
+        today = result.series.local_days[0]
+        for _ in range(entries):
+            attributes_module.build_days(
+                result.series, plan, today, const.ATTRIBUTE_MODE_FULL
+            )
+
+    for entries in ENTRY_COUNTS:
+        yield Case(f"entries/{entries}", partial(refresh, entries))
+
+
+def sensor_cases() -> Iterator[Case]:
+    """Yield PriceAnalyzerSensor cases when Home Assistant is importable."""
+    try:
+        from homeassistant.components.sensor import SensorEntityDescription
+    except ImportError:
+        print("homeassistant is not installed; skipping sensor cases")  # noqa: T201
+        return
+    sensor_module = load("sensor")
+    Instrumentation = load("instrumentation").Instrumentation  # noqa: N806
+
+    def make_sensor(data: dict) -> Any:
+        result = computation.compute(data)
+        coordinator = SimpleNamespace(
+            data=data,
+            computation=result,
+            series=result.series,
+            analysis=result.analysis,
+            solver=result.solver,
+            history=None,
+            rolling=load("rolling").RollingStats(),
+        )
+        entry = SimpleNamespace(
+            entry_id="benchmark",
+            domain=const.DOMAIN,
+            # No payload budget: the warning would flood the output.
+            options={const.CONF_PAYLOAD_BUDGET: 0},
+            runtime_data=SimpleNamespace(
+                instrumentation=Instrumentation(), profile=computation.Profile()
+            ),
+        )
+        return sensor_module.PriceAnalyzerSensor(
+            coordinator=coordinator,
+            entry=entry,
+            entity_description=SensorEntityDescription(key=const.DOMAIN),
+        )
+
+    def first_write(sensor: Any) -> dict:
+        # Drop the per-entity and shared caches, as new coordinator data would.
+        sensor._plan_key = None  # noqa: SLF001
+        sensor.coordinator.computation.attributes.clear()
+        return sensor.extra_state_attributes
+
+    for name, fixture in FIXTURES.items():
+        sensor = make_sensor(snapshot(fixture()))
+        yield Case(
+            f"sensor.native_value/{name}", lambda sensor=sensor: sensor.native_value
+        )
+        yield Case(
+            f"sensor.extra_state_attributes/{name}",
+            lambda sensor=sensor: first_write(sensor),
+            payload=True,
+        )
+        yield Case(
+            f"sensor.cached_write/{name}",
+            lambda sensor=sensor: (sensor.native_value, sensor.extra_state_attributes),
+        )
+
+
+def compare(
+    name: str, result: Result, baseline: dict | None, tolerance: float
+) -> list[str]:
+    """Return the regressions of a result against its baseline."""
+    if baseline is None:
+        return []
+    failures = []
+    if result.seconds > baseline["seconds"] * (1 + tolerance):
+        failures.append(
+            f"{name}: {result.seconds * 1e6:.1f}us vs {baseline['seconds'] * 1e6:.1f}us"
+        )
+    if result.allocated > baseline["allocated"] * (1 + tolerance):
+        failures.append(
+            f"{name}: allocated {result.allocated} vs {baseline['allocated']} bytes"
+        )
+    if result.payload is not None and result.payload > (baseline["payload"] or 0):
+        failures.append(
+            f"{name}: payload {result.payload} vs {baseline['payload']} bytes"
+        )
+    return failures
+
+
+def main() -> int:
+    """Run the suite and return the process exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-k", dest="keyword", help="only run matching cases")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="allowed relative slowdown and allocation growth (default 0.5)",
+    )
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+
+    results: dict[str, Result] = {}
+    failures: list[str] = []
+    skipped = 0
+    print(f"{'case':<44}{'time':>12}{'alloc':>10}{'payload':>10}")  # noqa: T201
+    for generator in (
+        ingest_cases,
+        attribute_cases,
+        optimizer_cases,
+        heater_cases,
+        tariff_cases,
+        area_cases,
+        replay_cases,
+        entry_cases,
+        sensor_cases,
+        import_cases,
+        setup_cases,
+    ):
+        for case in generator():
+            if args.keyword and args.keyword not in case.name:
+                continue
+            if isinstance(case, ImportCase):
+                result = results[case.name] = measure_import(case)
+            elif isinstance(case, SetupCase):
+                result = results[case.name] = measure_setup(case)
+            else:
+                result = results[case.name] = measure(case)
+            payload = "" if result.payload is None else str(result.payload)
+            print(  # noqa: T201
+                f"{case.name:<44}{result.seconds * 1e6:>10.1f}us"
+                f"{result.allocated:>10}{payload:>10}"
+            )
+            entry = baseline.get(case.name)
+            if entry is not None and entry.get("numpy") != result.numpy:
+                skipped += 1
+                continue
+            failures += compare(case.name, result, entry, args.tolerance)
+
+    if args.update_baseline:
+        baseline.update({name: asdict(result) for name, result in results.items()})
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")  # noqa: T201
+        return 0
+
+    if skipped:
+        print(  # noqa: T201
+            f"{skipped} case(s) not compared: the baseline was recorded "
+            f"{'without' if NUMPY else 'with'} NumPy"
+        )
+    for failure in failures:
+        print(f"REGRESSION {failure}")  # noqa: T201
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
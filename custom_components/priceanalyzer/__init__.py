@@ -7,26 +7,55 @@ https://github.com/erlendsellie/priceanalyzer
 
 from __future__ import annotations
 
+import asyncio
+from functools import partial
 from typing import TYPE_CHECKING
 
 from homeassistant.const import CONF_ENTITY_ID, Platform
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.start import async_at_started
 from homeassistant.loader import async_get_loaded_integration
 
-from .api import IntegrationBlueprintApiClient
-from .coordinator import BlueprintDataUpdateCoordinator
-from .data import IntegrationBlueprintData
+from .computation import Profile
+from .const import (
+    CONF_AREAS,
+    CONF_SLOW_THRESHOLD,
+    DEFAULT_SLOW_THRESHOLD,
+    DOMAIN,
+)
+from .coordinator import AreaDataUpdateCoordinator
+from .data import AreaEntryData, IntegrationBlueprintData
+from .instrumentation import Instrumentation
+from .registry import async_get_registry
+from .services import async_setup_services
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.typing import ConfigType
 
-    from .data import IntegrationBlueprintConfigEntry
+    from .data import AreaConfigEntry, IntegrationBlueprintConfigEntry
 
 PLATFORMS: list[Platform] = [
     Platform.SENSOR,
     Platform.BINARY_SENSOR,
     Platform.SWITCH,
 ]
+# Set up with the entry; the others wait until Home Assistant has started.
+CRITICAL_PLATFORMS: list[Platform] = [Platform.SENSOR]
+DEFERRED_PLATFORMS: list[Platform] = [
+    platform for platform in PLATFORMS if platform not in CRITICAL_PLATFORMS
+]
+# Entries comparing several areas have no heating or water heater plan.
+AREA_PLATFORMS: list[Platform] = [Platform.SENSOR]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:  # noqa: ARG001 Unused function argument: `config`
+    """Set up the priceanalyzer services."""
+    async_setup_services(hass)
+    return True
 
 
 # https://developers.home-assistant.io/docs/config_entries_index/#setting-up-an-entry
@@ -35,34 +64,119 @@ async def async_setup_entry(
     entry: IntegrationBlueprintConfigEntry,
 ) -> bool:
     """Set up this integration using UI."""
-    coordinator = BlueprintDataUpdateCoordinator(
-        hass=hass,
-    )
-    entry.runtime_data = IntegrationBlueprintData(
-        client=IntegrationBlueprintApiClient(
-            entity_id=entry.data[CONF_ENTITY_ID],
-            session=async_get_clientsession(hass),
-            hass=hass,
-        ),
-        integration=async_get_loaded_integration(hass, entry.domain),
-        coordinator=coordinator,
-    )
+    if CONF_AREAS in entry.data:
+        return await _async_setup_areas(hass, entry)
+    slow_threshold = entry.options.get(CONF_SLOW_THRESHOLD, DEFAULT_SLOW_THRESHOLD)
+    instrumentation = Instrumentation(slow_threshold)
+    with instrumentation.timed("setup", blocking=False):
+        # Entries reading the same Nordpool entity share one coordinator and
+        # its first refresh, so prices are fetched and analysed once per source.
+        registry = async_get_registry(hass)
+        entity_id = entry.data[CONF_ENTITY_ID]
+        profile = Profile.from_options(entry.options, hass.config.country)
+        # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
+        coordinator = await registry.async_acquire(
+            entry.entry_id, entity_id, entry.options, profile
+        )
+        entry.async_on_unload(
+            lambda: registry.async_release(entry.entry_id, entity_id),
+        )
+        entry.runtime_data = IntegrationBlueprintData(
+            client=coordinator.client,
+            integration=async_get_loaded_integration(hass, entry.domain),
+            coordinator=coordinator,
+            instrumentation=instrumentation,
+            profile=profile,
+        )
+
+        await hass.config_entries.async_forward_entry_setups(entry, CRITICAL_PLATFORMS)
+        entry.runtime_data.platforms.extend(CRITICAL_PLATFORMS)
+        entry.async_on_unload(
+            async_at_started(hass, partial(_async_setup_deferred, entry=entry))
+        )
+        entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
+    return True
 
-    # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
-    await coordinator.async_config_entry_first_refresh()
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+async def _async_setup_areas(hass: HomeAssistant, entry: AreaConfigEntry) -> bool:
+    """Set up an entry comparing the prices of several areas."""
+    slow_threshold = entry.options.get(CONF_SLOW_THRESHOLD, DEFAULT_SLOW_THRESHOLD)
+    instrumentation = Instrumentation(slow_threshold)
+    with instrumentation.timed("setup", blocking=False):
+        # Every area reads the shared coordinator of its entity, so an area
+        # also set up on its own is still fetched and parsed once.
+        registry = async_get_registry(hass)
+        entity_ids = entry.data[CONF_AREAS]
+        results = await asyncio.gather(
+            *(
+                registry.async_acquire(entry.entry_id, entity_id, entry.options)
+                for entity_id in entity_ids
+            ),
+            return_exceptions=True,
+        )
+        for entity_id, result in zip(entity_ids, results, strict=True):
+            if not isinstance(result, BaseException):
+                entry.async_on_unload(
+                    partial(registry.async_release, entry.entry_id, entity_id)
+                )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        coordinator = AreaDataUpdateCoordinator(hass, results)
+        coordinator.instrumentation.slow_threshold = slow_threshold
+        await coordinator.async_refresh()
+        entry.async_on_unload(coordinator.async_start())
+        entry.runtime_data = AreaEntryData(
+            coordinator=coordinator,
+            integration=async_get_loaded_integration(hass, entry.domain),
+            instrumentation=instrumentation,
+        )
+
+        await hass.config_entries.async_forward_entry_setups(entry, AREA_PLATFORMS)
+        entry.runtime_data.platforms.extend(AREA_PLATFORMS)
+        entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     return True
 
 
+@callback
+def _async_setup_deferred(
+    hass: HomeAssistant, entry: IntegrationBlueprintConfigEntry
+) -> None:
+    """Set up the platforms that are not needed during startup."""
+    # A tracked task: shutdown waits for it instead of cancelling an import.
+    entry.async_create_task(
+        hass,
+        _async_forward_deferred(hass, entry),
+        f"{DOMAIN} deferred platforms {entry.entry_id}",
+    )
+
+
+async def _async_forward_deferred(
+    hass: HomeAssistant, entry: IntegrationBlueprintConfigEntry
+) -> None:
+    """Forward the entry to the deferred platforms."""
+    # Newer Home Assistant versions want late forwards to take the setup lock.
+    forward = getattr(
+        hass.config_entries,
+        "async_late_forward_entry_setups",
+        hass.config_entries.async_forward_entry_setups,
+    )
+    with entry.runtime_data.instrumentation.timed("deferred_setup", blocking=False):
+        await forward(entry, DEFERRED_PLATFORMS)
+    entry.runtime_data.platforms.extend(DEFERRED_PLATFORMS)
+
+
 async def async_unload_entry(
     hass: HomeAssistant,
     entry: IntegrationBlueprintConfigEntry,
 ) -> bool:
     """Handle removal of an entry."""
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    return await hass.config_entries.async_unload_platforms(
+        entry, entry.runtime_data.platforms
+    )
 
 
 async def async_reload_entry(
@@ -70,5 +184,4 @@ async def async_reload_entry(
     entry: IntegrationBlueprintConfigEntry,
 ) -> None:
     """Reload config entry."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+    await hass.config_entries.async_reload(entry.entry_id)
@@ -0,0 +1,205 @@
+"""Batched price analysis for priceanalyzer."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+# Length of the forward-looking rolling window.
+DEFAULT_WINDOW_SECONDS = 3 * 3600
+
+# NumPy once load_numpy() ran, False when it is not installed.
+_numpy: Any = None
+
+
+def load_numpy() -> Any:
+    """
+    Return NumPy, importing it on first use, or None when it is not installed.
+
+    NumPy is most of the integration's import time, so it is not imported
+    with the module; the coordinator calls this in the executor.
+    """
+    global _numpy  # noqa: PLW0603
+    if _numpy is None:
+        try:
+            import numpy  # noqa: ICN001
+        except ImportError:  # pragma: no cover - NumPy is optional on small boxes.
+            _numpy = False
+        else:
+            _numpy = numpy
+    return _numpy or None
+
+
+@dataclass(frozen=True, slots=True)
+class Analysis:
+    """
+    Per-slot statistics over the combined today+tomorrow price vector.
+
+    Rolling windows look forward from each slot and are truncated at the end
+    of the horizon. Missing prices are NaN and are left out of every
+    statistic.
+    """
+
+    delta: array
+    rolling_min: array
+    rolling_max: array
+    rolling_mean: array
+    percentile: array
+    correction: array
+
+    def __len__(self) -> int:
+        """Return the number of slots."""
+        return len(self.correction)
+
+
+EMPTY_ANALYSIS = Analysis(
+    array("d"), array("d"), array("d"), array("d"), array("d"), array("b")
+)
+
+
+def analyze(
+    values: Sequence[float],
+    resolution: int = 3600,
+    window_seconds: int = DEFAULT_WINDOW_SECONDS,
+    *,
+    use_numpy: bool | None = None,
+) -> Analysis:
+    """Return the analysis of a price vector in one batched pass."""
+    if not values:
+        return EMPTY_ANALYSIS
+    window = max(1, window_seconds // resolution)
+    np = load_numpy() if use_numpy is not False else None
+    if np is not None:
+        return _analyze_numpy(np, values, window)
+    return _analyze_python(values, window)
+
+
+def _analyze_python(values: Sequence[float], window: int) -> Analysis:
+    """Return the analysis using only the standard library."""
+    count = len(values)
+    valid = [not math.isnan(value) for value in values]
+
+    delta = array("d", [math.nan] * count)
+    correction = array("b", bytes(count))
+    for index in range(count - 1):
+        current, following = values[index], values[index + 1]
+        if valid[index] and valid[index + 1]:
+            delta[index] = following - current
+            if current < following:
+                correction[index] = 1
+            elif current > following:
+                correction[index] = -1
+
+    # Prefix sums in the same order as numpy.cumsum, so both paths agree.
+    sums = [
+        0.0,
+        *accumulate(
+            value if ok else 0.0 for value, ok in zip(values, valid, strict=True)
+        ),
+    ]
+    counts = [0, *accumulate(valid)]
+    rolling_mean = array("d", [math.nan] * count)
+    for index in range(count):
+        stop = min(index + window, count)
+        valid_count = counts[stop] - counts[index]
+        if valid_count:
+            rolling_mean[index] = (sums[stop] - sums[index]) / valid_count
+
+    rolling_min = _rolling_extreme(values, valid, window, minimum=True)
+    rolling_max = _rolling_extreme(values, valid, window, minimum=False)
+
+    ordered = sorted(value for value, ok in zip(values, valid, strict=True) if ok)
+    total = len(ordered)
+    percentile = array(
+        "d",
+        (
+            100.0 * bisect_left(ordered, value) / total if ok else math.nan
+            for value, ok in zip(values, valid, strict=True)
+        ),
+    )
+    return Analysis(
+        delta, rolling_min, rolling_max, rolling_mean, percentile, correction
+    )
+
+
+def _rolling_extreme(
+    values: Sequence[float], valid: Sequence[bool], window: int, *, minimum: bool
+) -> array:
+    """Return the forward rolling min or max with a monotonic deque in O(n)."""
+    count = len(values)
+    result = array("d", [math.nan] * count)
+    candidates: deque[int] = deque()
+    # Walk backwards so each window is [index, index + window).
+    for index in range(count - 1, -1, -1):
+        while candidates and candidates[0] >= index + window:
+            candidates.popleft()
+        if valid[index]:
+            value = values[index]
+            while candidates and (
+                values[candidates[-1]] >= value
+                if minimum
+                else values[candidates[-1]] <= value
+            ):
+                candidates.pop()
+            candidates.append(index)
+        if candidates:
+            result[index] = values[candidates[0]]
+    return result
+
+
+def _analyze_numpy(np: Any, values: Sequence[float], window: int) -> Analysis:
+    """Return the analysis with vectorized NumPy operations."""
+    prices = np.asarray(values, dtype=np.float64)
+    count = prices.size
+    valid = ~np.isnan(prices)
+
+    delta = np.full(count, np.nan)
+    delta[:-1] = prices[1:] - prices[:-1]
+    correction = np.zeros(count, dtype=np.int8)
+    correction[:-1] = np.where(
+        prices[:-1] < prices[1:], 1, np.where(prices[:-1] > prices[1:], -1, 0)
+    )
+
+    sums = np.concatenate(([0.0], np.cumsum(np.where(valid, prices, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(valid)))
+    stops = np.minimum(np.arange(count) + window, count)
+    valid_counts = counts[stops] - counts[:count]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rolling_mean = np.where(
+            valid_counts > 0, (sums[stops] - sums[:count]) / valid_counts, np.nan
+        )
+
+    padded_min = np.concatenate(
+        (np.where(valid, prices, np.inf), np.full(window - 1, np.inf))
+    )
+    padded_max = np.concatenate(
+        (np.where(valid, prices, -np.inf), np.full(window - 1, -np.inf))
+    )
+    windows_min = np.lib.stride_tricks.sliding_window_view(padded_min, window)
+    windows_max = np.lib.stride_tricks.sliding_window_view(padded_max, window)
+    rolling_min = windows_min.min(axis=1)
+    rolling_max = windows_max.max(axis=1)
+    rolling_min[np.isinf(rolling_min)] = np.nan
+    rolling_max[np.isinf(rolling_max)] = np.nan
+
+    ordered = np.sort(prices[valid])
+    ranks = np.searchsorted(ordered, prices, side="left")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        percentile = np.where(valid, 100.0 * ranks / ordered.size, np.nan)
+
+    return Analysis(
+        array("d", delta.tobytes()),
+        array("d", rolling_min.tobytes()),
+        array("d", rolling_max.tobytes()),
+        array("d", rolling_mean.tobytes()),
+        array("d", percentile.tobytes()),
+        array("b", correction.tobytes()),
+    )
@@ -0,0 +1,241 @@
+"""Cross-area price comparison for priceanalyzer."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from .analysis import load_numpy
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from .series import PriceSeries
+
+# Area index of a slot no area has a price for.
+NO_AREA = -1
+
+
+@dataclass(frozen=True, slots=True)
+class AreaComparison:
+    """
+    Prices of several areas aligned on one grid of slots, and how they compare.
+
+    Per-area values and ranks are areas x slots matrices stored row by row,
+    so the row of an area is a slice. Missing prices are NaN and rank
+    NO_AREA.
+    """
+
+    # Label of every row, in the order the entry lists the areas.
+    areas: tuple[str, ...]
+    # Start of every column in epoch seconds, one resolution apart.
+    starts: array
+    resolution: int
+    values: array
+    # Position of each area's price among the areas, 0 for the cheapest.
+    ranks: array
+    # Per slot: the cheapest and most expensive area, their prices, the
+    # spread between them and the mean over the areas with a price.
+    cheapest: array
+    dearest: array
+    minimum: array
+    maximum: array
+    spread: array
+    mean: array
+
+    def __len__(self) -> int:
+        """Return the number of slots."""
+        return len(self.starts)
+
+    def index_at(self, timestamp: float) -> int | None:
+        """Return the index of the slot covering an epoch timestamp."""
+        if not self.starts:
+            return None
+        index = int((timestamp - self.starts[0]) // self.resolution)
+        return index if 0 <= index < len(self.starts) else None
+
+    def next_boundary(self, timestamp: float) -> int | None:
+        """Return the epoch second at which index_at() next changes, if ever."""
+        if not self.starts:
+            return None
+        if timestamp < self.starts[0]:
+            return self.starts[0]
+        index = self.index_at(timestamp)
+        return None if index is None else self.starts[index] + self.resolution
+
+    def row(self, area: int) -> memoryview:
+        """Return the prices of one area, without copying them."""
+        count = len(self.starts)
+        return memoryview(self.values)[area * count : (area + 1) * count]
+
+    def price(self, area: int, index: int) -> float | None:
+        """Return the price of an area in a slot, or None when it has none."""
+        value = self.values[area * len(self.starts) + index]
+        return None if math.isnan(value) else value
+
+    def rank(self, area: int, index: int) -> int:
+        """Return the rank of an area in a slot, or NO_AREA without a price."""
+        return self.ranks[area * len(self.starts) + index]
+
+
+EMPTY_COMPARISON = AreaComparison(
+    (),
+    array("q"),
+    3600,
+    array("d"),
+    array("b"),
+    array("b"),
+    array("b"),
+    array("d"),
+    array("d"),
+    array("d"),
+    array("d"),
+)
+
+
+def compare_areas(
+    areas: Sequence[str],
+    series: Sequence[PriceSeries],
+    *,
+    use_numpy: bool | None = None,
+) -> AreaComparison:
+    """
+    Return the prices of areas aligned on one grid and compared per slot.
+
+    The grid runs from the earliest slot of any area to the end of the
+    latest at the finest resolution among them; a coarser slot covers every
+    grid slot within it. Areas are then compared in one pass over the
+    areas x slots matrix.
+    """
+    priced = [item for item in series if len(item)]
+    if not priced:
+        return EMPTY_COMPARISON
+    resolution = min(item.resolution for item in priced)
+    first = min(item.starts[0] for item in priced)
+    stop = max(item.starts[-1] + item.resolution for item in priced)
+    starts = array("q", range(first, stop, resolution))
+
+    np = load_numpy() if use_numpy is not False else None
+    if np is not None:
+        return _compare_numpy(np, tuple(areas), series, starts, resolution)
+    return _compare_python(tuple(areas), series, starts, resolution)
+
+
+def _compare_python(
+    areas: tuple[str, ...],
+    series: Sequence[PriceSeries],
+    starts: array,
+    resolution: int,
+) -> AreaComparison:
+    """Return the comparison using only the standard library."""
+    count = len(starts)
+    rows = []
+    for item in series:
+        row = array("d", [math.nan]) * count
+        for index, start in enumerate(starts):
+            slot = item.index_at(start)
+            if slot is not None:
+                row[index] = item.values[slot]  # noqa: PD011
+        rows.append(row)
+
+    ranks = [array("b", [NO_AREA]) * count for _ in rows]
+    cheapest = array("b", [NO_AREA]) * count
+    dearest = array("b", [NO_AREA]) * count
+    minimum = array("d", [math.nan]) * count
+    maximum = array("d", [math.nan]) * count
+    mean = array("d", [math.nan]) * count
+    for index in range(count):
+        # Equal prices keep the order of the areas, as NumPy's stable sort does.
+        ordered = sorted(
+            (area for area, row in enumerate(rows) if not math.isnan(row[index])),
+            key=lambda area, index=index: rows[area][index],
+        )
+        if not ordered:
+            continue
+        for rank, area in enumerate(ordered):
+            ranks[area][index] = rank
+        cheapest[index] = ordered[0]
+        dearest[index] = ordered[-1]
+        minimum[index] = rows[ordered[0]][index]
+        maximum[index] = rows[ordered[-1]][index]
+        mean[index] = math.fsum(rows[area][index] for area in ordered) / len(ordered)
+    spread = array(
+        "d", (high - low for low, high in zip(minimum, maximum, strict=True))
+    )
+
+    values = array("d")
+    for row in rows:
+        values.extend(row)
+    rank_values = array("b")
+    for row in ranks:
+        rank_values.extend(row)
+    return AreaComparison(
+        areas,
+        starts,
+        resolution,
+        values,
+        rank_values,
+        cheapest,
+        dearest,
+        minimum,
+        maximum,
+        spread,
+        mean,
+    )
+
+
+def _compare_numpy(
+    np: Any,
+    areas: tuple[str, ...],
+    series: Sequence[PriceSeries],
+    starts: array,
+    resolution: int,
+) -> AreaComparison:
+    """Return the comparison with vectorized NumPy operations."""
+    grid = np.frombuffer(starts, dtype=np.int64)
+    matrix = np.full((len(series), grid.size), np.nan)
+    for area, item in enumerate(series):
+        if not len(item):
+            continue
+        slot_starts = np.frombuffer(item.starts, dtype=np.int64)
+        slots = np.searchsorted(slot_starts, grid, side="right") - 1
+        covered = (slots >= 0) & (
+            grid < slot_starts[np.maximum(slots, 0)] + item.resolution
+        )
+        matrix[area, covered] = np.frombuffer(item.values, dtype=np.float64)[
+            slots[covered]
+        ]
+
+    missing = np.isnan(matrix)
+    counts = (~missing).sum(axis=0)
+    empty = counts == 0
+    # Stable, so equal prices keep the order of the areas; NaN sorts last.
+    order = np.argsort(matrix, axis=0, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(len(series))[:, None], axis=0)
+    ranks[missing] = NO_AREA
+    cheapest = np.where(empty, NO_AREA, order[0])
+    dearest = np.where(
+        empty, NO_AREA, np.take_along_axis(order, np.maximum(counts - 1, 0)[None], 0)[0]
+    )
+    minimum = np.where(empty, np.nan, np.where(missing, np.inf, matrix).min(axis=0))
+    maximum = np.where(empty, np.nan, np.where(missing, -np.inf, matrix).max(axis=0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(missing, 0.0, matrix).sum(axis=0) / counts
+    mean[empty] = np.nan
+
+    return AreaComparison(
+        areas,
+        starts,
+        resolution,
+        array("d", matrix.tobytes()),
+        array("b", ranks.astype(np.int8).tobytes()),
+        array("b", cheapest.astype(np.int8).tobytes()),
+        array("b", dearest.astype(np.int8).tobytes()),
+        array("d", minimum.tobytes()),
+        array("d", maximum.tobytes()),
+        array("d", (maximum - minimum).tobytes()),
+        array("d", mean.tobytes()),
+    )
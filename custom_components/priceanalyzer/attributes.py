@@ -0,0 +1,70 @@
+"""Attribute formats for priceanalyzer."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from .const import ATTRIBUTE_MODE_COMPACT, ATTRIBUTE_MODE_VALUES
+
+if TYPE_CHECKING:
+    from array import array
+
+    from .series import PriceSeries
+
+REASONS = {
+    1: "Billig strøm",
+    -1: "Dyr strøm",
+    0: "Vanlig strøm",
+}
+
+
+def reason(correction: int) -> str:
+    """Return the reason of a temperature offset of any size."""
+    return REASONS[(correction > 0) - (correction < 0)]
+
+
+def slot_row(series: PriceSeries, plan: array, index: int, today: int) -> dict:
+    """Return one slot of the plan in the full attribute format."""
+    correction = plan[index]
+    return {
+        "start": series.iso_start(index),
+        "end": series.iso_end(index),
+        "temp": correction,
+        "reason": reason(correction),
+        "value": series.value(index),
+        "price_next_hour": series.value(index + 1),
+        # Check if the start date is today or tomorrow
+        "is_tomorrow": series.local_days[index] != today,
+    }
+
+
+def full_day(series: PriceSeries, plan: array, indexes: range, today: int) -> list:
+    """Return a day as one dictionary per slot."""
+    return [slot_row(series, plan, index, today) for index in indexes]
+
+
+def compact_day(series: PriceSeries, plan: array, indexes: range) -> dict:
+    """Return a day as parallel arrays with one start and resolution."""
+    return {
+        "start": series.iso_start(indexes.start) if indexes else None,
+        "resolution": series.resolution,
+        "value": [series.value(index) for index in indexes],
+        "temp": plan[indexes.start : indexes.stop].tolist(),
+    }
+
+
+def values_day(series: PriceSeries, indexes: range) -> list:
+    """Return the prices of a day only."""
+    return [series.value(index) for index in indexes]
+
+
+def build_days(
+    series: PriceSeries, plan: array, today: int, mode: str
+) -> tuple[Any, Any]:
+    """Return today and tomorrow in the given attribute format."""
+    days = (series.day_range(0), series.day_range(1))
+    if mode == ATTRIBUTE_MODE_COMPACT:
+        return tuple(compact_day(series, plan, day) for day in days)
+    if mode == ATTRIBUTE_MODE_VALUES:
+        return tuple(values_day(series, day) for day in days)
+    return tuple(full_day(series, plan, day, today) for day in days)
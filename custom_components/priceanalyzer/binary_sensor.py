@@ -5,11 +5,13 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from homeassistant.components.binary_sensor import (
-    BinarySensorDeviceClass,
     BinarySensorEntity,
     BinarySensorEntityDescription,
 )
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.util import dt as dt_util
 
+from .const import SIGNAL_HEATER_ENABLED
 from .entity import IntegrationBlueprintEntity
 
 if TYPE_CHECKING:
@@ -22,8 +24,8 @@ if TYPE_CHECKING:
 ENTITY_DESCRIPTIONS = (
     BinarySensorEntityDescription(
         key="priceanalyzer",
-        name="Priceanalyzer Binary Sensor",
-        device_class=BinarySensorDeviceClass.CONNECTIVITY,
+        name="Water heater",
+        icon="mdi:water-boiler",
     ),
 )
 
@@ -37,6 +39,7 @@ async def async_setup_entry(
     async_add_entities(
         IntegrationBlueprintBinarySensor(
             coordinator=entry.runtime_data.coordinator,
+            entry=entry,
             entity_description=entity_description,
         )
         for entity_description in ENTITY_DESCRIPTIONS
@@ -44,19 +47,38 @@ async def async_setup_entry(
 
 
 class IntegrationBlueprintBinarySensor(IntegrationBlueprintEntity, BinarySensorEntity):
-    """priceanalyzer binary_sensor class."""
+    """Whether the water heater should be on now, following the entry's plan."""
 
     def __init__(
         self,
         coordinator: BlueprintDataUpdateCoordinator,
+        entry: IntegrationBlueprintConfigEntry,
         entity_description: BinarySensorEntityDescription,
     ) -> None:
         """Initialize the binary_sensor class."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, entry)
         self.entity_description = entity_description
+        self.profile = entry.runtime_data.profile
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the plan switch of the entry."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_HEATER_ENABLED.format(self._entry.entry_id),
+                self.async_write_ha_state,
+            )
+        )
 
     @property
     def is_on(self) -> bool:
-        """Return true if the binary_sensor is on."""
-        return False
-        # return self.coordinator.data.get("title", "") == "foo"
+        """Return whether the heater should be on in the current slot."""
+        # Without the plan, or without prices, the heater runs as usual.
+        if not self._entry.runtime_data.heater_enabled:
+            return True
+        computation = self.coordinator.computation.priced(self.profile.tariff)
+        index = computation.series.index_at(dt_util.now().timestamp())
+        if index is None:
+            return True
+        return bool(computation.heater(self.profile.heater)[index])
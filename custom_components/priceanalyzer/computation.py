@@ -0,0 +1,211 @@
+"""Price computation shared by every entity of a source."""
+
+from __future__ import annotations
+
+import base64
+import sys
+from array import array
+from dataclasses import dataclass, field, fields
+from typing import TYPE_CHECKING, Any
+
+from .analysis import EMPTY_ANALYSIS, Analysis, analyze
+from .const import PRICE_ATTRIBUTES
+from .heater import WaterHeaterLimits, schedule
+from .optimizer import HeatingLimits, optimize
+from .series import PriceSeries
+from .solver import PriceSolver
+from .tariff import Tariff
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+
+@dataclass(frozen=True, slots=True)
+class Profile:
+    """What an entry derives from the prices: its tariff and schedule limits."""
+
+    tariff: Tariff = field(default_factory=Tariff)
+    heating: HeatingLimits = field(default_factory=HeatingLimits)
+    heater: WaterHeaterLimits = field(default_factory=WaterHeaterLimits)
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any], country: str | None) -> Profile:
+        """Return the profile of a config entry's options."""
+        return cls(
+            Tariff.from_options(options, country),
+            HeatingLimits.from_options(options),
+            WaterHeaterLimits.from_options(options),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class PriceComputation:
+    """Everything derived from one version of the Nordpool prices."""
+
+    fingerprint: tuple[int, int] | None
+    series: PriceSeries
+    analysis: Analysis
+    solver: PriceSolver
+    # Attribute values shared by every entity of the source and tariff, so
+    # each is built once: rows with their serialized size by (local day,
+    # attribute mode, heating limits) and the per-slot attributes of the
+    # current slot by ("slot", heating limits).
+    attributes: dict[Any, Any] = field(default_factory=dict, compare=False, repr=False)
+    # Heating schedules by limits, solved once per version of the prices.
+    plans: dict[HeatingLimits, array] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+    # Water heater on/off slots by limits, likewise.
+    heaters: dict[WaterHeaterLimits, array] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+    # Computations of the effective prices by tariff, derived once each.
+    tariffs: dict[Tariff, PriceComputation] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+
+    def priced(self, tariff: Tariff) -> PriceComputation:
+        """Return the computation of the prices with a tariff applied."""
+        if not tariff:
+            return self
+        priced = self.tariffs.get(tariff)
+        if priced is None:
+            series = tariff.apply(self.series)
+            priced = self.tariffs[tariff] = PriceComputation(
+                self.fingerprint,
+                series,
+                analyze(series.values, series.resolution),
+                PriceSolver(series),
+            )
+        return priced
+
+    def plan(self, limits: HeatingLimits) -> array:
+        """Return the heating schedule for limits, solving it on first use."""
+        plan = self.plans.get(limits)
+        if plan is None:
+            plan = self.plans[limits] = optimize(
+                self.series.values, self.series.resolution, limits
+            )
+        return plan
+
+    def heater(self, limits: WaterHeaterLimits) -> array:
+        """Return the water heater schedule for limits, solving it on first use."""
+        heater = self.heaters.get(limits)
+        if heater is None:
+            heater = self.heaters[limits] = schedule(self.series, [limits])[0]
+        return heater
+
+    def solved(self, profile: Profile) -> bool:
+        """Return whether the prices and schedules of a profile are derived."""
+        if profile.tariff and profile.tariff not in self.tariffs:
+            return False
+        priced = self.priced(profile.tariff)
+        return profile.heating in priced.plans and profile.heater in priced.heaters
+
+    def solve(self, profiles: Iterable[Profile]) -> None:
+        """Derive the prices and schedules of profiles; call it in the executor."""
+        heaters: dict[Tariff, set[WaterHeaterLimits]] = {}
+        for profile in profiles:
+            self.priced(profile.tariff).plan(profile.heating)
+            heaters.setdefault(profile.tariff, set()).add(profile.heater)
+        # Water heaters of every entry on a tariff are solved together.
+        for tariff, limits in heaters.items():
+            priced = self.priced(tariff)
+            missing = [item for item in limits if item not in priced.heaters]
+            priced.heaters.update(
+                zip(missing, schedule(priced.series, missing), strict=True)
+            )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the series and analysis in a compact form for storage."""
+        series = self.series
+        return {
+            "resolution": series.resolution,
+            "day_lengths": list(series.day_lengths),
+            "starts": _pack(series.starts),
+            "values": _pack(series.values),
+            "offsets": _pack(series.offsets),
+            "analysis": {
+                field.name: _pack(getattr(self.analysis, field.name))
+                for field in fields(Analysis)
+            },
+        }
+
+    @classmethod
+    def from_dict(
+        cls, data: dict[str, Any], fingerprint: tuple[int, int]
+    ) -> PriceComputation:
+        """Restore a computation stored with as_dict(), without re-analysing."""
+        series = PriceSeries(
+            _unpack("q", data["starts"]),
+            _unpack("d", data["values"]),
+            _unpack("q", data["offsets"]),
+            data["resolution"],
+            tuple(data["day_lengths"]),
+        )
+        analysis = Analysis(
+            **{
+                field.name: _unpack(
+                    getattr(EMPTY_ANALYSIS, field.name).typecode,
+                    data["analysis"][field.name],
+                )
+                for field in fields(Analysis)
+            }
+        )
+        if not len(series) == len(analysis) == len(series.values):
+            msg = "Stored series and analysis lengths differ"
+            raise ValueError(msg)
+        return cls(fingerprint, series, analysis, PriceSolver(series))
+
+
+def _pack(values: array) -> str:
+    """Return an array as little-endian base64."""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return base64.b64encode(values.tobytes()).decode()
+
+
+def _unpack(typecode: str, packed: str) -> array:
+    """Return an array packed with _pack()."""
+    values = array(typecode, base64.b64decode(packed))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+_EMPTY_SERIES = PriceSeries()
+EMPTY_COMPUTATION = PriceComputation(
+    None, _EMPTY_SERIES, EMPTY_ANALYSIS, PriceSolver(_EMPTY_SERIES)
+)
+
+
+def price_fingerprint(data: dict) -> tuple[int, int]:
+    """Return a cheap fingerprint of the price arrays in a Nordpool snapshot."""
+    attributes = data.get("attributes") or data
+    slots = tuple(
+        (slot.get("start"), slot.get("value"))
+        for attribute in PRICE_ATTRIBUTES
+        for slot in attributes.get(attribute) or ()
+    )
+    return len(slots), hash(slots)
+
+
+def compute(
+    data: dict,
+    fingerprint: tuple[int, int] | None = None,
+    profiles: Iterable[Profile] = (),
+) -> PriceComputation:
+    """Parse and analyse a Nordpool snapshot and derive what profiles need."""
+    attributes = data.get("attributes") or data
+    series = PriceSeries.from_raw(
+        *(attributes.get(attribute) for attribute in PRICE_ATTRIBUTES)
+    )
+    computation = PriceComputation(
+        fingerprint if fingerprint is not None else price_fingerprint(data),
+        series,
+        analyze(series.values, series.resolution),
+        PriceSolver(series),
+    )
+    computation.solve(profiles)
+    return computation
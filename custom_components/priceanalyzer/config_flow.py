@@ -4,20 +4,248 @@ from __future__ import annotations
 
 import voluptuous as vol
 from homeassistant import config_entries, data_entry_flow
-from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.const import CONF_ENTITY_ID
+from homeassistant.core import callback
 from homeassistant.helpers import selector
-from homeassistant.helpers.aiohttp_client import async_create_clientsession
 
-from .api import (
-    IntegrationBlueprintApiClient,
-    IntegrationBlueprintApiClientAuthenticationError,
-    IntegrationBlueprintApiClientCommunicationError,
-    IntegrationBlueprintApiClientError,
+from .api import IntegrationBlueprintApiClient, IntegrationBlueprintApiClientError
+from .const import (
+    ATTRIBUTE_MODES,
+    CONF_AREAS,
+    CONF_ATTRIBUTE_MODE,
+    CONF_COMFORT_BAND,
+    CONF_DEBUG_SENSORS,
+    CONF_HEATER_MAX_OFF_HOURS,
+    CONF_HEATER_SHARE,
+    CONF_MAX_BOOST_HOURS,
+    CONF_MAX_OFF_HOURS,
+    CONF_MAX_OFFSET,
+    CONF_PAYLOAD_BUDGET,
+    CONF_REFRESH_WINDOW,
+    CONF_SLOW_THRESHOLD,
+    CONF_SURCHARGE,
+    CONF_TARIFF_DAY,
+    CONF_TARIFF_DAY_END,
+    CONF_TARIFF_DAY_START,
+    CONF_TARIFF_NIGHT,
+    CONF_VAT,
+    DEFAULT_ATTRIBUTE_MODE,
+    DEFAULT_COMFORT_BAND,
+    DEFAULT_DEBUG_SENSORS,
+    DEFAULT_HEATER_MAX_OFF_HOURS,
+    DEFAULT_HEATER_SHARE,
+    DEFAULT_MAX_BOOST_HOURS,
+    DEFAULT_MAX_OFF_HOURS,
+    DEFAULT_MAX_OFFSET,
+    DEFAULT_PAYLOAD_BUDGET,
+    DEFAULT_REFRESH_WINDOW,
+    DEFAULT_SLOW_THRESHOLD,
+    DEFAULT_TARIFF_DAY_END,
+    DEFAULT_TARIFF_DAY_START,
+    DOMAIN,
+    LOGGER,
 )
-from .const import DOMAIN, LOGGER
 
-from homeassistant.const import CONF_ENTITY_ID
-from homeassistant.helpers import selector
+OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(
+            CONF_ATTRIBUTE_MODE, default=DEFAULT_ATTRIBUTE_MODE
+        ): selector.SelectSelector(
+            selector.SelectSelectorConfig(
+                options=ATTRIBUTE_MODES,
+                translation_key=CONF_ATTRIBUTE_MODE,
+                mode=selector.SelectSelectorMode.DROPDOWN,
+            )
+        ),
+        vol.Optional(CONF_PAYLOAD_BUDGET, default=DEFAULT_PAYLOAD_BUDGET): vol.All(
+            selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0,
+                    step=1,
+                    mode=selector.NumberSelectorMode.BOX,
+                    unit_of_measurement="B",
+                )
+            ),
+            vol.Coerce(int),
+        ),
+        vol.Optional(CONF_SLOW_THRESHOLD, default=DEFAULT_SLOW_THRESHOLD): vol.All(
+            selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=1,
+                    step=1,
+                    mode=selector.NumberSelectorMode.BOX,
+                    unit_of_measurement="ms",
+                )
+            ),
+            vol.Coerce(int),
+        ),
+        vol.Optional(CONF_REFRESH_WINDOW, default=DEFAULT_REFRESH_WINDOW): vol.All(
+            selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0,
+                    max=60,
+                    step=0.1,
+                    mode=selector.NumberSelectorMode.BOX,
+                    unit_of_measurement="s",
+                )
+            ),
+            vol.Coerce(float),
+        ),
+        vol.Optional(CONF_MAX_OFFSET, default=DEFAULT_MAX_OFFSET): vol.All(
+            selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0,
+                    max=5,
+                    step=1,
+                    mode=selector.NumberSelectorMode.BOX,
+                    unit_of_measurement="°",
+                )
+            ),
+            vol.Coerce(int),
+        ),
+        vol.Optional(CONF_COMFORT_BAND, default=DEFAULT_COMFORT_BAND): vol.All(
+            selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0,
+                    max=6,
+                    step=0.25,
+                    mode=selector.NumberSelectorMode.BOX,
+                    unit_of_measurement="°h",
+                )
+            ),
+            vol.Coerce(float),
+        ),
+        vol.Optional(CONF_MAX_OFF_HOURS, default=DEFAULT_MAX_OFF_HOURS): vol.All(
+            selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0,
+                    max=12,
+                    step=0.25,
+                    mode=selector.NumberSelectorMode.BOX,
+                    unit_of_measurement="h",
+                )
+            ),
+            vol.Coerce(float),
+        ),
+        vol.Optional(CONF_MAX_BOOST_HOURS, default=DEFAULT_MAX_BOOST_HOURS): vol.All(
+            selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0,
+                    max=12,
+                    step=0.25,
+                    mode=selector.NumberSelectorMode.BOX,
+                    unit_of_measurement="h",
+                )
+            ),
+            vol.Coerce(float),
+        ),
+        vol.Optional(CONF_HEATER_SHARE, default=DEFAULT_HEATER_SHARE): vol.All(
+            selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0,
+                    max=100,
+                    step=1,
+                    mode=selector.NumberSelectorMode.BOX,
+                    unit_of_measurement="%",
+                )
+            ),
+            vol.Coerce(float),
+        ),
+        vol.Optional(
+            CONF_HEATER_MAX_OFF_HOURS, default=DEFAULT_HEATER_MAX_OFF_HOURS
+        ): vol.All(
+            selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0,
+                    max=24,
+                    step=0.25,
+                    mode=selector.NumberSelectorMode.BOX,
+                    unit_of_measurement="h",
+                )
+            ),
+            vol.Coerce(float),
+        ),
+        vol.Optional(CONF_TARIFF_DAY, default=0.0): vol.All(
+            selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0,
+                    step="any",
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+            vol.Coerce(float),
+        ),
+        vol.Optional(CONF_TARIFF_NIGHT, default=0.0): vol.All(
+            selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0,
+                    step="any",
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+            vol.Coerce(float),
+        ),
+        vol.Optional(CONF_TARIFF_DAY_START, default=DEFAULT_TARIFF_DAY_START): vol.All(
+            selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0,
+                    max=24,
+                    step=1,
+                    mode=selector.NumberSelectorMode.BOX,
+                    unit_of_measurement="h",
+                )
+            ),
+            vol.Coerce(int),
+        ),
+        vol.Optional(CONF_TARIFF_DAY_END, default=DEFAULT_TARIFF_DAY_END): vol.All(
+            selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0,
+                    max=24,
+                    step=1,
+                    mode=selector.NumberSelectorMode.BOX,
+                    unit_of_measurement="h",
+                )
+            ),
+            vol.Coerce(int),
+        ),
+        vol.Optional(CONF_SURCHARGE, default=0.0): vol.All(
+            selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0,
+                    step="any",
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+            vol.Coerce(float),
+        ),
+        vol.Optional(CONF_VAT, default=0.0): vol.All(
+            selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0,
+                    max=100,
+                    step="any",
+                    mode=selector.NumberSelectorMode.BOX,
+                    unit_of_measurement="%",
+                )
+            ),
+            vol.Coerce(float),
+        ),
+        vol.Optional(
+            CONF_DEBUG_SENSORS, default=DEFAULT_DEBUG_SENSORS
+        ): selector.BooleanSelector(),
+    }
+)
+# Entries comparing several areas only have the options of their refreshes.
+AREA_OPTIONS_SCHEMA = vol.Schema(
+    {
+        key: value
+        for key, value in OPTIONS_SCHEMA.schema.items()
+        if key in (CONF_SLOW_THRESHOLD, CONF_REFRESH_WINDOW)
+    }
+)
+# Fewest entities an entry comparing areas reads.
+MIN_AREAS = 2
 
 
 class BlueprintFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
@@ -25,11 +253,26 @@ class BlueprintFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Return the options flow."""
+        return PriceAnalyzerOptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self,
-        user_input: dict | None = None,
+        user_input: dict | None = None,  # noqa: ARG002 Unused method argument: `user_input`
     ) -> data_entry_flow.FlowResult:
         """Handle a flow initialized by the user."""
+        return self.async_show_menu(step_id="user", menu_options=["area", "areas"])
+
+    async def async_step_area(
+        self,
+        user_input: dict | None = None,
+    ) -> data_entry_flow.FlowResult:
+        """Set up the analysis of one Nordpool entity."""
         _errors = {}
         if user_input is not None:
             try:
@@ -44,7 +287,7 @@ class BlueprintFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                 )
 
         return self.async_show_form(
-            step_id="user",
+            step_id="area",
             data_schema=vol.Schema(
                 {
                     vol.Required(CONF_ENTITY_ID): selector.EntitySelector(
@@ -56,12 +299,69 @@ class BlueprintFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             errors=_errors,
         )
 
+    async def async_step_areas(
+        self,
+        user_input: dict | None = None,
+    ) -> data_entry_flow.FlowResult:
+        """Set up the comparison of several Nordpool entities."""
+        _errors = {}
+        if user_input is not None:
+            entity_ids = user_input[CONF_AREAS]
+            try:
+                for entity_id in entity_ids:
+                    await self._test_entity(entity_id)
+            except IntegrationBlueprintApiClientError as exception:
+                LOGGER.exception(exception)
+                _errors["base"] = "unknown"
+            else:
+                if len(entity_ids) < MIN_AREAS:
+                    _errors[CONF_AREAS] = "too_few_areas"
+                else:
+                    return self.async_create_entry(
+                        title=", ".join(entity_ids),
+                        data=user_input,
+                    )
+
+        return self.async_show_form(
+            step_id="areas",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_AREAS): selector.EntitySelector(
+                        selector.EntitySelectorConfig(multiple=True)
+                    )
+                },
+            ),
+            errors=_errors,
+        )
+
     async def _test_entity(self, entity_id: str) -> None:
         """Validate the entity selection."""
         # If needed, implement any checks for the entity here, or remove this if it's not required.
-        client = IntegrationBlueprintApiClient(
-            entity_id=entity_id,
-            session=async_create_clientsession(self.hass),
-            hass=self.hass,
-        )
+        client = IntegrationBlueprintApiClient(entity_id=entity_id, hass=self.hass)
         await client.async_get_data()
+
+
+class PriceAnalyzerOptionsFlowHandler(config_entries.OptionsFlow):
+    """Options flow for priceanalyzer."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self,
+        user_input: dict | None = None,
+    ) -> data_entry_flow.FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                AREA_OPTIONS_SCHEMA
+                if CONF_AREAS in self.config_entry.data
+                else OPTIONS_SCHEMA,
+                self.config_entry.options,
+            ),
+        )
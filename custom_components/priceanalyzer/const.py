@@ -6,3 +6,79 @@ LOGGER: Logger = getLogger(__package__)
 
 DOMAIN = "priceanalyzer"
 ATTRIBUTION = "Data provided by Nordpool"
+
+# Nordpool entities an entry comparing several areas reads; entries without
+# it read the one entity of CONF_ENTITY_ID.
+CONF_AREAS = "areas"
+
+# Nordpool attributes the computed plan is derived from.
+PRICE_ATTRIBUTES = ("raw_today", "raw_tomorrow")
+
+# Duration, in seconds, of the cheapest window and slots exposed as attributes.
+CHEAPEST_DURATION = 3 * 3600
+
+# Attribute formats for the per-slot detail of today and tomorrow.
+CONF_ATTRIBUTE_MODE = "attribute_mode"
+ATTRIBUTE_MODE_FULL = "full"
+ATTRIBUTE_MODE_COMPACT = "compact"
+ATTRIBUTE_MODE_VALUES = "values"
+ATTRIBUTE_MODES = [ATTRIBUTE_MODE_FULL, ATTRIBUTE_MODE_COMPACT, ATTRIBUTE_MODE_VALUES]
+DEFAULT_ATTRIBUTE_MODE = ATTRIBUTE_MODE_FULL
+
+# Serialized attribute size, in bytes, above which a warning is logged (0 = off).
+# Today and tomorrow in the full format take about 33 KB at 15 minutes, 100
+# slots on the long DST day included, and about 95 KB at 5 minutes.
+CONF_PAYLOAD_BUDGET = "payload_budget"
+DEFAULT_PAYLOAD_BUDGET = 49152
+
+# Event-loop-blocking sections longer than this, in milliseconds, are logged.
+CONF_SLOW_THRESHOLD = "slow_threshold"
+DEFAULT_SLOW_THRESHOLD = 20
+
+# Seconds during which source changes are merged into one refresh; also the
+# longest a change waits before it is computed.
+CONF_REFRESH_WINDOW = "refresh_window"
+DEFAULT_REFRESH_WINDOW = 2
+
+# Days of stored price history the current price is compared against.
+HISTORY_DAYS = (30, 365)
+
+# Share of the rolling window's cheapest prices a slot must fall in to be cheap.
+CHEAP_SHARE = 0.2
+
+# Limits of the heating schedule optimizer: the largest offset in degrees, the
+# heat the house may run ahead or behind in degree-hours, and the longest runs
+# of lowered and raised temperature in hours.
+CONF_MAX_OFFSET = "max_offset"
+DEFAULT_MAX_OFFSET = 1
+CONF_COMFORT_BAND = "comfort_band"
+DEFAULT_COMFORT_BAND = 2.0
+CONF_MAX_OFF_HOURS = "max_off_hours"
+DEFAULT_MAX_OFF_HOURS = 3.0
+CONF_MAX_BOOST_HOURS = "max_boost_hours"
+DEFAULT_MAX_BOOST_HOURS = 3.0
+
+# Water heater plan: the share of each day's cheapest slots, in percent, the
+# heater is on for and the longest it may stay off in hours (0 = no limit).
+CONF_HEATER_SHARE = "heater_share"
+DEFAULT_HEATER_SHARE = 25.0
+CONF_HEATER_MAX_OFF_HOURS = "heater_max_off_hours"
+DEFAULT_HEATER_MAX_OFF_HOURS = 6.0
+# Sent with the entry id when a water heater plan is enabled or disabled.
+SIGNAL_HEATER_ENABLED = f"{DOMAIN}_heater_enabled_{{}}"
+
+# Grid tariff per kWh in the day hours of workdays and at night, on weekends
+# and holidays, the local hours of the day rate, a fixed surcharge per kWh
+# and VAT in percent. All zero leaves the spot price as it is.
+CONF_TARIFF_DAY = "tariff_day"
+CONF_TARIFF_NIGHT = "tariff_night"
+CONF_TARIFF_DAY_START = "tariff_day_start"
+DEFAULT_TARIFF_DAY_START = 6
+CONF_TARIFF_DAY_END = "tariff_day_end"
+DEFAULT_TARIFF_DAY_END = 22
+CONF_SURCHARGE = "surcharge"
+CONF_VAT = "vat"
+
+# Whether the instrumentation sensors are created; off keeps startup lean.
+CONF_DEBUG_SENSORS = "debug_sensors"
+DEFAULT_DEBUG_SENSORS = False
@@ -2,47 +2,594 @@
 
 from __future__ import annotations
 
+import asyncio
+import time
 from datetime import timedelta
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
+from homeassistant.core import CALLBACK_TYPE, Event, EventStateChangedData, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import (
+    async_track_point_in_utc_time,
+    async_track_state_change_event,
+)
+from homeassistant.helpers.storage import STORAGE_DIR, Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
 from .api import (
+    IntegrationBlueprintApiClient,
     IntegrationBlueprintApiClientAuthenticationError,
     IntegrationBlueprintApiClientError,
 )
-from .const import DOMAIN, LOGGER
+from .areas import EMPTY_COMPARISON, AreaComparison, compare_areas
+from .computation import PriceComputation, price_fingerprint
+from .const import (
+    DEFAULT_REFRESH_WINDOW,
+    DOMAIN,
+    HISTORY_DAYS,
+    LOGGER,
+    PRICE_ATTRIBUTES,
+)
+from .instrumentation import Instrumentation
+from .refresh import NoPricesError, PriceRefresh
+from .rolling import RollingStats
+from .series import SECONDS_PER_DAY
 
 if TYPE_CHECKING:
-    from homeassistant.core import HomeAssistant
+    from collections.abc import Callable, Sequence
+    from datetime import datetime
+
+    from homeassistant.core import HomeAssistant, State
+
+    from .analysis import Analysis
+    from .computation import Profile
+    from .history import PriceHistory, Span, Views
+    from .series import PriceSeries
+    from .solver import PriceSolver
+
+
+ROLLING_STORAGE_VERSION = 1
+# Seconds to wait before writing the rolling statistics after a new day.
+ROLLING_SAVE_DELAY = 30
+SNAPSHOT_STORAGE_VERSION = 1
+# Seconds to wait before writing the last good snapshot after new prices.
+SNAPSHOT_SAVE_DELAY = 10
+
+
+def _price_attributes(state: State | None) -> tuple[Any, ...] | None:
+    """Return the attributes of a Nordpool state that the plan depends on."""
+    if state is None:
+        return None
+    return tuple(state.attributes.get(attribute) for attribute in PRICE_ATTRIBUTES)
+
+
+def _source_attributes(source: BlueprintDataUpdateCoordinator) -> dict[str, Any]:
+    """Return the attributes of the last state of a source entity."""
+    data = source.data or {}
+    return data.get("attributes") or data
 
-    from .data import IntegrationBlueprintConfigEntry
+
+def _open_history(path: Path, resolution: int) -> tuple[PriceHistory, Views]:
+    """Import the history store and open a file, in the executor."""
+    from .history import PriceHistory
+
+    history = PriceHistory(path, resolution)
+    return history, history.open()
 
 
 # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
 class BlueprintDataUpdateCoordinator(DataUpdateCoordinator):
-    """Class to manage fetching data from the API."""
+    """
+    Class to manage fetching data from the Nordpool entity.
 
-    config_entry: IntegrationBlueprintConfigEntry
+    One coordinator is shared by every config entry reading the same entity,
+    see registry.SourceRegistry, so it is not bound to a single entry.
+    """
 
     def __init__(
         self,
         hass: HomeAssistant,
+        client: IntegrationBlueprintApiClient,
     ) -> None:
         """Initialize."""
+        # Not immediate: the first change of a burst opens a window that the
+        # following changes join, and one refresh runs when it closes.
+        debouncer = Debouncer(
+            hass, LOGGER, cooldown=DEFAULT_REFRESH_WINDOW, immediate=False
+        )
+        # No update_interval: refreshes are pushed by the source entity.
+        # always_update=False skips listeners when the same data is returned.
         super().__init__(
             hass=hass,
             logger=LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(hours=1),
+            request_refresh_debouncer=debouncer,
+            always_update=False,
+        )
+        self._refresh_debouncer = debouncer
+        # Serializes refreshes; the warm start's do not go through the debouncer.
+        self._refresh_lock = asyncio.Lock()
+        # Source changes not yet picked up by a refresh.
+        self._pending_changes = 0
+        self.config_entry = None
+        self.client = client
+        self.entity_id = client.entity_id
+        self.object_id = client.entity_id.split(".", 1)[1]
+        # Refresh and computation timings, shared by every entry of the source.
+        self.instrumentation = Instrumentation()
+        # Fetch, fingerprint and compute, the sequence the offline replay runs.
+        self.price_refresh = PriceRefresh(
+            client,
+            self.instrumentation,
+            run_blocking=hass.async_add_executor_job,
+            store=self._async_store,
+            superseded=self._superseded,
+        )
+        # On-disk history at the current resolution, opened on the first data.
+        self.history: PriceHistory | None = None
+        # Statistics over the last 30 days, updated once per new day.
+        self.rolling = RollingStats()
+        self._rolling_store: Store[dict[str, Any]] = Store(
+            hass, ROLLING_STORAGE_VERSION, f"{DOMAIN}.{self.object_id}.rolling"
+        )
+        self._rolling_loaded = False
+        # Last good source snapshot and computation, for warm restarts.
+        self._snapshot_store: Store[dict[str, Any]] = Store(
+            hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{self.object_id}.snapshot"
+        )
+        self._current_index: int | None = None
+        # Timer for the next slot boundary, armed while the coordinator runs.
+        self._slot_timer: CALLBACK_TYPE | None = None
+        self._slot_boundary: int | None = None
+        self._started = False
+        # Background refresh after a warm start, cancelled on shutdown.
+        self._revalidation: asyncio.Task | None = None
+        # Summarizes today's history windows when no refresh did.
+        self._summarizing: asyncio.Task | None = None
+        # Stores this coordinator saves to with a delay, and their data; each
+        # is written out on shutdown so no delayed save lands after it.
+        self._unsaved: dict[Store[dict[str, Any]], Callable[[], dict[str, Any]]] = {}
+
+    @property
+    def refresh_window(self) -> float:
+        """Return the seconds during which source changes are merged."""
+        return self._refresh_debouncer.cooldown
+
+    @refresh_window.setter
+    def refresh_window(self, seconds: float) -> None:
+        """Set the seconds during which source changes are merged."""
+        self._refresh_debouncer.cooldown = seconds
+
+    @property
+    def computation(self) -> PriceComputation:
+        """Return the computation of the current prices."""
+        return self.price_refresh.computation
+
+    @property
+    def profiles(self) -> frozenset[Profile]:
+        """Return the profiles of the entries, maintained by registry.SharedSource."""
+        return self.price_refresh.profiles
+
+    @profiles.setter
+    def profiles(self, profiles: frozenset[Profile]) -> None:
+        """Set the profiles derived with the prices, in the executor."""
+        self.price_refresh.profiles = profiles
+
+    @property
+    def fingerprint(self) -> tuple[int, int] | None:
+        """Return the fingerprint of the current prices."""
+        return self.computation.fingerprint
+
+    @property
+    def series(self) -> PriceSeries:
+        """Return the parsed prices."""
+        return self.computation.series
+
+    @property
+    def analysis(self) -> Analysis:
+        """Return the analysis of the current prices."""
+        return self.computation.analysis
+
+    @property
+    def solver(self) -> PriceSolver:
+        """Return the cheapest window solver for the current prices."""
+        return self.computation.solver
+
+    async def async_warm_start(self) -> None:
+        """Publish the stored snapshot, then revalidate it in the background."""
+        if not await self.async_restore():
+            await self.async_refresh()
+            return
+        # Entities start from the stored plan; the source may not exist yet,
+        # in which case the refresh keeps the snapshot until it shows up.
+        self._revalidation = self.hass.async_create_background_task(
+            self.async_refresh(), f"{DOMAIN} revalidate {self.entity_id}"
+        )
+
+    async def async_shutdown(self) -> None:
+        """Stop refreshing, let a running refresh finish and write pending saves."""
+        await super().async_shutdown()
+        if self._revalidation is not None:
+            self._revalidation.cancel()
+        if self._summarizing is not None:
+            self._summarizing.cancel()
+        # A refresh past its fetch sees the shutdown and discards its result.
+        async with self._refresh_lock:
+            pass
+        unsaved, self._unsaved = self._unsaved, {}
+        for store, data_func in unsaved.items():
+            await store.async_save(data_func())
+
+    @callback
+    def _async_delay_save(
+        self,
+        store: Store[dict[str, Any]],
+        data_func: Callable[[], dict[str, Any]],
+        delay: float,
+    ) -> None:
+        """Schedule a store write, remembered until the coordinator shuts down."""
+        self._unsaved[store] = data_func
+        store.async_delay_save(data_func, delay)
+
+    async def async_restore(self) -> bool:
+        """Load the last good snapshot and computation from storage."""
+        stored = await self._snapshot_store.async_load()
+        if not stored:
+            return False
+        try:
+            data = stored["source"]
+            computation = PriceComputation.from_dict(
+                stored["computation"], price_fingerprint(data)
+            )
+        except (KeyError, TypeError, ValueError) as exception:
+            LOGGER.warning(
+                "Discarding stored snapshot of %s: %s", self.entity_id, exception
+            )
+            return False
+        self.instrumentation.count("restored")
+        await self.async_solve(computation)
+        await self._async_store(computation.series)
+        self.price_refresh.publish(data, computation)
+        self.async_set_updated_data(data)
+        return True
+
+    async def async_solve(self, computation: PriceComputation) -> None:
+        """Derive what the profiles miss from a computation, in the executor."""
+        missing = [
+            profile for profile in self.profiles if not computation.solved(profile)
+        ]
+        if missing:
+            with self.instrumentation.timed("solve", blocking=False):
+                await self.hass.async_add_executor_job(computation.solve, missing)
+
+    def _snapshot(self) -> dict[str, Any]:
+        """Return the data written to the snapshot store."""
+        return {"source": self.data, "computation": self.computation.as_dict()}
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Subscribe to the source entity and the slot boundaries."""
+        unsubscribe = async_track_state_change_event(
+            self.hass, [self.entity_id], self._async_source_changed
         )
+        self._started = True
+        self._async_schedule_slot_tick()
+
+        @callback
+        def _async_stop() -> None:
+            unsubscribe()
+            self._started = False
+            self._async_cancel_slot_tick()
+
+        return _async_stop
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Re-arm the slot timer for the current prices, then update listeners."""
+        self._async_schedule_slot_tick()
+        super().async_update_listeners()
+
+    @callback
+    def _async_schedule_slot_tick(self, now: float | None = None) -> None:
+        """Arm one timer for the next slot boundary; all entries share it."""
+        if not self._started:
+            return
+        boundary = self.series.next_boundary(time.time() if now is None else now)
+        if boundary == self._slot_boundary:
+            return
+        self._async_cancel_slot_tick()
+        if boundary is not None:
+            self._slot_boundary = boundary
+            self._slot_timer = async_track_point_in_utc_time(
+                self.hass, self._async_slot_tick, dt_util.utc_from_timestamp(boundary)
+            )
+
+    @callback
+    def _async_cancel_slot_tick(self) -> None:
+        """Cancel the slot timer."""
+        if self._slot_timer is not None:
+            self._slot_timer()
+        self._slot_timer = self._slot_boundary = None
+
+    @callback
+    def _async_source_changed(self, event: Event[EventStateChangedData]) -> None:
+        """Refresh when the price arrays of the source entity change."""
+        new_state = event.data["new_state"]
+        if new_state is None:
+            return
+        # Nordpool rewrites current_price every hour; only the arrays matter.
+        if _price_attributes(event.data["old_state"]) == _price_attributes(new_state):
+            return
+        self.instrumentation.count("source_change")
+        self._pending_changes += 1
+        self._refresh_debouncer.async_schedule_call()
+
+    @callback
+    def _async_slot_tick(self, now: datetime) -> None:
+        """Let entities move to the new slot without fetching or recomputing."""
+        self._slot_timer = self._slot_boundary = None
+        timestamp = now.timestamp()
+        self._async_schedule_slot_tick(timestamp)
+        index = self.series.index_at(timestamp)
+        if index is None or index != self._current_index:
+            self._current_index = index
+            # Entities only compare against cached history summaries; a day
+            # without new prices has none yet, so summarize it meanwhile.
+            if (
+                self.history is not None
+                and (self._summarizing is None or self._summarizing.done())
+                and not all(map(self.history.cached, self._history_spans(days=1)))
+            ):
+                self._summarizing = self.hass.async_create_background_task(
+                    self._async_summarize_today(),
+                    f"{DOMAIN} summarize {self.entity_id}",
+                )
+            # Every entity of the source writes its state in this call.
+            with self.instrumentation.timed("slot_tick"):
+                super().async_update_listeners()
 
     async def _async_update_data(self) -> Any:
         """Update data via library."""
+        with self.instrumentation.timed("refresh", blocking=False):
+            async with self._refresh_lock:
+                while True:
+                    changes, self._pending_changes = self._pending_changes, 0
+                    if changes > 1:
+                        self.instrumentation.count("coalesced", changes - 1)
+                    data = await self._async_fetch_and_compute()
+                    # The debouncer drops calls while it runs a refresh, so
+                    # changes that arrived meanwhile are picked up here.
+                    if not self._pending_changes or self._shutdown_requested:
+                        return data
+
+    async def _async_fetch_and_compute(self) -> Any:
+        """Fetch the source state and recompute when the prices changed."""
         try:
-            return await self.config_entry.runtime_data.client.async_get_data()
+            data = await self.price_refresh.async_refresh()
         except IntegrationBlueprintApiClientAuthenticationError as exception:
             raise ConfigEntryAuthFailed(exception) from exception
         except IntegrationBlueprintApiClientError as exception:
             raise UpdateFailed(exception) from exception
+        except NoPricesError as exception:
+            # No prices yet, e.g. during startup: keep the last good snapshot,
+            # and without one fail so the entry's setup is retried.
+            if self.data:
+                return self.data
+            raise UpdateFailed(exception) from exception
+        if data is None:
+            # Same prices, or superseded: keep the previous object so entities
+            # keep their plan.
+            return self.data
+        self._async_delay_save(
+            self._snapshot_store, self._snapshot, SNAPSHOT_SAVE_DELAY
+        )
+        return data
+
+    def _superseded(self) -> bool:
+        """Return whether newer prices arrived or the source was released."""
+        return bool(self._pending_changes or self._shutdown_requested)
+
+    async def _async_store(self, series: PriceSeries) -> None:
+        """Store the history and rolling statistics of new prices."""
+        await self._async_store_history(series)
+        await self._async_update_rolling(series)
+
+    async def _async_store_history(self, series: PriceSeries) -> None:
+        """Append slots newer than the stored history and sort its windows."""
+        if not len(series):
+            return
+        history = self.history
+        try:
+            if history is None or history.resolution != series.resolution:
+                # One file per source entity, which names the area, and resolution.
+                history, views = await self.hass.async_add_executor_job(
+                    _open_history,
+                    Path(
+                        self.hass.config.path(
+                            STORAGE_DIR,
+                            DOMAIN,
+                            f"{self.object_id}_{series.resolution}.bin",
+                        )
+                    ),
+                    series.resolution,
+                )
+                history.publish(views)
+                self.history = history
+            last = history.last_start
+            if last is None or series.starts[-1] > last:
+                added = await self.hass.async_add_executor_job(
+                    history.append, series.starts, series.values
+                )
+                if added:
+                    views = await self.hass.async_add_executor_job(history.map)
+                    history.publish(views)
+                    self.instrumentation.count("history_slots", added)
+            # Tomorrow's windows too, so the first state write of a day finds
+            # them cached.
+            await self._async_summarize_history(history, self._history_spans(days=2))
+        except (OSError, ValueError) as exception:
+            # History is an extra; the live prices keep working without it.
+            LOGGER.warning("Could not store price history: %s", exception)
+
+    def _history_spans(self, days: int) -> list[Span]:
+        """Return the history windows entities compare against, for `days` days."""
+        spans = []
+        day = dt_util.now().date()
+        for offset in range(days):
+            until = dt_util.start_of_local_day(day + timedelta(days=offset)).timestamp()
+            spans.extend(
+                (until - window * SECONDS_PER_DAY, until) for window in HISTORY_DAYS
+            )
+        return spans
+
+    async def _async_summarize_history(
+        self, history: PriceHistory, spans: list[Span]
+    ) -> bool:
+        """
+        Summarize the history windows not cached yet, in the executor.
+
+        Entities only read cached summaries, so the memory map is read and
+        sorted here instead of on the event loop. Return whether any was added.
+        """
+        if missing := [span for span in spans if not history.cached(span)]:
+            history.cache_summaries(
+                await self.hass.async_add_executor_job(history.summarize, missing)
+            )
+        return bool(missing)
+
+    async def _async_summarize_today(self) -> None:
+        """Summarize today's history windows, then let entities show them."""
+        # A refresh appending meanwhile would clear the summaries again.
+        async with self._refresh_lock:
+            if self.history is None or self._shutdown_requested:
+                return
+            try:
+                added = await self._async_summarize_history(
+                    self.history, self._history_spans(days=1)
+                )
+            except (OSError, ValueError) as exception:
+                LOGGER.warning("Could not summarize price history: %s", exception)
+                return
+        if added and not self._shutdown_requested:
+            super().async_update_listeners()
+
+    async def _async_update_rolling(self, series: PriceSeries) -> None:
+        """Add new days to the rolling statistics and schedule a save."""
+        if not self._rolling_loaded:
+            self._rolling_loaded = True
+            if stored := await self._rolling_store.async_load():
+                try:
+                    self.rolling = RollingStats.from_dict(stored)
+                except (KeyError, TypeError, ValueError):
+                    LOGGER.warning("Discarding invalid rolling statistics")
+        with self.instrumentation.timed("rolling"):
+            added = self.rolling.ingest(series)
+        if added:
+            self._async_delay_save(
+                self._rolling_store, self.rolling.as_dict, ROLLING_SAVE_DELAY
+            )
+
+
+class AreaDataUpdateCoordinator(DataUpdateCoordinator[AreaComparison]):
+    """
+    Class to compare the prices of several Nordpool entities.
+
+    Every area is read through the shared coordinator of its entity, so its
+    prices are fetched and parsed once whatever else uses them; this one
+    only aligns and compares the parsed series.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        sources: Sequence[BlueprintDataUpdateCoordinator],
+    ) -> None:
+        """Initialize."""
+        # Areas usually publish together; one comparison follows the burst.
+        debouncer = Debouncer(
+            hass, LOGGER, cooldown=DEFAULT_REFRESH_WINDOW, immediate=False
+        )
+        super().__init__(
+            hass=hass,
+            logger=LOGGER,
+            name=DOMAIN,
+            request_refresh_debouncer=debouncer,
+            always_update=False,
+        )
+        self._refresh_debouncer = debouncer
+        self.config_entry = None
+        self.sources = tuple(sources)
+        self.comparison = EMPTY_COMPARISON
+        self.instrumentation = Instrumentation()
+        # Fingerprints of the prices the comparison was made from.
+        self._fingerprints: tuple[tuple[int, int] | None, ...] = ()
+        self._current_index: int | None = None
+
+    @property
+    def areas(self) -> tuple[str, ...]:
+        """Return the label of every area: its Nordpool region, else its entity."""
+        return tuple(
+            _source_attributes(source).get("region") or source.entity_id
+            for source in self.sources
+        )
+
+    @property
+    def unit(self) -> str | None:
+        """Return the unit of the prices, or None when the areas differ."""
+        units = {
+            _source_attributes(source).get("unit_of_measurement")
+            for source in self.sources
+        }
+        return units.pop() if len(units) == 1 else None
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Follow the source coordinators."""
+        removers = [
+            source.async_add_listener(self._async_source_updated)
+            for source in self.sources
+        ]
+
+        @callback
+        def _async_stop() -> None:
+            for remove in removers:
+                remove()
+            # A comparison queued by the last source change never runs.
+            self._refresh_debouncer.async_shutdown()
+
+        return _async_stop
+
+    @callback
+    def _async_source_updated(self) -> None:
+        """Compare new prices; pass slot ticks of the sources on once."""
+        if self._fingerprints != self._source_fingerprints():
+            self._refresh_debouncer.async_schedule_call()
+            return
+        # Sources tick at the same boundaries; only the first one moves us.
+        index = self.comparison.index_at(time.time())
+        if index != self._current_index:
+            self._current_index = index
+            self.async_update_listeners()
+
+    def _source_fingerprints(self) -> tuple[tuple[int, int] | None, ...]:
+        """Return the fingerprints of the current prices of the sources."""
+        return tuple(source.fingerprint for source in self.sources)
+
+    async def _async_update_data(self) -> AreaComparison:
+        """Align and compare the current prices of the areas."""
+        fingerprints = self._source_fingerprints()
+        if fingerprints == self._fingerprints:
+            return self.comparison
+        with self.instrumentation.timed("compare", blocking=False):
+            comparison = await self.hass.async_add_executor_job(
+                compare_areas,
+                self.areas,
+                [source.series for source in self.sources],
+            )
+        self._fingerprints = fingerprints
+        self._current_index = comparison.index_at(time.time())
+        self.comparison = comparison
+        return comparison
@@ -2,18 +2,25 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry
+    from homeassistant.const import Platform
     from homeassistant.loader import Integration
 
     from .api import IntegrationBlueprintApiClient
-    from .coordinator import BlueprintDataUpdateCoordinator
+    from .computation import Profile
+    from .coordinator import (
+        AreaDataUpdateCoordinator,
+        BlueprintDataUpdateCoordinator,
+    )
+    from .instrumentation import Instrumentation
 
 
 type IntegrationBlueprintConfigEntry = ConfigEntry[IntegrationBlueprintData]
+type AreaConfigEntry = ConfigEntry[AreaEntryData]
 
 
 @dataclass
@@ -23,3 +30,20 @@ class IntegrationBlueprintData:
     client: IntegrationBlueprintApiClient
     coordinator: BlueprintDataUpdateCoordinator
     integration: Integration
+    instrumentation: Instrumentation
+    # Tariff and schedule limits the entry derives from the shared prices.
+    profile: Profile
+    # Platforms set up so far; some are deferred until Home Assistant started.
+    platforms: list[Platform] = field(default_factory=list)
+    # Whether the water heater plan drives the binary sensor; set by the switch.
+    heater_enabled: bool = True
+
+
+@dataclass
+class AreaEntryData:
+    """Data of an entry comparing several areas."""
+
+    coordinator: AreaDataUpdateCoordinator
+    integration: Integration
+    instrumentation: Instrumentation
+    platforms: list[Platform] = field(default_factory=list)
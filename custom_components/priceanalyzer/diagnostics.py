@@ -0,0 +1,65 @@
+"""Diagnostics support for priceanalyzer."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from .const import CONF_AREAS
+from .registry import async_get_registry
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .data import AreaConfigEntry, IntegrationBlueprintConfigEntry
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant,
+    entry: IntegrationBlueprintConfigEntry,
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    if CONF_AREAS in entry.data:
+        return _area_diagnostics(entry)
+    coordinator = entry.runtime_data.coordinator
+    return {
+        "entity_id": coordinator.entity_id,
+        "shared_with_entries": len(
+            async_get_registry(hass).sources[coordinator.entity_id].entry_ids
+        ),
+        "last_update_success": coordinator.last_update_success,
+        "fingerprint": coordinator.fingerprint,
+        "solver_cache": {
+            "hits": coordinator.solver.hits,
+            "misses": coordinator.solver.misses,
+        },
+        "refresh": {
+            "window_s": coordinator.refresh_window,
+            "source_changes": coordinator.instrumentation.counters["source_change"],
+            "coalesced": coordinator.instrumentation.counters["coalesced"],
+        },
+        "history_slots": len(coordinator.history) if coordinator.history else None,
+        "rolling_days": len(coordinator.rolling.window),
+        "coordinator": coordinator.instrumentation.as_dict(),
+        "entry": entry.runtime_data.instrumentation.as_dict(),
+    }
+
+
+def _area_diagnostics(entry: AreaConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for an entry comparing several areas."""
+    coordinator = entry.runtime_data.coordinator
+    comparison = coordinator.comparison
+    return {
+        "areas": dict(
+            zip(
+                coordinator.areas,
+                (source.entity_id for source in coordinator.sources),
+                strict=True,
+            )
+        ),
+        "last_update_success": coordinator.last_update_success,
+        "fingerprints": [source.fingerprint for source in coordinator.sources],
+        "slots": len(comparison),
+        "resolution": comparison.resolution,
+        "coordinator": coordinator.instrumentation.as_dict(),
+        "entry": entry.runtime_data.instrumentation.as_dict(),
+    }
@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import ATTRIBUTION
-from .coordinator import BlueprintDataUpdateCoordinator
+from .coordinator import AreaDataUpdateCoordinator, BlueprintDataUpdateCoordinator
+
+if TYPE_CHECKING:
+    from .data import AreaConfigEntry, IntegrationBlueprintConfigEntry
 
 
 class IntegrationBlueprintEntity(CoordinatorEntity[BlueprintDataUpdateCoordinator]):
@@ -14,15 +19,45 @@ class IntegrationBlueprintEntity(CoordinatorEntity[BlueprintDataUpdateCoordinato
 
     _attr_attribution = ATTRIBUTION
 
-    def __init__(self, coordinator: BlueprintDataUpdateCoordinator) -> None:
+    def __init__(
+        self,
+        coordinator: BlueprintDataUpdateCoordinator,
+        entry: IntegrationBlueprintConfigEntry,
+    ) -> None:
+        """Initialize."""
+        super().__init__(coordinator)
+        # The coordinator is shared between entries; identity comes from ours.
+        self._entry = entry
+        self._attr_unique_id = entry.entry_id
+        self._attr_device_info = DeviceInfo(
+            identifiers={
+                (
+                    entry.domain,
+                    entry.entry_id,
+                ),
+            },
+        )
+
+
+class PriceAnalyzerAreaEntity(CoordinatorEntity[AreaDataUpdateCoordinator]):
+    """Entity of an entry comparing several areas."""
+
+    _attr_attribution = ATTRIBUTION
+
+    def __init__(
+        self,
+        coordinator: AreaDataUpdateCoordinator,
+        entry: AreaConfigEntry,
+    ) -> None:
         """Initialize."""
         super().__init__(coordinator)
-        self._attr_unique_id = coordinator.config_entry.entry_id
+        self._entry = entry
+        self._attr_unique_id = entry.entry_id
         self._attr_device_info = DeviceInfo(
             identifiers={
                 (
-                    coordinator.config_entry.domain,
-                    coordinator.config_entry.entry_id,
+                    entry.domain,
+                    entry.entry_id,
                 ),
             },
         )
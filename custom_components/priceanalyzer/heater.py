@@ -0,0 +1,196 @@
+"""Water heater on/off planner for priceanalyzer."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from .analysis import load_numpy
+from .const import (
+    CONF_HEATER_MAX_OFF_HOURS,
+    CONF_HEATER_SHARE,
+    DEFAULT_HEATER_MAX_OFF_HOURS,
+    DEFAULT_HEATER_SHARE,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping, Sequence
+
+    from .series import PriceSeries
+
+# Entries from which the NumPy batch beats a pass per entry, unless forced.
+NUMPY_MIN_ENTRIES = 8
+
+
+@dataclass(frozen=True, slots=True)
+class WaterHeaterLimits:
+    """Per-entry plan of a water heater."""
+
+    # Share of the priced slots of every day, in percent, the heater is on
+    # for; the cheapest ones are picked.
+    on_share: float = DEFAULT_HEATER_SHARE
+    # Longest run of off slots, in hours; 0 leaves runs unbounded.
+    max_off_hours: float = DEFAULT_HEATER_MAX_OFF_HOURS
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> WaterHeaterLimits:
+        """Return the limits of a config entry's options."""
+        return cls(
+            float(options.get(CONF_HEATER_SHARE, DEFAULT_HEATER_SHARE)),
+            float(options.get(CONF_HEATER_MAX_OFF_HOURS, DEFAULT_HEATER_MAX_OFF_HOURS)),
+        )
+
+
+def schedule(
+    series: PriceSeries,
+    limits: Sequence[WaterHeaterLimits],
+    *,
+    use_numpy: bool | None = None,
+) -> list[array]:
+    """
+    Return the on (1) and off (0) slots of every limits, solved together.
+
+    Slots are ranked by price once within their local day, and an entry is
+    on where the rank is below its share of the day's priced slots: one
+    comparison of the ranks with an entries x slots threshold matrix. Runs
+    of off slots longer than an entry's limit are then broken at the least
+    extra cost by a dynamic program over the gaps between on slots.
+    """
+    count = len(series)
+    if not count or not limits:
+        return [array("b", bytes(count)) for _ in limits]
+    values = series.values  # noqa: PD011
+    ranks, priced = _ranks(series)
+    slots_per_hour = 3600 / series.resolution
+    # Positions an on slot may be from the previous one; past the horizon
+    # when the runs are unbounded.
+    gaps = [
+        round(item.max_off_hours * slots_per_hour) + 1
+        if item.max_off_hours > 0
+        else count + 1
+        for item in limits
+    ]
+    finite = [value for value in values if not math.isnan(value)]
+    # Slots without a price are only switched on to break a run, at the
+    # highest price of the horizon.
+    fallback = max(finite, default=0.0)
+    fill = [fallback if math.isnan(value) else value for value in values]
+
+    if use_numpy is None:
+        use_numpy = len(limits) >= NUMPY_MIN_ENTRIES
+    np = load_numpy() if use_numpy else None
+    if np is not None:
+        return _schedule_numpy(np, ranks, priced, fill, limits, gaps)
+    plans = []
+    for item, gap in zip(limits, gaps, strict=True):
+        share = item.on_share / 100
+        plan = array(
+            "b",
+            (
+                rank < round(share * day)
+                for rank, day in zip(ranks, priced, strict=True)
+            ),
+        )
+        _fill_python(plan, fill, gap)
+        plans.append(plan)
+    return plans
+
+
+def _ranks(series: PriceSeries) -> tuple[list[int], list[int]]:
+    """
+    Return the price rank of every slot within its day and the day's priced slots.
+
+    Equal prices rank by start; slots without a price rank last.
+    """
+    values = series.values  # noqa: PD011
+    count = len(series)
+    ranks = [count] * count
+    priced = [0] * count
+    for day in range(len(series.day_lengths)):
+        indexes = series.day_range(day)
+        ordered = sorted(
+            (index for index in indexes if not math.isnan(values[index])),
+            key=values.__getitem__,
+        )
+        for rank, index in enumerate(ordered):
+            ranks[index] = rank
+        for index in indexes:
+            priced[index] = len(ordered)
+    return ranks, priced
+
+
+def _fill_python(plan: array, fill: Sequence[float], gap: int) -> None:
+    """
+    Switch on the cheapest slots that keep every run of off slots short enough.
+
+    Positions run from a virtual on slot before the horizon to one after it;
+    the cheapest way to reach a position only looks back `gap` positions, so
+    a monotonic deque of candidates keeps the pass O(slots).
+    """
+    count = len(plan)
+    costs = [
+        0.0,
+        *(0.0 if on else price for on, price in zip(plan, fill, strict=True)),
+        0.0,
+    ]
+    best = [0.0] * (count + 2)
+    previous = [0] * (count + 2)
+    candidates = deque([0])
+    for position in range(1, count + 2):
+        while candidates[0] < position - gap:
+            candidates.popleft()
+        previous[position] = candidates[0]
+        best[position] = costs[position] + best[candidates[0]]
+        # Equal costs keep the earliest candidate, as NumPy's argmin does.
+        while candidates and best[candidates[-1]] > best[position]:
+            candidates.pop()
+        candidates.append(position)
+    position = previous[count + 1]
+    while position:
+        plan[position - 1] = 1
+        position = previous[position]
+
+
+def _schedule_numpy(  # noqa: PLR0913
+    np: Any,
+    ranks: Sequence[int],
+    priced: Sequence[int],
+    fill: Sequence[float],
+    limits: Sequence[WaterHeaterLimits],
+    gaps: Sequence[int],
+) -> list[array]:
+    """Return the schedules of all limits, solved as entries x slots matrices."""
+    shares = np.array([item.on_share / 100 for item in limits])
+    thresholds = np.rint(shares[:, None] * np.asarray(priced, dtype=np.float64))
+    plans = np.asarray(ranks)[None, :] < thresholds
+
+    entries, count = plans.shape
+    costs = np.zeros((count + 2, entries))
+    costs[1:-1] = np.where(plans.T, 0.0, np.asarray(fill)[:, None])
+    gaps = np.asarray(gaps)
+    widest = min(int(gaps.max()), count + 1)
+    # Row r is widest - r positions back; positions past an entry's gap are
+    # ruled out with an infinite cost. A window uses the last rows.
+    beyond = np.where(np.arange(widest, 0, -1)[:, None] > gaps, np.inf, 0.0)
+    best = np.zeros((count + 2, entries))
+    previous = np.zeros((count + 2, entries), dtype=np.intp)
+    columns = np.arange(entries)
+    for position in range(1, count + 2):
+        first = max(0, position - widest)
+        window = best[first:position] + beyond[widest - position + first :]
+        choice = window.argmin(axis=0)
+        best[position] = costs[position] + window[choice, columns]
+        previous[position] = choice + first
+
+    result = []
+    for entry, plan in enumerate(plans.astype(np.int8)):
+        plan = array("b", plan.tobytes())  # noqa: PLW2901
+        position = previous[count + 1, entry]
+        while position:
+            plan[position - 1] = 1
+            position = previous[position, entry]
+        result.append(plan)
+    return result
@@ -0,0 +1,180 @@
+"""
+Append-only on-disk price history for priceanalyzer.
+
+One file per source and resolution holds a 16 byte header followed by
+fixed-width 16 byte records, little endian:
+
+    header: b"PAH1", resolution (uint32), reserved (8 bytes)
+    record: slot start in epoch seconds (int64), price (float64)
+
+Records are strictly increasing by start, so a window of days is found with
+a binary search. Reads go through a read-only mmap and strided memoryviews,
+so a year of 15 minute prices is never copied into Python objects.
+"""
+
+from __future__ import annotations
+
+import math
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+    from pathlib import Path
+
+HEADER = struct.Struct("<4sI8x")
+RECORD = struct.Struct("<qd")
+MAGIC = b"PAH1"
+# Comparison windows kept sorted in memory until the next append.
+SUMMARY_CACHE_SIZE = 4
+
+_EMPTY = memoryview(b"")
+
+type Views = tuple[memoryview, memoryview]
+# Sorted values and mean of a window, None when it holds no slots.
+type Summary = tuple[array, float] | None
+# Start and end, in epoch seconds, of a window; None ends it at the newest slot.
+type Span = tuple[float, float | None]
+
+
+class PriceHistoryError(ValueError):
+    """The history file is not a price history of the expected resolution."""
+
+
+class PriceHistory:
+    """
+    Price history of one source at one resolution.
+
+    open(), append() and map() do file I/O and must run in the executor;
+    their views are handed to publish() on the event loop. summarize()
+    reads and sorts windows in the executor for cache_summaries(), and
+    compare() only reads those, so entity state writes never fault in pages
+    of the map. window() bisects the map and belongs in the executor too;
+    last_start reads only the newest slot, which append() just wrote.
+    """
+
+    def __init__(self, path: Path, resolution: int) -> None:
+        """Initialize the history."""
+        self.path = path
+        self.resolution = resolution
+        self.starts: memoryview = _EMPTY.cast("q")
+        self.values: memoryview = _EMPTY.cast("d")
+        # Summaries by span, oldest first.
+        self._summaries: dict[Span, Summary] = {}
+        # Bumped whenever compare() may answer differently, so callers caching
+        # its results know when to ask again.
+        self.generation = 0
+
+    def __len__(self) -> int:
+        """Return the number of stored slots."""
+        return len(self.starts)
+
+    @property
+    def last_start(self) -> int | None:
+        """Return the start of the newest stored slot."""
+        return self.starts[-1] if len(self.starts) else None
+
+    def open(self) -> Views:
+        """Create or validate the file and return its views."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.path.exists():
+            self.path.write_bytes(HEADER.pack(MAGIC, self.resolution))
+        with self.path.open("r+b") as file:
+            header = file.read(HEADER.size)
+            if len(header) != HEADER.size or HEADER.unpack(header) != (
+                MAGIC,
+                self.resolution,
+            ):
+                msg = f"{self.path} is not a {self.resolution}s price history"
+                raise PriceHistoryError(msg)
+            # Drop a record left half-written by a crash during append.
+            size = file.seek(0, 2)
+            whole = size - (size - HEADER.size) % RECORD.size
+            if whole != size:
+                file.truncate(whole)
+        return self.map()
+
+    def append(self, starts: Sequence[int], values: Sequence[float]) -> int:
+        """Write the slots newer than the published ones and return their count."""
+        last = self.last_start
+        records = b"".join(
+            RECORD.pack(start, value)
+            for start, value in zip(starts, values, strict=True)
+            if (last is None or start > last) and not math.isnan(value)
+        )
+        if not records:
+            return 0
+        with self.path.open("ab") as file:
+            file.write(records)
+        return len(records) // RECORD.size
+
+    def map(self) -> Views:
+        """Map the file and return its starts and values as strided views."""
+        with self.path.open("rb") as file:
+            if file.seek(0, 2) <= HEADER.size:
+                return _EMPTY.cast("q"), _EMPTY.cast("d")
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        # Views keep the map alive; an older map is released with its views.
+        body = memoryview(mapped)[HEADER.size :]
+        return body.cast("q")[0::2], body.cast("d")[1::2]
+
+    def publish(self, views: Views) -> None:
+        """Swap in the views returned by open() or map()."""
+        self.starts, self.values = views
+        self._summaries.clear()
+        self.generation += 1
+
+    def window(self, since: float, until: float | None = None) -> range:
+        """Return the record indexes of slots starting in [since, until)."""
+        first = bisect_left(self.starts, since)
+        stop = len(self.starts) if until is None else bisect_left(self.starts, until)
+        return range(first, max(first, stop))
+
+    def compare(
+        self, value: float | None, since: float, until: float | None = None
+    ) -> dict[str, float | int | None] | None:
+        """
+        Return the mean of a window and the percentile of `value` in it.
+
+        None when the window holds no slots or is not summarized yet.
+        """
+        summary = self._summaries.get((since, until))
+        if summary is None:
+            return None
+        ordered, mean = summary
+        return {
+            "slots": len(ordered),
+            "mean": mean,
+            "percentile": (
+                None
+                if value is None
+                else round(100.0 * bisect_left(ordered, value) / len(ordered), 1)
+            ),
+        }
+
+    def summarize(self, spans: Iterable[Span]) -> dict[Span, Summary]:
+        """Return the summaries of spans without caching them."""
+        return {span: self._summarize(self.window(*span)) for span in spans}
+
+    def cache_summaries(self, summaries: dict[Span, Summary]) -> None:
+        """Cache summaries returned by summarize() for compare()."""
+        for span, summary in summaries.items():
+            self._summaries.pop(span, None)
+            if len(self._summaries) >= SUMMARY_CACHE_SIZE:
+                del self._summaries[next(iter(self._summaries))]
+            self._summaries[span] = summary
+        self.generation += 1
+
+    def cached(self, span: Span) -> bool:
+        """Return whether the summary of a span is cached."""
+        return span in self._summaries
+
+    def _summarize(self, window: range) -> Summary:
+        """Return the sorted values and mean of a window."""
+        if not window:
+            return None
+        ordered = array("d", sorted(self.values[window.start : window.stop]))
+        return ordered, math.fsum(ordered) / len(ordered)
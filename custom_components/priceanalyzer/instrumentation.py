@@ -0,0 +1,110 @@
+"""Hot-path instrumentation for priceanalyzer."""
+
+from __future__ import annotations
+
+import time
+import traceback
+from collections import Counter, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .const import DEFAULT_SLOW_THRESHOLD, LOGGER
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# Number of timing samples kept per instrumentation ring buffer.
+SAMPLE_COUNT = 100
+
+_THIS_FILE = Path(__file__).name
+
+
+def _call_site() -> str:
+    """Return file:line of the first caller outside this module and contextlib."""
+    for frame in reversed(traceback.extract_stack()):
+        name = Path(frame.filename).name
+        if name not in (_THIS_FILE, "contextlib.py"):
+            return f"{frame.filename}:{frame.lineno} ({frame.name})"
+    return "unknown"
+
+
+class Instrumentation:
+    """
+    Timings and counters for one coordinator or config entry.
+
+    Samples go to a fixed-size ring buffer so memory stays bounded however
+    long Home Assistant runs; an offline replay passes sample_count=None to
+    keep them all. Counters are plain integers.
+    """
+
+    def __init__(
+        self,
+        slow_threshold: float = DEFAULT_SLOW_THRESHOLD,
+        sample_count: int | None = SAMPLE_COUNT,
+    ) -> None:
+        """Initialize the instrumentation."""
+        self.slow_threshold = slow_threshold
+        self.samples: deque[tuple[float, str, float]] = deque(maxlen=sample_count)
+        self.counters: Counter[str] = Counter()
+        self.last: dict[str, float] = {}
+        self.gauges: dict[str, float] = {}
+
+    def record(self, name: str, duration: float) -> None:
+        """Store a duration in milliseconds."""
+        self.samples.append((time.time(), name, duration))
+        self.last[name] = duration
+
+    def count(self, name: str, increment: int = 1) -> None:
+        """Increment a counter."""
+        self.counters[name] += increment
+
+    def gauge(self, name: str, value: float) -> None:
+        """Store the latest value of a measurement, such as a payload size."""
+        self.gauges[name] = value
+
+    @contextmanager
+    def timed(self, name: str, *, blocking: bool = True) -> Iterator[None]:
+        """
+        Time a section and record it.
+
+        Blocking sections run on the event loop without awaiting; when one
+        takes longer than the threshold it is logged with its call site.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            self.record(name, duration)
+            if blocking and duration > self.slow_threshold:
+                LOGGER.warning(
+                    "%s blocked the event loop for %.1f ms at %s",
+                    name,
+                    duration,
+                    _call_site(),
+                )
+
+    def hit_ratio(self, name: str) -> float | None:
+        """
+        Return the share of hits among hits and misses.
+
+        `<name>_shared` counts as a hit too: the value was reused from another
+        entry of the source instead of being built.
+        """
+        hits = self.counters[f"{name}_hit"] + self.counters[f"{name}_shared"]
+        total = hits + self.counters[f"{name}_miss"]
+        return round(hits / total, 3) if total else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the instrumentation for diagnostics."""
+        return {
+            "slow_threshold_ms": self.slow_threshold,
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+            "last_ms": {name: round(value, 3) for name, value in self.last.items()},
+            "samples": [
+                {"time": timestamp, "name": name, "ms": round(duration, 3)}
+                for timestamp, name, duration in self.samples
+            ],
+        }
@@ -0,0 +1,334 @@
+"""Price-driven heating schedule optimizer for priceanalyzer."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any
+
+from .analysis import load_numpy
+from .const import (
+    CONF_COMFORT_BAND,
+    CONF_MAX_BOOST_HOURS,
+    CONF_MAX_OFF_HOURS,
+    CONF_MAX_OFFSET,
+    DEFAULT_COMFORT_BAND,
+    DEFAULT_MAX_BOOST_HOURS,
+    DEFAULT_MAX_OFF_HOURS,
+    DEFAULT_MAX_OFFSET,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping, Sequence
+
+# Cost per degree of offset added to every slot, so equal prices keep 0.
+TIE_BREAK = 1e-9
+# State spaces kept for reuse, one per distinct limits and resolution.
+MODEL_CACHE_SIZE = 16
+
+
+@dataclass(frozen=True, slots=True)
+class HeatingLimits:
+    """Per-entry limits of the temperature-offset schedule."""
+
+    # Largest offset, in degrees, in either direction.
+    max_offset: int = DEFAULT_MAX_OFFSET
+    # Heat the house may be ahead of or behind the normal schedule, in
+    # degree-hours; it must not be behind at the end of the horizon.
+    comfort_band: float = DEFAULT_COMFORT_BAND
+    # Longest run of lowered and of raised slots, in hours.
+    max_off_hours: float = DEFAULT_MAX_OFF_HOURS
+    max_boost_hours: float = DEFAULT_MAX_BOOST_HOURS
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> HeatingLimits:
+        """Return the limits of a config entry's options."""
+        return cls(
+            int(options.get(CONF_MAX_OFFSET, DEFAULT_MAX_OFFSET)),
+            float(options.get(CONF_COMFORT_BAND, DEFAULT_COMFORT_BAND)),
+            float(options.get(CONF_MAX_OFF_HOURS, DEFAULT_MAX_OFF_HOURS)),
+            float(options.get(CONF_MAX_BOOST_HOURS, DEFAULT_MAX_BOOST_HOURS)),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class _Model:
+    """The state space of the schedule at one resolution."""
+
+    # Offsets tried in each slot, 0 first so ties keep the normal temperature.
+    actions: tuple[int, ...]
+    # Balance bound in degree-slots and run bounds in slots.
+    band: int
+    max_off: int
+    max_boost: int
+    # Next state per action and state; len(states) marks an infeasible move.
+    transitions: tuple[tuple[int, ...], ...]
+    # Per state, the feasible moves as (action index, next state).
+    moves: tuple[tuple[tuple[int, int], ...], ...]
+    # State index of a zero balance and no run.
+    start: int
+    # Whether a state ends the horizon without heat debt.
+    final: tuple[bool, ...]
+    # Gathers of the standard library pass, from the cost-to-go of the next
+    # slot. By balance: the state with no run, and per raising and lowering
+    # offset the state that starts a run with it. By state in a raising
+    # (lowering) run: the balance, and per raising (lowering) offset the
+    # state that continues the run with it.
+    rest: Callable[[Sequence[float]], tuple[float, ...]]
+    start_up: tuple[Callable[[Sequence[float]], tuple[float, ...]], ...]
+    start_down: tuple[Callable[[Sequence[float]], tuple[float, ...]], ...]
+    up_balance: Callable[[Sequence[float]], tuple[float, ...]]
+    down_balance: Callable[[Sequence[float]], tuple[float, ...]]
+    continue_up: tuple[Callable[[Sequence[float]], tuple[float, ...]], ...]
+    continue_down: tuple[Callable[[Sequence[float]], tuple[float, ...]], ...]
+
+    @property
+    def size(self) -> int:
+        """Return the number of states."""
+        return len(self.final)
+
+
+def _gather(indexes: Sequence[int]) -> Callable[[Sequence[float]], tuple]:
+    """Return a function picking items by index, always as a tuple."""
+    if len(indexes) == 1:
+        (index,) = indexes
+        return lambda items: (items[index],)
+    return itemgetter(*indexes) if indexes else lambda _: ()
+
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _model(limits: HeatingLimits, resolution: int) -> _Model:
+    """
+    Return the state space and transitions for limits at a resolution.
+
+    Only reachable, distinct states are kept. A run of r raised slots lifted
+    the balance by at least r, so it is at least r - band. And once the
+    slots left in a run are at least the room left in the band, the band
+    stops the run first, so its length no longer matters and it is kept as
+    a run of 1; likewise for lowered runs. States are ordered by run sign,
+    then balance and length.
+    """
+    slots_per_hour = 3600 / resolution
+    band = round(limits.comfort_band * slots_per_hour)
+    max_off = round(limits.max_off_hours * slots_per_hour)
+    max_boost = round(limits.max_boost_hours * slots_per_hour)
+    actions = (
+        0,
+        *(sign * step for step in range(1, limits.max_offset + 1) for sign in (1, -1)),
+    )
+
+    def distinct(balance: int, run: int) -> tuple[int, int]:
+        if run > 0 and max_boost - run >= band - balance:
+            return balance, 1
+        if run < 0 and max_off + run >= band + balance:
+            return balance, -1
+        return balance, run
+
+    balances = range(-band, band + 1)
+    rests = [(balance, 0) for balance in balances]
+    ups = [
+        (balance, run)
+        for balance in balances
+        for run in range(1, max_boost + 1)
+        if balance >= run - band and distinct(balance, run) == (balance, run)
+    ]
+    downs = [
+        (balance, -run)
+        for balance in balances
+        for run in range(1, max_off + 1)
+        if balance <= band - run and distinct(balance, -run) == (balance, -run)
+    ]
+    states = rests + ups + downs
+    size = len(states)
+    index = {state: position for position, state in enumerate(states)}
+
+    def target(state: tuple[int, int], action: int) -> int:
+        balance, run = state
+        if action > 0:
+            run = max(run, 0) + 1
+        elif action < 0:
+            run = min(run, 0) - 1
+        else:
+            run = 0
+        return index.get(distinct(balance + action, run), size)
+
+    raising = [action for action in actions if action > 0]
+    lowering = [action for action in actions if action < 0]
+    transitions = tuple(
+        tuple(target(state, action) for state in states) for action in actions
+    )
+    return _Model(
+        actions,
+        band,
+        max_off,
+        max_boost,
+        transitions,
+        tuple(
+            tuple(
+                (action, following[state])
+                for action, following in enumerate(transitions)
+                if following[state] < size
+            )
+            for state in range(size)
+        ),
+        index[0, 0],
+        tuple(balance >= 0 for balance, _ in states),
+        _gather([index[state] for state in rests]),
+        tuple(_gather([target(state, a) for state in rests]) for a in raising),
+        tuple(_gather([target(state, a) for state in rests]) for a in lowering),
+        _gather([balance + band for balance, _ in ups]),
+        _gather([balance + band for balance, _ in downs]),
+        tuple(_gather([target(state, a) for state in ups]) for a in raising),
+        tuple(_gather([target(state, a) for state in downs]) for a in lowering),
+    )
+
+
+def optimize(
+    values: Sequence[float],
+    resolution: int,
+    limits: HeatingLimits,
+    *,
+    use_numpy: bool | None = None,
+) -> array:
+    """
+    Return the cost-minimizing temperature offset of every slot.
+
+    Lowering the temperature builds heat debt and raising it pays it back;
+    the balance stays within the comfort band and runs of lowered or raised
+    slots within their limits. A backward pass over the horizon finds the
+    cheapest cost-to-go of every state in O(slots x states x offsets), and a
+    forward pass picks the offset of the one state reached in each slot.
+    Slots without a price keep 0.
+    """
+    count = len(values)
+    plan = array("b", bytes(count))
+    if not count or limits.max_offset <= 0:
+        return plan
+    model = _model(limits, resolution)
+    np = load_numpy() if use_numpy is not False else None
+    if np is not None:
+        table = _cost_to_go_numpy(np, values, model)
+    else:
+        table = _cost_to_go_python(values, model)
+
+    state, actions, moves = model.start, model.actions, model.moves
+    for slot, price in enumerate(values):
+        after = table[slot + 1]
+        costs = _costs(price, actions)
+        # Resting is always feasible and comes first, so it wins ties.
+        best, (choice, reached) = math.inf, moves[state][0]
+        for action, following in moves[state]:
+            candidate = costs[action] + after[following]
+            if candidate < best:
+                best, choice, reached = candidate, action, following
+        plan[slot] = actions[choice]
+        state = reached
+    return plan
+
+
+def _costs(price: float, actions: Sequence[int]) -> list[float]:
+    """Return the cost of every offset in a slot."""
+    if math.isnan(price):
+        return [0.0 if action == 0 else math.inf for action in actions]
+    return [price * action + TIE_BREAK * abs(action) for action in actions]
+
+
+def _cost_to_go_python(values: Sequence[float], model: _Model) -> list[list[float]]:
+    """
+    Return the cost-to-go per slot and state using only the standard library.
+
+    Resting and starting a run only depend on the balance, so those options
+    are combined once per balance; a state in a run then compares that with
+    continuing the run. Every step gathers or maps whole blocks, without a
+    call per state.
+    """
+    done = [0.0 if final else math.inf for final in model.final]
+    table = [[] for _ in values]
+    table.append([*done, math.inf])
+    raising = [action for action in model.actions if action > 0]
+    lowering = [action for action in model.actions if action < 0]
+    for slot in range(len(values) - 1, -1, -1):
+        after = table[slot + 1]
+        price = values[slot]
+        rest = model.rest(after)
+        if math.isnan(price):
+            # Only the normal temperature: every state rests.
+            table[slot] = [
+                *rest,
+                *model.up_balance(rest),
+                *model.down_balance(rest),
+                math.inf,
+            ]
+            continue
+        # Options of a raising run besides continuing it, and of a lowering one.
+        rest_or_down = _best(after, price, lowering, model.start_down, rest)
+        rest_or_up = _best(after, price, raising, model.start_up, rest)
+        table[slot] = [
+            *_either(rest_or_down, rest_or_up),
+            *_best(
+                after, price, raising, model.continue_up, model.up_balance(rest_or_down)
+            ),
+            *_best(
+                after,
+                price,
+                lowering,
+                model.continue_down,
+                model.down_balance(rest_or_up),
+            ),
+            math.inf,
+        ]
+    return table
+
+
+def _best(
+    after: Sequence[float],
+    price: float,
+    actions: Sequence[int],
+    gathers: Sequence[Callable[[Sequence[float]], tuple[float, ...]]],
+    best: Sequence[float] = (),
+) -> Sequence[float]:
+    """
+    Return the cheapest of offsets that move states to the gathered ones.
+
+    With best, return the lower of that and the offsets per state, keeping
+    best on ties.
+    """
+    for action, gather in zip(actions, gathers, strict=True):
+        cost = price * action + TIE_BREAK * abs(action)
+        if not best:
+            best = [cost + value for value in gather(after)]
+            continue
+        # The sum and the comparison in one pass, as in _either.
+        best = [
+            a if a <= (b := cost + value) else b
+            for a, value in zip(best, gather(after), strict=True)
+        ]
+    return best
+
+
+def _either(first: Sequence[float], second: Sequence[float]) -> list[float]:
+    """Return the lower of two options per state, the first on ties."""
+    # A conditional expression: min() would cost a call per state.
+    return [a if a <= b else b for a, b in zip(first, second, strict=True)]  # noqa: FURB136
+
+
+def _cost_to_go_numpy(np: Any, values: Sequence[float], model: _Model) -> Any:
+    """Return the cost-to-go per slot and state with one gather per slot."""
+    size = model.size
+    transitions = np.array(model.transitions, dtype=np.intp)
+    actions = np.array(model.actions, dtype=np.float64)
+    prices = np.asarray(values, dtype=np.float64)
+    costs = prices[:, None] * actions + TIE_BREAK * np.abs(actions)
+    costs[np.isnan(prices)] = np.where(actions == 0, 0.0, np.inf)
+    costs = costs[:, :, None]
+
+    table = np.full((len(values) + 1, size + 1), np.inf)
+    table[-1, :size] = np.where(model.final, 0.0, np.inf)
+    for slot in range(len(values) - 1, -1, -1):
+        candidates = table[slot + 1][transitions]
+        candidates += costs[slot]
+        candidates.min(axis=0, out=table[slot, :size])
+    return table
@@ -0,0 +1,120 @@
+"""
+The refresh sequence of one price source for priceanalyzer.
+
+The coordinator and the offline replay both run a PriceRefresh, so a replay
+goes through the sequence Home Assistant runs: fetch the source state,
+fingerprint its prices, compute them, store their history and rolling
+statistics, and publish the result unless newer prices arrived meanwhile.
+Nothing here imports Home Assistant; the caller passes how blocking work
+runs and how history and statistics are stored.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from .computation import EMPTY_COMPUTATION, compute, price_fingerprint
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from .api import IntegrationBlueprintApiClient
+    from .computation import PriceComputation, Profile
+    from .instrumentation import Instrumentation
+    from .series import PriceSeries
+
+
+class NoPricesError(ValueError):
+    """The source state has no prices yet."""
+
+
+async def _run_inline(function: Callable[..., Any], *args: Any) -> Any:
+    """Run blocking work in the caller, as the offline replay does."""
+    return function(*args)
+
+
+async def _store_nothing(series: PriceSeries) -> None:
+    """Keep neither history nor rolling statistics."""
+
+
+def _never() -> bool:
+    """Return that a result is never superseded."""
+    return False
+
+
+class PriceRefresh:
+    """
+    Fetches, computes and publishes the prices of one source entity.
+
+    run_blocking runs the computation, in the executor for the coordinator;
+    store is awaited with every new series before it is published; and
+    superseded tells whether newer prices arrived or nobody reads the result,
+    in which case it is dropped. Every step is counted in instrumentation.
+    """
+
+    def __init__(
+        self,
+        client: IntegrationBlueprintApiClient,
+        instrumentation: Instrumentation,
+        *,
+        run_blocking: Callable[..., Awaitable[Any]] = _run_inline,
+        store: Callable[[PriceSeries], Awaitable[None]] = _store_nothing,
+        superseded: Callable[[], bool] = _never,
+    ) -> None:
+        """Initialize the refresh."""
+        self.client = client
+        self.instrumentation = instrumentation
+        self._run_blocking = run_blocking
+        self._store = store
+        self._superseded = superseded
+        # Last published source state and its computation.
+        self.data: dict[str, Any] | None = None
+        self.computation: PriceComputation = EMPTY_COMPUTATION
+        # Profiles of the entries; their effective prices and schedules are
+        # derived with the prices.
+        self.profiles: frozenset[Profile] = frozenset()
+
+    def publish(self, data: dict[str, Any], computation: PriceComputation) -> None:
+        """Make a source state and its computation the current ones."""
+        self.data = data
+        self.computation = computation
+
+    async def async_refresh(self) -> dict[str, Any] | None:
+        """
+        Fetch the source state and publish it when its prices changed.
+
+        Return the published state, or None when the prices are unchanged or
+        the result was dropped. Raise NoPricesError when the state has none.
+        """
+        data = await self.client.async_get_data()
+        fingerprint = price_fingerprint(data) if data else (0, 0)
+        if not fingerprint[0]:
+            self.instrumentation.count("no_prices")
+            msg = f"{self.client.entity_id} has no prices yet"
+            raise NoPricesError(msg)
+        if fingerprint == self.computation.fingerprint and self.data:
+            self.instrumentation.count("fingerprint_hit")
+            return None
+        self.instrumentation.count("fingerprint_miss")
+        # Parsing, analysis, tariffs and schedules run in run_blocking; the
+        # caller's loop only fetches, fingerprints and publishes.
+        with self.instrumentation.timed("compute", blocking=False):
+            computation = await self._run_blocking(
+                compute, data, fingerprint, self.profiles
+            )
+        if self._discarded():
+            return None
+        await self._store(computation.series)
+        if self._discarded():
+            return None
+        # No await from here until the caller stores the data, so slot ticks
+        # never see this computation next to the previous data.
+        self.publish(data, computation)
+        return data
+
+    def _discarded(self) -> bool:
+        """Return whether a computed result must be dropped instead of published."""
+        if self._superseded():
+            self.instrumentation.count("compute_discarded")
+            return True
+        return False
@@ -0,0 +1,174 @@
+"""Shared per-source coordinators for priceanalyzer."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.config_entries import current_entry
+from homeassistant.core import callback
+from homeassistant.exceptions import ConfigEntryNotReady
+
+from .api import IntegrationBlueprintApiClient
+from .const import (
+    CONF_REFRESH_WINDOW,
+    CONF_SLOW_THRESHOLD,
+    DEFAULT_REFRESH_WINDOW,
+    DEFAULT_SLOW_THRESHOLD,
+    DOMAIN,
+    LOGGER,
+)
+from .coordinator import BlueprintDataUpdateCoordinator
+
+if TYPE_CHECKING:
+    import asyncio
+    from collections.abc import Mapping
+
+    from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+
+    from .computation import Profile
+
+
+@dataclass
+class SharedSource:
+    """A coordinator shared by every entry that reads the same entity."""
+
+    coordinator: BlueprintDataUpdateCoordinator
+    first_refresh: asyncio.Task
+    stop: CALLBACK_TYPE
+    entry_ids: set[str] = field(default_factory=set)
+    # Slow section threshold of every entry; the coordinator uses the lowest.
+    slow_thresholds: dict[str, float] = field(default_factory=dict)
+    # Refresh window of every entry; the coordinator uses the shortest.
+    refresh_windows: dict[str, float] = field(default_factory=dict)
+    # Profile of every entry; the coordinator derives each distinct one.
+    profiles: dict[str, Profile] = field(default_factory=dict)
+
+    @callback
+    def async_apply_options(self) -> None:
+        """Apply the strictest of the entries' options to the coordinator."""
+        if self.slow_thresholds:
+            self.coordinator.instrumentation.slow_threshold = min(
+                self.slow_thresholds.values()
+            )
+        if self.refresh_windows:
+            self.coordinator.refresh_window = min(self.refresh_windows.values())
+
+    @callback
+    def async_set_profile(self, entry_id: str, profile: Profile | None) -> None:
+        """Set or drop the profile of an entry and update the distinct ones."""
+        previous = self.profiles.pop(entry_id, None)
+        if profile is not None:
+            self.profiles[entry_id] = profile
+        # Hashing a profile walks its tariff and limits, so the distinct
+        # profiles are not rebuilt from every entry's on each setup.
+        profiles = self.coordinator.profiles
+        if profile is not None and profile not in profiles:
+            profiles |= {profile}
+        if previous is not None and previous not in self.profiles.values():
+            profiles -= {previous}
+        self.coordinator.profiles = profiles
+
+
+class SourceRegistry:
+    """Reference-counted registry of coordinators keyed by source entity."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the registry."""
+        self.hass = hass
+        self.sources: dict[str, SharedSource] = {}
+        # Shutdowns of released coordinators by entity, until they finish.
+        self.stopping: dict[str, asyncio.Task] = {}
+
+    async def async_acquire(
+        self,
+        entry_id: str,
+        entity_id: str,
+        options: Mapping[str, Any],
+        profile: Profile | None = None,
+    ) -> BlueprintDataUpdateCoordinator:
+        """Return the coordinator for an entity, creating and refreshing it once."""
+        # A coordinator released just before, as on reload, writes its stores
+        # before a new one reads them.
+        if (stopping := self.stopping.get(entity_id)) is not None:
+            await stopping
+        source = self.sources.get(entity_id)
+        if source is None:
+            # Created outside the entry being set up, which would otherwise
+            # shut it down on unload while other entries still read it; the
+            # registry shuts it down when the last entry releases it.
+            token = current_entry.set(None)
+            try:
+                coordinator = BlueprintDataUpdateCoordinator(
+                    hass=self.hass,
+                    client=IntegrationBlueprintApiClient(
+                        entity_id=entity_id, hass=self.hass
+                    ),
+                )
+            finally:
+                current_entry.reset(token)
+            source = self.sources[entity_id] = SharedSource(
+                coordinator=coordinator,
+                first_refresh=self.hass.async_create_task(
+                    coordinator.async_warm_start(),
+                    f"{DOMAIN} first refresh {entity_id}",
+                ),
+                stop=coordinator.async_start(),
+            )
+            LOGGER.debug("Created shared coordinator for %s", entity_id)
+        source.entry_ids.add(entry_id)
+        source.slow_thresholds[entry_id] = options.get(
+            CONF_SLOW_THRESHOLD, DEFAULT_SLOW_THRESHOLD
+        )
+        source.refresh_windows[entry_id] = options.get(
+            CONF_REFRESH_WINDOW, DEFAULT_REFRESH_WINDOW
+        )
+        # Entries comparing areas only read the prices and bring no profile.
+        if profile is not None:
+            source.async_set_profile(entry_id, profile)
+        source.async_apply_options()
+
+        # Entries set up concurrently wait on the same first refresh.
+        await source.first_refresh
+        if not source.coordinator.last_update_success:
+            self.async_release(entry_id, entity_id)
+            msg = f"{entity_id} is not available yet"
+            raise ConfigEntryNotReady(msg)
+        # A later entry may bring a profile the current prices lack.
+        await source.coordinator.async_solve(source.coordinator.computation)
+        return source.coordinator
+
+    @callback
+    def async_release(self, entry_id: str, entity_id: str) -> None:
+        """Drop an entry's reference and stop the coordinator when unused."""
+        source = self.sources.get(entity_id)
+        if source is None:
+            return
+        source.entry_ids.discard(entry_id)
+        source.slow_thresholds.pop(entry_id, None)
+        source.refresh_windows.pop(entry_id, None)
+        source.async_set_profile(entry_id, None)
+        source.async_apply_options()
+        if not source.entry_ids:
+            source.stop()
+            del self.sources[entity_id]
+            stopping = self.stopping[entity_id] = self.hass.async_create_task(
+                source.coordinator.async_shutdown(), f"{DOMAIN} shutdown {entity_id}"
+            )
+            stopping.add_done_callback(partial(self._async_stopped, entity_id))
+            LOGGER.debug("Released shared coordinator for %s", entity_id)
+
+    @callback
+    def _async_stopped(self, entity_id: str, task: asyncio.Task) -> None:
+        """Forget a finished shutdown unless a newer one replaced it."""
+        if self.stopping.get(entity_id) is task:
+            del self.stopping[entity_id]
+
+
+@callback
+def async_get_registry(hass: HomeAssistant) -> SourceRegistry:
+    """Return the registry stored in hass.data."""
+    if DOMAIN not in hass.data:
+        hass.data[DOMAIN] = SourceRegistry(hass)
+    return hass.data[DOMAIN]
@@ -0,0 +1,446 @@
+"""
+Offline replay of recorded Nordpool snapshots for priceanalyzer.
+
+Snapshots go through the API client and refresh.PriceRefresh, the fetch,
+fingerprint, compute and publish sequence the coordinator runs, while a
+virtual clock steps from slot boundary to slot boundary the way the slot
+timer does. The plan each slot showed when the clock reached it is kept per
+local day with the savings it is estimated to have made.
+
+Nothing here imports Home Assistant and nothing waits for real time, so a
+season replays in seconds from benchmarks/replay.py or from a test.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import statistics
+import time
+from array import array
+from contextlib import suppress
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from .api import IntegrationBlueprintApiClient
+from .computation import Profile
+from .history import HEADER, MAGIC, PriceHistory, PriceHistoryError
+from .instrumentation import Instrumentation
+from .refresh import NoPricesError, PriceRefresh
+from .rolling import RollingStats
+from .series import EPOCH_ORDINAL
+
+if TYPE_CHECKING:
+    from collections import Counter
+    from collections.abc import Iterable, Iterator, Mapping
+    from datetime import tzinfo
+    from pathlib import Path
+
+    from .computation import PriceComputation
+    from .series import PriceSeries
+
+DEFAULT_ENTITY_ID = "sensor.nordpool_replay"
+# Local hour at which the next day's prices are published.
+PUBLISH_HOUR = 13
+# Energy, in kWh, one degree of offset moves per hour, and the power of the
+# water heater in kW; the savings scale with both.
+DEFAULT_ENERGY_PER_DEGREE = 1.0
+DEFAULT_HEATER_POWER = 2.0
+
+# Time a snapshot was published at, in epoch seconds, and the Nordpool state.
+type Snapshot = tuple[float, dict[str, Any]]
+
+
+class ReplayError(ValueError):
+    """A recorded snapshot cannot be replayed."""
+
+
+class VirtualClock:
+    """Time that only moves when the replay advances it."""
+
+    def __init__(self, now: float = 0.0) -> None:
+        """Initialize the clock."""
+        self.now = now
+
+    def time(self) -> float:
+        """Return the current epoch second."""
+        return self.now
+
+    def advance(self, timestamp: float) -> None:
+        """Move the clock forward to a timestamp; it never goes back."""
+        self.now = max(self.now, timestamp)
+
+
+class _ReplayState:
+    """A recorded state as the client reads it from the state machine."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        self._data = data
+
+    def as_dict(self) -> dict[str, Any]:
+        return self._data
+
+
+class ReplayStates:
+    """State machine holding the last replayed snapshot of every entity."""
+
+    def __init__(self) -> None:
+        """Initialize the states."""
+        self._states: dict[str, _ReplayState] = {}
+
+    def async_set(self, data: dict[str, Any]) -> None:
+        """Replace the state of the snapshot's entity."""
+        self._states[data["entity_id"]] = _ReplayState(data)
+
+    def get(self, entity_id: str) -> _ReplayState | None:
+        """Return the state of an entity, or None before its first snapshot."""
+        return self._states.get(entity_id)
+
+
+@dataclass(slots=True)
+class _ReplayHass:
+    """The part of Home Assistant the client reads: its states."""
+
+    states: ReplayStates = field(default_factory=ReplayStates)
+
+
+@dataclass(slots=True)
+class DayReport:
+    """Decisions and estimated savings of one replayed local day."""
+
+    day: date
+    # Effective price (NaN when missing), temperature offset, water heater
+    # state and length in hours of every slot, as the entities showed them.
+    prices: array = field(default_factory=lambda: array("d"))
+    offsets: array = field(default_factory=lambda: array("b"))
+    heater: array = field(default_factory=lambda: array("b"))
+    hours: array = field(default_factory=lambda: array("d"))
+
+    def add(self, price: float, offset: int, heater: int, hours: float) -> None:
+        """Record the decisions of one slot."""
+        self.prices.append(price)
+        self.offsets.append(offset)
+        self.heater.append(heater)
+        self.hours.append(hours)
+
+    @property
+    def mean_price(self) -> float | None:
+        """Return the mean price of the priced slots."""
+        priced = [price for price in self.prices if not math.isnan(price)]
+        return math.fsum(priced) / len(priced) if priced else None
+
+    def heating_savings(self, energy_per_degree: float) -> float:
+        """Return the cost the offsets saved against no offsets."""
+        return -math.fsum(
+            price * offset * hours * energy_per_degree
+            for price, offset, hours in zip(
+                self.prices, self.offsets, self.hours, strict=True
+            )
+            if offset and not math.isnan(price)
+        )
+
+    def heater_savings(self, power: float) -> float:
+        """Return the cost the water heater saved against the day's mean price."""
+        mean = self.mean_price
+        if mean is None:
+            return 0.0
+        return math.fsum(
+            (mean - price) * hours * power
+            for price, on, hours in zip(
+                self.prices, self.heater, self.hours, strict=True
+            )
+            if on and not math.isnan(price)
+        )
+
+
+@dataclass(slots=True)
+class ReplayReport:
+    """Outcome of a replay: the days, counters and timings."""
+
+    days: list[DayReport]
+    counters: Counter[str]
+    # Durations in milliseconds by section.
+    timings: dict[str, list[float]]
+    simulated_seconds: float
+    wall_seconds: float
+    rolling_days: int
+    energy_per_degree: float = DEFAULT_ENERGY_PER_DEGREE
+    heater_power: float = DEFAULT_HEATER_POWER
+
+    @property
+    def speedup(self) -> float | None:
+        """Return how many times faster than real time the replay ran."""
+        if not self.wall_seconds:
+            return None
+        return self.simulated_seconds / self.wall_seconds
+
+    def as_dict(self, *, slots: bool = False) -> dict[str, Any]:
+        """Return the report, with the decisions of every slot when asked."""
+        days = []
+        for report in self.days:
+            heating = report.heating_savings(self.energy_per_degree)
+            heater = report.heater_savings(self.heater_power)
+            row = {
+                "day": report.day.isoformat(),
+                "slots": len(report.prices),
+                "mean_price": report.mean_price,
+                "lowered": sum(offset < 0 for offset in report.offsets),
+                "raised": sum(offset > 0 for offset in report.offsets),
+                "heater_on": sum(report.heater),
+                "heating_savings": heating,
+                "heater_savings": heater,
+            }
+            if slots:
+                row["prices"] = [
+                    None if math.isnan(price) else price for price in report.prices
+                ]
+                row["offsets"] = report.offsets.tolist()
+                row["heater"] = report.heater.tolist()
+            days.append(row)
+        return {
+            "days": days,
+            "heating_savings": math.fsum(row["heating_savings"] for row in days),
+            "heater_savings": math.fsum(row["heater_savings"] for row in days),
+            "counters": dict(self.counters),
+            "timings_ms": {
+                name: _summary(durations) for name, durations in self.timings.items()
+            },
+            "rolling_days": self.rolling_days,
+            "simulated_hours": self.simulated_seconds / 3600,
+            "wall_seconds": self.wall_seconds,
+            "speedup": self.speedup,
+        }
+
+
+def _summary(durations: list[float]) -> dict[str, float | int]:
+    """Return the count, mean, median, 95th percentile and maximum of durations."""
+    ordered = sorted(durations)
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "p50": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)],
+        "max": ordered[-1],
+    }
+
+
+class Replay:
+    """
+    Replays snapshots of one Nordpool entity on a virtual clock.
+
+    Between two snapshots the clock stops at every slot boundary of the
+    current prices and records the slot with the entry's plan, as the slot
+    timer makes the entities do; a snapshot is then refreshed the way the
+    coordinator does it, with the computation run inline.
+    """
+
+    def __init__(
+        self,
+        profile: Profile | None = None,
+        *,
+        entity_id: str = DEFAULT_ENTITY_ID,
+        energy_per_degree: float = DEFAULT_ENERGY_PER_DEGREE,
+        heater_power: float = DEFAULT_HEATER_POWER,
+    ) -> None:
+        """Initialize the replay."""
+        self.profile = profile if profile is not None else Profile()
+        self.entity_id = entity_id
+        self.energy_per_degree = energy_per_degree
+        self.heater_power = heater_power
+        self.clock = VirtualClock()
+        self.rolling = RollingStats()
+        # Every sample is kept for the percentiles of the report.
+        self.instrumentation = Instrumentation(sample_count=None)
+        self._hass = _ReplayHass()
+        self.price_refresh = PriceRefresh(
+            IntegrationBlueprintApiClient(
+                entity_id=entity_id,
+                hass=self._hass,  # type: ignore[arg-type]
+            ),
+            self.instrumentation,
+            store=self._async_store,
+        )
+        self.price_refresh.profiles = frozenset((self.profile,))
+        self._days: dict[int, DayReport] = {}
+        self._last_start: int | None = None
+
+    @property
+    def computation(self) -> PriceComputation:
+        """Return the computation of the current prices."""
+        return self.price_refresh.computation
+
+    @property
+    def counters(self) -> Counter[str]:
+        """Return the counters of the replay and the refresh."""
+        return self.instrumentation.counters
+
+    async def async_run(self, snapshots: Iterable[Snapshot]) -> ReplayReport:
+        """Replay snapshots in publication order and return the report."""
+        started = time.perf_counter()
+        first = None
+        for published, data in snapshots:
+            if first is None:
+                first = self.clock.now = published
+            self._advance(published)
+            self.instrumentation.count("snapshot")
+            self._hass.states.async_set({**data, "entity_id": self.entity_id})
+            # Without prices, counted as no_prices, the previous ones keep playing.
+            with suppress(NoPricesError):
+                await self.price_refresh.async_refresh()
+        # The last prices play out to their end.
+        self._advance(math.inf)
+        timings: dict[str, list[float]] = {}
+        for _, name, duration in self.instrumentation.samples:
+            timings.setdefault(name, []).append(duration)
+        return ReplayReport(
+            [self._days[day] for day in sorted(self._days)],
+            self.counters,
+            timings,
+            self.clock.now - first if first is not None else 0.0,
+            time.perf_counter() - started,
+            len(self.rolling.window),
+            self.energy_per_degree,
+            self.heater_power,
+        )
+
+    def run(self, snapshots: Iterable[Snapshot]) -> ReplayReport:
+        """Replay snapshots outside an event loop and return the report."""
+        return asyncio.run(self.async_run(snapshots))
+
+    async def _async_store(self, series: PriceSeries) -> None:
+        """Add new days to the rolling statistics; no history is written."""
+        with self.instrumentation.timed("rolling", blocking=False):
+            self.rolling.ingest(series)
+
+    def _advance(self, until: float) -> None:
+        """Step the clock over the slot boundaries before `until`."""
+        priced = self.computation.priced(self.profile.tariff)
+        series = priced.series
+        while self.clock.now < until:
+            index = series.index_at(self.clock.now)
+            if index is not None:
+                self._record(priced, index)
+            boundary = series.next_boundary(self.clock.now)
+            if boundary is None:
+                if math.isfinite(until):
+                    self.clock.advance(until)
+                return
+            self.clock.advance(min(boundary, until))
+
+    def _record(self, priced: PriceComputation, index: int) -> None:
+        """Record the decisions of a slot the first time the clock reaches it."""
+        series = priced.series
+        start = series.starts[index]
+        if start == self._last_start:
+            return
+        self._last_start = start
+        with self.instrumentation.timed("slot", blocking=False):
+            day = series.local_days[index]
+            report = self._days.get(day)
+            if report is None:
+                report = self._days[day] = DayReport(
+                    date.fromordinal(day + EPOCH_ORDINAL)
+                )
+            report.add(
+                series.values[index],  # noqa: PD011
+                priced.plan(self.profile.heating)[index],
+                priced.heater(self.profile.heater)[index],
+                series.resolution / 3600,
+            )
+
+
+def replay(
+    snapshots: Iterable[Snapshot],
+    options: Mapping[str, Any] | None = None,
+    country: str | None = None,
+) -> ReplayReport:
+    """Replay snapshots with the profile of a config entry's options."""
+    return Replay(Profile.from_options(options or {}, country)).run(snapshots)
+
+
+def load_jsonl(path: Path) -> Iterator[Snapshot]:
+    """
+    Yield the snapshots of a JSONL dump, one Nordpool state per line.
+
+    A line is a state as Home Assistant exports it, or only its attributes;
+    it is published at its last_updated or last_changed time, else at the
+    start of its first slot.
+    """
+    with path.open(encoding="utf-8") as file:
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+                yield _published(data), data
+            except (KeyError, TypeError, ValueError) as exception:
+                msg = f"{path}:{number}: {exception}"
+                raise ReplayError(msg) from exception
+
+
+def _published(data: dict[str, Any]) -> float:
+    """Return the time a recorded state was published at."""
+    for key in ("last_updated", "last_changed"):
+        if value := data.get(key):
+            return datetime.fromisoformat(value).timestamp()
+    attributes = data.get("attributes") or data
+    raw_today = attributes.get("raw_today")
+    if not raw_today:
+        msg = "the state has no time and no prices"
+        raise ValueError(msg)
+    return datetime.fromisoformat(raw_today[0]["start"]).timestamp()
+
+
+def load_history(path: Path, zone: tzinfo) -> Iterator[Snapshot]:
+    """Yield day-ahead snapshots rebuilt from a binary price history file."""
+    with path.open("rb") as file:
+        header = file.read(HEADER.size)
+    if len(header) != HEADER.size or HEADER.unpack(header)[0] != MAGIC:
+        msg = f"{path} is not a price history"
+        raise PriceHistoryError(msg)
+    resolution = HEADER.unpack(header)[1]
+    history = PriceHistory(path, resolution)
+    history.publish(history.map())
+    days: dict[date, list[dict[str, Any]]] = {}
+    for start, value in zip(history.starts, history.values, strict=True):
+        moment = datetime.fromtimestamp(start, zone)
+        days.setdefault(moment.date(), []).append(
+            {
+                "start": moment.isoformat(),
+                "end": datetime.fromtimestamp(start + resolution, zone).isoformat(),
+                "value": value,
+            }
+        )
+    return day_ahead(days, zone)
+
+
+def day_ahead(
+    days: Mapping[date, list[dict[str, Any]]], zone: tzinfo
+) -> Iterator[Snapshot]:
+    """
+    Yield the snapshots a Nordpool entity shows for days of prices.
+
+    Each day starts with only its own prices at midnight, and the next
+    day's are added at PUBLISH_HOUR, as the entity publishes them.
+    """
+    for day in sorted(days):
+        following = days.get(day + timedelta(days=1), [])
+        for hour, raw_tomorrow in ((0, []), (PUBLISH_HOUR, following)):
+            moment = datetime(day.year, day.month, day.day, hour, tzinfo=zone)
+            if hour and not raw_tomorrow:
+                continue
+            yield (
+                moment.timestamp(),
+                {
+                    "state": str(days[day][0]["value"]) if days[day] else "unknown",
+                    "attributes": {
+                        "raw_today": days[day],
+                        "raw_tomorrow": raw_tomorrow,
+                    },
+                    "last_updated": moment.isoformat(),
+                },
+            )
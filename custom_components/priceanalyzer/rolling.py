@@ -0,0 +1,229 @@
+"""Incremental rolling price statistics for priceanalyzer."""
+
+from __future__ import annotations
+
+import heapq
+import math
+from array import array
+from bisect import bisect_left
+from collections import Counter, deque
+from itertools import accumulate
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from .series import PriceSeries
+
+# Days of prices the statistics cover.
+DEFAULT_DAYS = 30
+# Histogram bin width in price units; 0.001 keeps kWh prices exact to 0.1 øre.
+DEFAULT_BIN_WIDTH = 0.001
+# Number of daily peaks reported, as in the Norwegian capacity tariff.
+PEAK_COUNT = 3
+
+
+class RollingStats:
+    """
+    Streaming statistics over the prices of the last `days` days.
+
+    Each day is added and, once it leaves the window, removed in
+    O(slots per day): a Welford mean and variance, a sparse fixed-width
+    histogram for percentiles, monotonic deques for the minimum and maximum
+    and the peak slot of every day. The raw values of the days in the window
+    are kept so expired days can be subtracted again.
+    """
+
+    def __init__(
+        self, days: int = DEFAULT_DAYS, bin_width: float = DEFAULT_BIN_WIDTH
+    ) -> None:
+        """Initialize empty statistics."""
+        self.days = days
+        self.bin_width = bin_width
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.histogram: Counter[int] = Counter()
+        # (day, first slot start, values) of every day in the window, oldest first.
+        self.window: deque[tuple[int, int | None, array]] = deque()
+        # (start, value) candidates; the head is the window minimum or maximum.
+        self.minima: deque[tuple[int, float]] = deque()
+        self.maxima: deque[tuple[int, float]] = deque()
+        # (start, value) of the most expensive slot of every day in the window.
+        self.daily_peaks: deque[tuple[int, float] | None] = deque()
+        # Cumulative histogram, rebuilt on the first query after a change.
+        self._bins: list[int] | None = None
+        self._cumulative: list[int] = []
+
+    @property
+    def last_day(self) -> int | None:
+        """Return the newest day in the window."""
+        return self.window[-1][0] if self.window else None
+
+    @property
+    def variance(self) -> float | None:
+        """Return the sample variance of the prices in the window."""
+        return self._m2 / (self.count - 1) if self.count > 1 else None
+
+    @property
+    def minimum(self) -> float | None:
+        """Return the lowest price in the window."""
+        return self.minima[0][1] if self.minima else None
+
+    @property
+    def maximum(self) -> float | None:
+        """Return the highest price in the window."""
+        return self.maxima[0][1] if self.maxima else None
+
+    def ingest(self, series: PriceSeries) -> int:
+        """Add the days of a series newer than the window and return their count."""
+        added = 0
+        for day in range(len(series.day_lengths)):
+            indexes = series.day_range(day)
+            if not indexes:
+                continue
+            local_day = series.local_days[indexes.start]
+            last = self.last_day
+            if last is not None and local_day <= last:
+                continue
+            self.add_day(
+                local_day,
+                series.starts[indexes.start : indexes.stop],
+                series.values[indexes.start : indexes.stop],  # noqa: PD011
+            )
+            added += 1
+        return added
+
+    def add_day(self, day: int, starts: Sequence[int], values: Sequence[float]) -> None:
+        """Add one day of prices and expire the days that fall out of the window."""
+        kept = [
+            (start, value)
+            for start, value in zip(starts, values, strict=True)
+            if not math.isnan(value)
+        ]
+        self.window.append(
+            (
+                day,
+                kept[0][0] if kept else None,
+                array("d", (value for _, value in kept)),
+            )
+        )
+        self.daily_peaks.append(max(kept, key=_price, default=None))
+        for start, value in kept:
+            self._add(value)
+            while self.minima and self.minima[-1][1] >= value:
+                self.minima.pop()
+            self.minima.append((start, value))
+            while self.maxima and self.maxima[-1][1] <= value:
+                self.maxima.pop()
+            self.maxima.append((start, value))
+
+        while self.window and self.window[0][0] <= day - self.days:
+            _, _, expired = self.window.popleft()
+            self.daily_peaks.popleft()
+            for value in expired:
+                self._remove(value)
+        cutoff = next(
+            (first for _, first, _ in self.window if first is not None), math.inf
+        )
+        for extremes in (self.minima, self.maxima):
+            while extremes and extremes[0][0] < cutoff:
+                extremes.popleft()
+        self._bins = None
+
+    def _add(self, value: float) -> None:
+        """Add a value to the mean, variance and histogram."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.histogram[self._bin(value)] += 1
+
+    def _remove(self, value: float) -> None:
+        """Remove a value from the mean, variance and histogram."""
+        self.count -= 1
+        if self.count <= 0:
+            self.count, self.mean, self._m2 = 0, 0.0, 0.0
+        else:
+            delta = value - self.mean
+            self.mean -= delta / self.count
+            self._m2 = max(0.0, self._m2 - delta * (value - self.mean))
+        bin_ = self._bin(value)
+        self.histogram[bin_] -= 1
+        if self.histogram[bin_] <= 0:
+            del self.histogram[bin_]
+
+    def _bin(self, value: float) -> int:
+        """Return the histogram bin of a price."""
+        # Round first so 0.238 / 0.001 lands in bin 238, not 237.
+        return math.floor(round(value / self.bin_width, 6))
+
+    def _cumulative_histogram(self) -> tuple[list[int], list[int]]:
+        """Return sorted bins and the number of values below each of them."""
+        if self._bins is None:
+            self._bins = sorted(self.histogram)
+            self._cumulative = [
+                0,
+                *accumulate(self.histogram[bin_] for bin_ in self._bins),
+            ]
+        return self._bins, self._cumulative
+
+    def percentile(self, value: float) -> float | None:
+        """Return the share of prices in the window below `value`, in percent."""
+        if not self.count:
+            return None
+        bins, cumulative = self._cumulative_histogram()
+        below = cumulative[bisect_left(bins, self._bin(value))]
+        return round(100.0 * below / self.count, 1)
+
+    def quantile(self, share: float) -> float | None:
+        """Return the lower edge of the bin holding the `share` quantile."""
+        if not self.count:
+            return None
+        bins, cumulative = self._cumulative_histogram()
+        index = bisect_left(cumulative, share * self.count, 1) - 1
+        return round(bins[min(index, len(bins) - 1)] * self.bin_width, 6)
+
+    def peaks(self, count: int = PEAK_COUNT) -> list[tuple[int, float]]:
+        """Return the peak slot of the `count` most expensive days, in O(days)."""
+        return heapq.nlargest(count, filter(None, self.daily_peaks), key=_price)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics in a JSON-serializable form for storage."""
+        return {
+            "days": self.days,
+            "bin_width": self.bin_width,
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self._m2,
+            "histogram": list(self.histogram.items()),
+            "window": [
+                [day, first, values.tolist()] for day, first, values in self.window
+            ],
+            "minima": list(self.minima),
+            "maxima": list(self.maxima),
+            "daily_peaks": list(self.daily_peaks),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> RollingStats:
+        """Restore statistics stored with as_dict()."""
+        stats = cls(data["days"], data["bin_width"])
+        stats.count = data["count"]
+        stats.mean = data["mean"]
+        stats._m2 = data["m2"]  # noqa: SLF001
+        stats.histogram = Counter(dict(data["histogram"]))
+        stats.window = deque(
+            (day, first, array("d", values)) for day, first, values in data["window"]
+        )
+        stats.minima = deque(tuple(slot) for slot in data["minima"])
+        stats.maxima = deque(tuple(slot) for slot in data["maxima"])
+        stats.daily_peaks = deque(
+            tuple(slot) if slot else None for slot in data["daily_peaks"]
+        )
+        return stats
+
+
+def _price(slot: tuple[int, float]) -> float:
+    """Return the price of a (start, value) slot."""
+    return slot[1]
@@ -2,28 +2,63 @@
 
 from __future__ import annotations
 
-import logging
 import math
-from datetime import datetime
-from operator import itemgetter
-from re import L
-from statistics import mean
+from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any
 
 from homeassistant.components.sensor import (
+    SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
+    SensorStateClass,
 )  # Import sensor entity and classes.
-
-from .const import DOMAIN, LOGGER
-from .entity import IntegrationBlueprintEntity
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfTime,
+)
+from homeassistant.core import callback
+from homeassistant.helpers.json import json_bytes
+from homeassistant.util import dt as dt_util
+
+from .areas import NO_AREA
+from .attributes import build_days, slot_row
+from .const import (
+    CHEAP_SHARE,
+    CHEAPEST_DURATION,
+    CONF_AREAS,
+    CONF_ATTRIBUTE_MODE,
+    CONF_DEBUG_SENSORS,
+    CONF_PAYLOAD_BUDGET,
+    DEFAULT_ATTRIBUTE_MODE,
+    DEFAULT_DEBUG_SENSORS,
+    DEFAULT_PAYLOAD_BUDGET,
+    HISTORY_DAYS,
+    LOGGER,
+)
+from .entity import IntegrationBlueprintEntity, PriceAnalyzerAreaEntity
+from .series import SECONDS_PER_DAY, local_day
 
 if TYPE_CHECKING:
+    from array import array
+    from collections.abc import Callable
+    from datetime import datetime
+
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
-
-    from .coordinator import BlueprintDataUpdateCoordinator
-    from .data import IntegrationBlueprintConfigEntry
+    from homeassistant.helpers.typing import StateType
+
+    from .analysis import Analysis
+    from .areas import AreaComparison
+    from .computation import PriceComputation
+    from .coordinator import AreaDataUpdateCoordinator, BlueprintDataUpdateCoordinator
+    from .data import (
+        AreaConfigEntry,
+        IntegrationBlueprintConfigEntry,
+        IntegrationBlueprintData,
+    )
+    from .series import PriceSeries
 
 ENTITY_DESCRIPTIONS = (
     SensorEntityDescription(
@@ -34,151 +69,516 @@ ENTITY_DESCRIPTIONS = (
 )
 
 
+@dataclass(frozen=True, kw_only=True)
+class PriceAnalyzerDebugSensorEntityDescription(SensorEntityDescription):
+    """Describe a sensor exposing one instrumentation value."""
+
+    value_fn: Callable[[IntegrationBlueprintData], StateType]
+
+
+def _last_ms(data: IntegrationBlueprintData, name: str) -> float | None:
+    """Return the last duration of a coordinator section, rounded."""
+    duration = data.coordinator.instrumentation.last.get(name)
+    return None if duration is None else round(duration, 2)
+
+
+def _days_hit_ratio(data: IntegrationBlueprintData) -> float | None:
+    """Return the attribute row cache hit ratio as a percentage."""
+    ratio = data.instrumentation.hit_ratio("days")
+    return None if ratio is None else round(ratio * 100, 1)
+
+
+# Created with the debug sensors option and disabled by default; enable them to
+# watch the hot path from the UI.
+DEBUG_ENTITY_DESCRIPTIONS = (
+    PriceAnalyzerDebugSensorEntityDescription(
+        key="refresh_latency",
+        name="Refresh latency",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: _last_ms(data, "refresh"),
+    ),
+    PriceAnalyzerDebugSensorEntityDescription(
+        key="compute_time",
+        name="Computation time",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: _last_ms(data, "compute"),
+    ),
+    PriceAnalyzerDebugSensorEntityDescription(
+        key="plan_recomputations",
+        name="Plan recomputations",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda data: data.instrumentation.counters["plan_recompute"],
+    ),
+    PriceAnalyzerDebugSensorEntityDescription(
+        key="cache_hit_ratio",
+        name="Attribute cache hit ratio",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_days_hit_ratio,
+    ),
+    PriceAnalyzerDebugSensorEntityDescription(
+        key="payload_size",
+        name="Attribute payload size",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data.instrumentation.gauges.get("payload_bytes"),
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class PriceAnalyzerAreaSensorEntityDescription(SensorEntityDescription):
+    """Describe a sensor of the current slot of an area comparison."""
+
+    value_fn: Callable[[AreaComparison, int], StateType]
+    attributes_fn: Callable[[AreaComparison, int], dict[str, Any]]
+    # Whether the value is a price, in the unit of the areas.
+    price: bool = False
+
+
+def _finite(value: float) -> float | None:
+    """Return a value, or None for a missing one."""
+    return None if math.isnan(value) else value
+
+
+def _area_label(comparison: AreaComparison, area: int) -> str | None:
+    """Return the label of an area, or None for NO_AREA."""
+    return None if area == NO_AREA else comparison.areas[area]
+
+
+AREA_ENTITY_DESCRIPTIONS = (
+    PriceAnalyzerAreaSensorEntityDescription(
+        key="cheapest_area",
+        name="Cheapest area",
+        icon="mdi:map-marker-down",
+        value_fn=lambda comparison, index: _area_label(
+            comparison, comparison.cheapest[index]
+        ),
+        attributes_fn=lambda comparison, index: {
+            "price": _finite(comparison.minimum[index]),
+            "most_expensive_area": _area_label(comparison, comparison.dearest[index]),
+            "highest_price": _finite(comparison.maximum[index]),
+        },
+    ),
+    PriceAnalyzerAreaSensorEntityDescription(
+        key="area_spread",
+        name="Area spread",
+        icon="mdi:arrow-expand-vertical",
+        state_class=SensorStateClass.MEASUREMENT,
+        price=True,
+        value_fn=lambda comparison, index: _finite(comparison.spread[index]),
+        attributes_fn=lambda comparison, index: {
+            "mean": _finite(comparison.mean[index]),
+        },
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,  # noqa: ARG001 Unused function argument: `hass`
     entry: IntegrationBlueprintConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the sensor platform."""
+    if CONF_AREAS in entry.data:
+        _async_setup_areas(entry, async_add_entities)
+        return
     async_add_entities(
         PriceAnalyzerSensor(
             coordinator=entry.runtime_data.coordinator,
+            entry=entry,
             entity_description=entity_description,
         )
         for entity_description in ENTITY_DESCRIPTIONS
     )
+    if entry.options.get(CONF_DEBUG_SENSORS, DEFAULT_DEBUG_SENSORS):
+        async_add_entities(
+            PriceAnalyzerDebugSensor(
+                coordinator=entry.runtime_data.coordinator,
+                entry=entry,
+                entity_description=entity_description,
+            )
+            for entity_description in DEBUG_ENTITY_DESCRIPTIONS
+        )
+
+
+@callback
+def _async_setup_areas(
+    entry: AreaConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Add the sensors of an entry comparing several areas."""
+    coordinator = entry.runtime_data.coordinator
+    async_add_entities(
+        PriceAnalyzerAreaSensor(
+            coordinator=coordinator,
+            entry=entry,
+            entity_description=entity_description,
+        )
+        for entity_description in AREA_ENTITY_DESCRIPTIONS
+    )
+    async_add_entities(
+        PriceAnalyzerAreaPriceSensor(
+            coordinator=coordinator,
+            entry=entry,
+            entity_description=SensorEntityDescription(
+                key=source.entity_id,
+                name=f"{label} price",
+                icon="mdi:cash",
+                state_class=SensorStateClass.MEASUREMENT,
+            ),
+            area=area,
+        )
+        for area, (source, label) in enumerate(
+            zip(coordinator.sources, coordinator.areas, strict=True)
+        )
+    )
 
 
 class PriceAnalyzerSensor(IntegrationBlueprintEntity, SensorEntity):
     """priceanalyzer Sensor class."""
 
+    # The per-slot detail is rewritten every slot; keep it out of the recorder.
+    _unrecorded_attributes = frozenset(
+        {"raw_today", "raw_tomorrow", "cheapest_slots"},
+    )
+
     def __init__(
         self,
         coordinator: BlueprintDataUpdateCoordinator,
+        entry: IntegrationBlueprintConfigEntry,
         entity_description: SensorEntityDescription,
     ) -> None:
         """Initialize the sensor class."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, entry)
         self.entity_description = entity_description
 
-        self.nordpool = self.coordinator.data
+        # Attribute rows are keyed by the coordinator analysis and local date.
+        # New coordinator data changes the key, so hour ticks reuse the plan.
+        self._plan_key: tuple[Analysis, int] | None = None
+        # Today and tomorrow in the attribute format, built on first use.
+        self._days: tuple[Any, Any] | None = None
+        self.attribute_mode = entry.options.get(
+            CONF_ATTRIBUTE_MODE, DEFAULT_ATTRIBUTE_MODE
+        )
+        self.payload_budget = entry.options.get(
+            CONF_PAYLOAD_BUDGET, DEFAULT_PAYLOAD_BUDGET
+        )
+        self.payload_size = 0
+        # Whether the last size was over budget; the warning is logged once
+        # per crossing, not on every rebuild.
+        self._over_budget = False
+        self.profile = entry.runtime_data.profile
+        self.instrumentation = entry.runtime_data.instrumentation
 
     @property
-    def current_hour(self) -> list:
-        if self.today is not None:
-            now = datetime.now()
-            return self.today[now.hour]
-        return []
+    def computation(self) -> PriceComputation:
+        """Return the computation of the effective prices of the entry."""
+        return self.coordinator.computation.priced(self.profile.tariff)
 
     @property
-    def nordpool_today(self) -> list:
-        return self.nordpool_attributes["raw_today"]
+    def series(self) -> PriceSeries:
+        """Return the effective prices of the entry."""
+        return self.computation.series
 
     @property
-    def nordpool_tomorrow(self) -> list:
-        return self.nordpool_attributes["raw_tomorrow"]
+    def analysis(self) -> Analysis:
+        """Return the analysis of the effective prices."""
+        return self.computation.analysis
 
     @property
-    def today(self) -> list:
-        day = self.nordpool_today
-        return self.calculate_day(day)
+    def plan(self) -> array:
+        """Return the temperature offset per slot from the heating schedule."""
+        return self.plan_at(dt_util.now())
 
     @property
-    def tomorrow(self) -> list:
-        day = self.nordpool_tomorrow
-        return self.calculate_day(day)
+    def days(self) -> tuple[list, list]:
+        """Return today and tomorrow in the attribute format."""
+        return self.days_at(dt_util.now())
 
     @property
-    def nordpool_attributes(self) -> dict:
-        if self.nordpool.get("attributes") is not None:
-            return self.nordpool.get("attributes")
+    def current_hour(self) -> dict:
+        """Return the slot covering now, whatever the price resolution."""
+        return self.slot_state_at(dt_util.now())["current_hour"]
+
+    @property
+    def cheapest(self) -> dict:
+        """Return the cheapest window and slots from now, cached by the solver."""
+        return self.cheapest_at(dt_util.now())
+
+    def plan_at(self, now: datetime) -> array:
+        """Return the plan, dropping cached rows on new data or a new day."""
+        analysis = self.analysis
+        today = local_day(now)
+        key = self._plan_key
+        if key is None or key[0] is not analysis or key[1] != today:
+            self.instrumentation.count("plan_recompute")
+            self._days = None
+            self._plan_key = (analysis, today)
+        return self.computation.plan(self.profile.heating)
+
+    def days_at(self, now: datetime) -> tuple[Any, Any]:
+        """Return today and tomorrow in the attribute format as seen at `now`."""
+        plan = self.plan_at(now)
+        if self._days is not None:
+            self.instrumentation.count("days_hit")
+            return self._days
+        today = local_day(now)
+        shared = self.computation.attributes
+        key = (today, self.attribute_mode, self.profile.heating)
+        if key in shared:
+            self.instrumentation.count("days_shared")
+            self._days, size = shared[key]
         else:
-            return self.nordpool
+            self.instrumentation.count("days_miss")
+            with self.instrumentation.timed("build_days"):
+                self._days = build_days(self.series, plan, today, self.attribute_mode)
+                # Measured once per rebuild, not on every state write.
+                size = len(json_bytes(self._days))
+            shared[key] = (self._days, size)
+        self.check_payload_size(size)
+        return self._days
+
+    def check_payload_size(self, size: int) -> None:
+        """Record the size of the per-slot attributes; warn once it goes over budget."""
+        self.payload_size = size
+        self.instrumentation.gauge("payload_bytes", self.payload_size)
+        over_budget = bool(self.payload_budget) and size > self.payload_budget
+        if over_budget and not self._over_budget:
+            LOGGER.warning(
+                "%s publishes %d bytes of per-slot attributes, over the budget of"
+                " %d bytes; consider the compact or values attribute format",
+                self.entity_id,
+                self.payload_size,
+                self.payload_budget,
+            )
+        self._over_budget = over_budget
+
+    def slot_state_at(self, now: datetime) -> dict[str, Any]:
+        """
+        Return the attributes that change per slot as seen at `now`.
+
+        They only depend on the tariff and heating limits of the entry, so they
+        are built once per slot and limits and shared through the computation,
+        and again when the history summaries change within the slot.
+        """
+        index = self.series.index_at(now.timestamp())
+        history = self.coordinator.history
+        stamp = (
+            index,
+            local_day(now),
+            history.generation if history is not None else None,
+        )
+        shared = self.computation.attributes
+        key = ("slot", self.profile.heating)
+        cached = shared.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        state = {
+            "current_hour": self.slot_at(now),
+            **self.cheapest_at(now),
+            "history": self.history_at(now),
+            "rolling": self.rolling_at(now),
+        }
+        # Only the current slot is kept; the previous one is never asked again.
+        shared[key] = (stamp, state)
+        return state
+
+    def slot_at(self, now: datetime) -> dict:
+        """Return the slot covering `now` in the attribute format."""
+        index = self.series.index_at(now.timestamp())
+        if index is not None:
+            return self.calculate_slot(index, self.plan_at(now), local_day(now))
+        return {}
+
+    def history_at(self, now: datetime) -> dict | None:
+        """Compare the price at `now` with the stored days before today."""
+        history = self.coordinator.history
+        if history is None or not len(history):
+            return None
+        # History holds spot prices, so the spot price is compared.
+        series = self.coordinator.series
+        index = series.index_at(now.timestamp())
+        value = series.value(index) if index is not None else None
+        # Only summaries the coordinator cached in the executor are read, so a
+        # window not summarized yet shows None until it is.
+        midnight = dt_util.start_of_local_day(now).timestamp()
+        return {
+            f"{days}d": history.compare(
+                value, midnight - days * SECONDS_PER_DAY, midnight
+            )
+            for days in HISTORY_DAYS
+        }
+
+    def rolling_at(self, now: datetime) -> dict | None:
+        """Return the rolling statistics and where the price at `now` falls."""
+        rolling = self.coordinator.rolling
+        if not rolling.count:
+            return None
+        series = self.coordinator.series
+        index = series.index_at(now.timestamp())
+        value = series.value(index) if index is not None else None
+        threshold = rolling.quantile(CHEAP_SHARE)
+        variance = rolling.variance
+        return {
+            "days": len(rolling.window),
+            "mean": rolling.mean,
+            "stdev": math.sqrt(variance) if variance is not None else None,
+            "min": rolling.minimum,
+            "max": rolling.maximum,
+            "cheap_threshold": threshold,
+            "percentile": rolling.percentile(value) if value is not None else None,
+            "cheap": value <= threshold if value is not None else None,
+            "peaks": [
+                {
+                    "start": dt_util.as_local(
+                        dt_util.utc_from_timestamp(start)
+                    ).isoformat(),
+                    "value": peak,
+                }
+                for start, peak in rolling.peaks()
+            ],
+        }
+
+    def cheapest_at(self, now: datetime) -> dict:
+        """Return the cheapest window and slots from `now`."""
+        solver = self.computation.solver
+        timestamp = now.timestamp()
+        window = solver.cheapest_window(CHEAPEST_DURATION, timestamp)
+        slots = solver.cheapest_slots(CHEAPEST_DURATION, timestamp)
+        return {
+            "cheapest_window": window.as_dict(self.series) if window else None,
+            "cheapest_slots": slots.as_dict(self.series, slots=True) if slots else None,
+        }
 
     @property
     def extra_state_attributes(self) -> dict:
-        attributes = {
-            "current_hour": self.current_hour,
-            "raw_today": self.today,
-            "raw_tomorrow": self.tomorrow,
-        }
-        return attributes
+        """Return the plan of today and tomorrow and the current slot's state."""
+        # Capture now once, so every attribute describes the same moment.
+        now = dt_util.now()
+        today, tomorrow = self.days_at(now)
+        return {"raw_today": today, "raw_tomorrow": tomorrow, **self.slot_state_at(now)}
 
     @property
     def native_value(self) -> str | None:
-        """Return the native value of the sensor."""
+        """Return the temperature offset of the current slot."""
+        return str(self.current_hour.get("temp") or 0)
+
+    def calculate_slot(self, index: int, plan: array, today: int) -> dict:
+        """Return one slot of the plan in the attribute format."""
+        return slot_row(self.series, plan, index, today)
 
-        if self.current_hour:
-            return str(self.current_hour.get("temp") or 0)  # type: ignore
-        else:
-            return str(0)
 
-        nordpool_state = self.nordpool.state or ""
-        return nordpool_state
+class PriceAnalyzerDebugSensor(IntegrationBlueprintEntity, SensorEntity):
+    """Sensor exposing one instrumentation value of the entry."""
 
-    def calculate_correction_for_hour(self, time, get_reason=False) -> Any | None:
-        hour = self.get_hour(time)
+    entity_description: PriceAnalyzerDebugSensorEntityDescription
 
-        # TODO: Implement the temperature logic from the orginal repo.
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
 
-        if hour.get("value") < self.get_hour(time + 1).get("value"):  # type: ignore
-            return 1 if get_reason is False else "Billig strøm"
-        elif hour.get("value") > self.get_hour(time + 1).get("value"):  # type: ignore
-            return -1 if get_reason is False else "Dyr strøm"
-        return 0 if get_reason is False else "Vanlig strøm"
+    def __init__(
+        self,
+        coordinator: BlueprintDataUpdateCoordinator,
+        entry: IntegrationBlueprintConfigEntry,
+        entity_description: PriceAnalyzerDebugSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor class."""
+        super().__init__(coordinator, entry)
+        self.entity_description = entity_description
+        self._attr_unique_id = f"{entry.entry_id}_{entity_description.key}"
 
-    def calculate_day(self, raw) -> list:
-        calculated = []
-        time = 0
-        for hour in raw:
-            # Convert string date to datetime object
-            start_time = datetime.fromisoformat(hour["start"])
+    @property
+    def native_value(self) -> StateType:
+        """Return the instrumentation value."""
+        return self.entity_description.value_fn(self._entry.runtime_data)
 
-            # Get today's date
-            today = datetime.now().date()
 
-            # Check if the start date is today or tomorrow
-            is_tomorrow = start_time.date() != today
+class PriceAnalyzerAreaSensor(PriceAnalyzerAreaEntity, SensorEntity):
+    """Sensor of the current slot of an entry's area comparison."""
 
-            item = {
-                "start": hour.get("start"),
-                "end": hour.get("end"),
-                "temp": self.calculate_correction_for_hour(time),
-                "reason": self.calculate_correction_for_hour(time, True),
-                "value": hour.get("value"),
-                "price_next_hour": self.get_hour(time + 1).get("value"),  # type: ignore
-                "is_tomorrow": is_tomorrow,
-            }
+    entity_description: PriceAnalyzerAreaSensorEntityDescription
 
-            calculated.append(item)
-            time += 1
+    def __init__(
+        self,
+        coordinator: AreaDataUpdateCoordinator,
+        entry: AreaConfigEntry,
+        entity_description: PriceAnalyzerAreaSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor class."""
+        super().__init__(coordinator, entry)
+        self.entity_description = entity_description
+        self._attr_unique_id = f"{entry.entry_id}_{entity_description.key}"
 
-        return calculated
+    @property
+    def native_unit_of_measurement(self) -> str | None:
+        """Return the unit of the areas' prices for price values."""
+        return self.coordinator.unit if self.entity_description.price else None
 
-    def get_hour(self, hour):
-        if 0 <= hour < len(self.nordpool_today):
-            value = self.nordpool_today[hour]
-        else:
-            # Calculate the fallback index within nordpool_tomorrow
-            fallback_index = hour - len(self.nordpool_today)
-            # Check if fallback index is valid for nordpool_tomorrow
-            if 0 <= fallback_index < len(self.nordpool_tomorrow):
-                value = self.nordpool_tomorrow[fallback_index]
-            else:
-                value = None  # Or any other default behavior you want
-
-        return value
-
-        is_tomorrow = False
-        if is_tomorrow == False and (hour < len(self._someday(self._data_today))):
-            return self._someday(self._data_today)[hour]
-        elif (
-            is_tomorrow == False
-            and self.tomorrow_valid
-            and (hour - 24 < len(self._someday(self._data_tomorrow)))
-        ):
-            return self._someday(self._data_tomorrow)[hour - 24]
-        elif is_tomorrow and (hour < len(self._someday(self._data_tomorrow))):
-            return self._someday(self._data_tomorrow)[hour]
-        else:
+    @property
+    def native_value(self) -> StateType:
+        """Return the value of the current slot."""
+        comparison = self.coordinator.comparison
+        index = comparison.index_at(dt_util.now().timestamp())
+        if index is None:
             return None
+        return self.entity_description.value_fn(comparison, index)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the attributes of the current slot."""
+        comparison = self.coordinator.comparison
+        index = comparison.index_at(dt_util.now().timestamp())
+        if index is None:
+            return {}
+        return self.entity_description.attributes_fn(comparison, index)
+
+
+class PriceAnalyzerAreaPriceSensor(PriceAnalyzerAreaEntity, SensorEntity):
+    """Price of one area in the current slot, read from its row of the comparison."""
+
+    def __init__(
+        self,
+        coordinator: AreaDataUpdateCoordinator,
+        entry: AreaConfigEntry,
+        entity_description: SensorEntityDescription,
+        area: int,
+    ) -> None:
+        """Initialize the sensor class."""
+        super().__init__(coordinator, entry)
+        self.entity_description = entity_description
+        self.area = area
+        self._attr_unique_id = f"{entry.entry_id}_{entity_description.key}"
+
+    @property
+    def native_unit_of_measurement(self) -> str | None:
+        """Return the unit of the areas' prices."""
+        return self.coordinator.unit
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the price of the area in the current slot."""
+        comparison = self.coordinator.comparison
+        index = comparison.index_at(dt_util.now().timestamp())
+        return None if index is None else comparison.price(self.area, index)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return how the area compares with the others in the current slot."""
+        comparison = self.coordinator.comparison
+        index = comparison.index_at(dt_util.now().timestamp())
+        if index is None:
+            return {}
+        price = comparison.price(self.area, index)
+        rank = comparison.rank(self.area, index)
+        return {
+            "rank": None if rank == NO_AREA else rank + 1,
+            "cheapest": rank == 0,
+            "difference_to_cheapest": (
+                None if price is None else price - comparison.minimum[index]
+            ),
+        }
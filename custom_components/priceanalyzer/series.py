@@ -0,0 +1,227 @@
+"""Compact price series for priceanalyzer."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from itertools import pairwise
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+DEFAULT_RESOLUTION = 3600
+SECONDS_PER_DAY = 86400
+EPOCH_ORDINAL = 719163  # date(1970, 1, 1).toordinal()
+
+
+def local_day(moment: datetime) -> int:
+    """Return the day number since the epoch of a datetime's local date."""
+    return moment.toordinal() - EPOCH_ORDINAL
+
+
+def detect_resolution(starts: array, duration: int | None = None) -> int:
+    """
+    Return the slot length in seconds.
+
+    The start/end duration of a slot wins when it agrees with the spacing of
+    the starts; otherwise the smallest spacing is used, so hourly, 30 and
+    15 minute prices are all handled. Epoch spacing is constant across DST
+    changes, so 23 and 25 hour days need no special casing.
+    """
+    spacing = min(
+        (later - earlier for earlier, later in pairwise(starts) if later > earlier),
+        default=None,
+    )
+    if duration and duration > 0 and (spacing is None or spacing % duration == 0):
+        return duration
+    return spacing or DEFAULT_RESOLUTION
+
+
+class PriceSeries:
+    """
+    Array-backed series of price slots.
+
+    Slot starts are stored as epoch seconds, values as floats (NaN for a
+    missing price) and the UTC offset of each slot as seconds, so the
+    Nordpool attribute format can be rebuilt on demand. The local day number
+    of each slot is precomputed so date checks are integer comparisons.
+    """
+
+    __slots__ = (
+        "_iso_ends",
+        "_iso_starts",
+        "day_lengths",
+        "local_days",
+        "offsets",
+        "resolution",
+        "starts",
+        "values",
+    )
+
+    def __init__(  # noqa: PLR0913
+        self,
+        starts: array | None = None,
+        values: array | None = None,
+        offsets: array | None = None,
+        resolution: int = DEFAULT_RESOLUTION,
+        day_lengths: tuple[int, ...] = (),
+        iso_starts: list[str | None] | None = None,
+        iso_ends: list[str | None] | None = None,
+    ) -> None:
+        """Initialize the series."""
+        self.starts = starts if starts is not None else array("q")
+        self.values = values if values is not None else array("d")
+        self.offsets = offsets if offsets is not None else array("q")
+        self.resolution = resolution
+        self.day_lengths = day_lengths
+        self.local_days = array(
+            "l",
+            (
+                (start + offset) // SECONDS_PER_DAY
+                for start, offset in zip(self.starts, self.offsets, strict=True)
+            ),
+        )
+        # ISO labels, reused from the source or formatted once on demand.
+        self._iso_starts = iso_starts
+        self._iso_ends = iso_ends
+
+    @classmethod
+    def from_raw(cls, *days: Iterable[dict] | None) -> PriceSeries:
+        """Build a series from Nordpool raw_today/raw_tomorrow style lists."""
+        starts = array("q")
+        values = array("d")
+        offsets = array("q")
+        iso_starts = []
+        iso_ends = []
+        day_lengths = []
+        duration = None
+        for day in days:
+            count = 0
+            for slot in day or ():
+                iso_starts.append(slot["start"])
+                iso_ends.append(slot.get("end"))
+                start = datetime.fromisoformat(slot["start"])
+                timestamp = int(start.timestamp())
+                if duration is None and slot.get("end"):
+                    end = datetime.fromisoformat(slot["end"])
+                    duration = int(end.timestamp()) - timestamp
+                starts.append(timestamp)
+                offset = start.utcoffset()
+                offsets.append(int(offset.total_seconds()) if offset else 0)
+                value = slot.get("value")
+                values.append(math.nan if value is None else float(value))
+                count += 1
+            day_lengths.append(count)
+        return cls(
+            starts,
+            values,
+            offsets,
+            detect_resolution(starts, duration),
+            tuple(day_lengths),
+            iso_starts,
+            iso_ends,
+        )
+
+    def __len__(self) -> int:
+        """Return the number of slots."""
+        return len(self.starts)
+
+    def with_values(self, values: array) -> PriceSeries:
+        """Return a series of the same slots with other values."""
+        return PriceSeries(
+            self.starts,
+            values,
+            self.offsets,
+            self.resolution,
+            self.day_lengths,
+            self._iso_starts,
+            self._iso_ends,
+        )
+
+    def day_range(self, day: int) -> range:
+        """Return the slot indexes of one of the input days."""
+        if day >= len(self.day_lengths):
+            return range(len(self.starts), len(self.starts))
+        first = sum(self.day_lengths[:day])
+        return range(first, first + self.day_lengths[day])
+
+    def index_at(self, timestamp: float) -> int | None:
+        """Return the index of the slot covering an epoch timestamp."""
+        starts = self.starts
+        if not starts:
+            return None
+        index = int((timestamp - starts[0]) // self.resolution)
+        if (
+            0 <= index < len(starts)
+            and starts[index] <= timestamp < starts[index] + self.resolution
+        ):
+            return index
+        # Gaps or irregular data: fall back to a binary search.
+        index = bisect_right(starts, timestamp) - 1
+        if index >= 0 and timestamp < starts[index] + self.resolution:
+            return index
+        return None
+
+    def next_boundary(self, timestamp: float) -> int | None:
+        """Return the epoch second at which index_at() next changes, if ever."""
+        index = self.index_at(timestamp)
+        if index is not None:
+            return self.starts[index] + self.resolution
+        following = bisect_right(self.starts, timestamp)
+        return self.starts[following] if following < len(self.starts) else None
+
+    def value(self, index: int) -> float | None:
+        """Return the price of a slot, or None when out of range or missing."""
+        if 0 <= index < len(self.values):
+            value = self.values[index]
+            if not math.isnan(value):
+                return value
+        return None
+
+    def start(self, index: int) -> datetime:
+        """Return the start of a slot in the offset it was published with."""
+        offset = timezone(timedelta(seconds=self.offsets[index]))
+        return datetime.fromtimestamp(self.starts[index], offset)
+
+    def end(self, index: int) -> datetime:
+        """Return the end of a slot in the offset the next slot starts in."""
+        timestamp = self.starts[index] + self.resolution
+        if index + 1 < len(self.starts) and self.starts[index + 1] == timestamp:
+            index += 1
+        offset = timezone(timedelta(seconds=self.offsets[index]))
+        return datetime.fromtimestamp(timestamp, offset)
+
+    def iso_start(self, index: int) -> str:
+        """Return the start of a slot as an ISO string, formatted at most once."""
+        if self._iso_starts is None:
+            self._iso_starts = [None] * len(self.starts)
+        label = self._iso_starts[index]
+        if label is None:
+            label = self._iso_starts[index] = self.start(index).isoformat()
+        return label
+
+    def iso_end(self, index: int) -> str:
+        """Return the end of a slot as an ISO string, formatted at most once."""
+        if self._iso_ends is None:
+            self._iso_ends = [None] * len(self.starts)
+        label = self._iso_ends[index]
+        if label is None:
+            label = self._iso_ends[index] = self.end(index).isoformat()
+        return label
+
+    def as_attributes(self, indexes: Iterable[int] | None = None) -> list[dict]:
+        """Return slots in the Nordpool raw_today attribute format."""
+        if indexes is None:
+            indexes = range(len(self.starts))
+        return [self.slot_attributes(index) for index in indexes]
+
+    def slot_attributes(self, index: int) -> dict[str, Any]:
+        """Return one slot in the Nordpool attribute format."""
+        return {
+            "start": self.iso_start(index),
+            "end": self.iso_end(index),
+            "value": self.value(index),
+        }
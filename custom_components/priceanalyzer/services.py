@@ -0,0 +1,85 @@
+"""Services for priceanalyzer."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import CONF_AREAS, DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+SERVICE_FIND_CHEAPEST = "find_cheapest"
+
+ATTR_CONFIG_ENTRY = "config_entry"
+ATTR_DURATION = "duration"
+ATTR_DEADLINE = "deadline"
+ATTR_CONTIGUOUS = "contiguous"
+
+FIND_CHEAPEST_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY): cv.string,
+        vol.Required(ATTR_DURATION): cv.positive_time_period,
+        vol.Optional(ATTR_DEADLINE): cv.datetime,
+        vol.Optional(ATTR_CONTIGUOUS, default=True): cv.boolean,
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the priceanalyzer services."""
+
+    async def _async_find_cheapest(call: ServiceCall) -> ServiceResponse:
+        """Return the cheapest window or slots of a config entry."""
+        entry = hass.config_entries.async_get_entry(call.data[ATTR_CONFIG_ENTRY])
+        if (
+            entry is None
+            or entry.domain != DOMAIN
+            or entry.state is not ConfigEntryState.LOADED
+        ):
+            msg = f"{call.data[ATTR_CONFIG_ENTRY]} is not a loaded priceanalyzer entry"
+            raise ServiceValidationError(msg)
+        if CONF_AREAS in entry.data:
+            msg = f"{entry.title} compares areas; pick the entry of one area"
+            raise ServiceValidationError(msg)
+
+        # The entry's tariff applies, so windows are cheapest by what it pays.
+        computation = entry.runtime_data.coordinator.computation.priced(
+            entry.runtime_data.profile.tariff
+        )
+        deadline = call.data.get(ATTR_DEADLINE)
+        if deadline is not None and deadline.tzinfo is None:
+            deadline = deadline.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+        solve = (
+            computation.solver.cheapest_window
+            if call.data[ATTR_CONTIGUOUS]
+            else computation.solver.cheapest_slots
+        )
+        selection = solve(
+            call.data[ATTR_DURATION].total_seconds(),
+            dt_util.utcnow().timestamp(),
+            deadline.timestamp() if deadline is not None else None,
+        )
+        return {
+            "result": (
+                selection.as_dict(computation.series, slots=True)
+                if selection is not None
+                else None
+            )
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FIND_CHEAPEST,
+        _async_find_cheapest,
+        schema=FIND_CHEAPEST_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,147 @@
+"""Cheapest window and cheapest slots solver for priceanalyzer."""
+
+from __future__ import annotations
+
+import heapq
+import math
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .series import PriceSeries
+
+# Results kept per solver; a solver only lives as long as one price fingerprint.
+CACHE_SIZE = 64
+
+
+@dataclass(frozen=True, slots=True)
+class Selection:
+    """Slots picked by the solver and their average price."""
+
+    indexes: tuple[int, ...]
+    average: float
+
+    def as_dict(self, series: PriceSeries, *, slots: bool = False) -> dict[str, Any]:
+        """Return the selection in the attribute and service response format."""
+        result = {
+            "start": series.iso_start(self.indexes[0]),
+            "end": series.iso_end(self.indexes[-1]),
+            "average": self.average,
+        }
+        if slots:
+            result["slots"] = series.as_attributes(self.indexes)
+        return result
+
+
+class PriceSolver:
+    """
+    Find the cheapest slots in a price series.
+
+    A solver is built per price fingerprint, so its cache is keyed by the
+    request only and dropped together with the data it was computed from.
+    """
+
+    def __init__(self, series: PriceSeries, cache_size: int = CACHE_SIZE) -> None:
+        """Initialize the solver."""
+        self.series = series
+        self._cache: dict[tuple, Selection | None] = {}
+        self._cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._sums: list[float] | None = None
+        self._invalid: list[int] | None = None
+
+    def slot_range(self, after: float, deadline: float | None = None) -> range:
+        """Return the slots that start after `after` and end by `deadline`."""
+        starts = self.series.starts
+        first = self.series.index_at(after)
+        if first is None:
+            first = bisect_left(starts, after)
+        if deadline is None:
+            return range(first, len(starts))
+        stop = bisect_right(starts, deadline - self.series.resolution)
+        return range(first, max(first, stop))
+
+    def cheapest_window(
+        self, duration: int, after: float, deadline: float | None = None
+    ) -> Selection | None:
+        """Return the cheapest contiguous run of slots covering `duration` seconds."""
+        slots = self._slot_count(duration)
+        window = self.slot_range(after, deadline)
+        return self._cached(
+            ("window", slots, window.start, window.stop),
+            lambda: self._solve_window(slots, window),
+        )
+
+    def cheapest_slots(
+        self, duration: int, after: float, deadline: float | None = None
+    ) -> Selection | None:
+        """Return the cheapest, not necessarily contiguous, slots for `duration`."""
+        slots = self._slot_count(duration)
+        window = self.slot_range(after, deadline)
+        return self._cached(
+            ("slots", slots, window.start, window.stop),
+            lambda: self._solve_slots(slots, window),
+        )
+
+    def _slot_count(self, duration: int) -> int:
+        """Return the number of slots needed to cover a duration."""
+        return max(1, -(-int(duration) // self.series.resolution))
+
+    def _cached(self, key: tuple, solve: Any) -> Selection | None:
+        """Return a cached result, solving and storing it on a miss."""
+        try:
+            result = self._cache[key]
+        except KeyError:
+            self.misses += 1
+        else:
+            self.hits += 1
+            return result
+        if len(self._cache) >= self._cache_size:
+            # Evict the oldest entry; dicts keep insertion order.
+            del self._cache[next(iter(self._cache))]
+        result = self._cache[key] = solve()
+        return result
+
+    def _prefix_sums(self) -> tuple[list[float], list[int]]:
+        """Return prefix sums of prices and of missing prices, built once."""
+        if self._sums is None or self._invalid is None:
+            values = self.series.values  # noqa: PD011
+            self._sums = [
+                0.0,
+                *accumulate(0.0 if math.isnan(value) else value for value in values),
+            ]
+            self._invalid = [0, *accumulate(math.isnan(value) for value in values)]
+        return self._sums, self._invalid
+
+    def _solve_window(self, slots: int, window: range) -> Selection | None:
+        """Return the cheapest contiguous window with a prefix-sum sweep in O(n)."""
+        if slots > len(window):
+            return None
+        sums, invalid = self._prefix_sums()
+        best_start = None
+        best_total = math.inf
+        for start in range(window.start, window.stop - slots + 1):
+            stop = start + slots
+            if invalid[stop] != invalid[start]:
+                continue
+            total = sums[stop] - sums[start]
+            if total < best_total:
+                best_start, best_total = start, total
+        if best_start is None:
+            return None
+        return Selection(
+            tuple(range(best_start, best_start + slots)), best_total / slots
+        )
+
+    def _solve_slots(self, slots: int, window: range) -> Selection | None:
+        """Return the cheapest slots with a bounded heap in O(n log k)."""
+        values = self.series.values  # noqa: PD011
+        candidates = [index for index in window if not math.isnan(values[index])]
+        if slots > len(candidates):
+            return None
+        cheapest = heapq.nsmallest(slots, candidates, key=values.__getitem__)
+        indexes = tuple(sorted(cheapest))
+        return Selection(indexes, sum(values[index] for index in indexes) / slots)
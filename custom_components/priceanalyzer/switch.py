@@ -5,7 +5,12 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Any
 
 from homeassistant.components.switch import SwitchEntity, SwitchEntityDescription
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.restore_state import RestoreEntity
 
+from .const import SIGNAL_HEATER_ENABLED
 from .entity import IntegrationBlueprintEntity
 
 if TYPE_CHECKING:
@@ -18,8 +23,8 @@ if TYPE_CHECKING:
 ENTITY_DESCRIPTIONS = (
     SwitchEntityDescription(
         key="priceanalyzer",
-        name="Integration Switch",
-        icon="mdi:format-quote-close",
+        name="Water heater plan",
+        icon="mdi:water-boiler-auto",
     ),
 )
 
@@ -33,36 +38,64 @@ async def async_setup_entry(
     async_add_entities(
         IntegrationBlueprintSwitch(
             coordinator=entry.runtime_data.coordinator,
+            entry=entry,
             entity_description=entity_description,
         )
         for entity_description in ENTITY_DESCRIPTIONS
     )
 
 
-class IntegrationBlueprintSwitch(IntegrationBlueprintEntity, SwitchEntity):
-    """priceanalyzer switch class."""
+class IntegrationBlueprintSwitch(
+    IntegrationBlueprintEntity, SwitchEntity, RestoreEntity
+):
+    """
+    Enables the water heater plan of the entry.
+
+    The schedule is solved with the prices whether or not the plan is
+    enabled, so switching only rewrites the binary sensor's state.
+    """
 
     def __init__(
         self,
         coordinator: BlueprintDataUpdateCoordinator,
+        entry: IntegrationBlueprintConfigEntry,
         entity_description: SwitchEntityDescription,
     ) -> None:
         """Initialize the switch class."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, entry)
         self.entity_description = entity_description
 
+    async def async_added_to_hass(self) -> None:
+        """Restore whether the plan was enabled."""
+        await super().async_added_to_hass()
+        state = await self.async_get_last_state()
+        if state is not None and state.state in (STATE_ON, STATE_OFF):
+            self._entry.runtime_data.heater_enabled = state.state == STATE_ON
+            self._async_notify()
+
     @property
     def is_on(self) -> bool:
-        """Return true if the switch is on."""
-        return False
-        return self.coordinator.data.get("title", "") == "foo"
+        """Return whether the plan is enabled."""
+        return self._entry.runtime_data.heater_enabled
 
     async def async_turn_on(self, **_: Any) -> None:
-        """Turn on the switch."""
-        await self.coordinator.config_entry.runtime_data.client.async_set_title("bar")
-        await self.coordinator.async_request_refresh()
+        """Enable the plan."""
+        self._async_set_enabled(enabled=True)
 
     async def async_turn_off(self, **_: Any) -> None:
-        """Turn off the switch."""
-        await self.coordinator.config_entry.runtime_data.client.async_set_title("foo")
-        await self.coordinator.async_request_refresh()
+        """Disable the plan; the binary sensor then stays on."""
+        self._async_set_enabled(enabled=False)
+
+    @callback
+    def _async_set_enabled(self, *, enabled: bool) -> None:
+        """Store the plan state and write it with the binary sensor's."""
+        self._entry.runtime_data.heater_enabled = enabled
+        self.async_write_ha_state()
+        self._async_notify()
+
+    @callback
+    def _async_notify(self) -> None:
+        """Tell the binary sensor of the entry the plan state changed."""
+        async_dispatcher_send(
+            self.hass, SIGNAL_HEATER_ENABLED.format(self._entry.entry_id)
+        )
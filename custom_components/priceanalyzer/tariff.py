@@ -0,0 +1,172 @@
+"""Grid tariff and additional costs for priceanalyzer."""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from itertools import groupby
+from typing import TYPE_CHECKING, Any
+
+from .const import (
+    CONF_SURCHARGE,
+    CONF_TARIFF_DAY,
+    CONF_TARIFF_DAY_END,
+    CONF_TARIFF_DAY_START,
+    CONF_TARIFF_NIGHT,
+    CONF_VAT,
+    DEFAULT_TARIFF_DAY_END,
+    DEFAULT_TARIFF_DAY_START,
+    LOGGER,
+)
+from .series import EPOCH_ORDINAL, SECONDS_PER_DAY
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from .series import PriceSeries
+
+# Rows of the lookup table.
+WORKDAY = 0
+HOLIDAY = 1
+# date.weekday() of Saturday; weekends get the holiday row.
+SATURDAY = 5
+# Days of additions kept for reuse, for every tariff together.
+DAY_CACHE_SIZE = 32
+
+# The holidays package once load_holidays() ran, False when it is not installed.
+_holidays: Any = None
+
+
+def load_holidays() -> Any:
+    """
+    Return the holidays package, importing it on first use, or None.
+
+    It is installed with Home Assistant's workday integration and is not a
+    requirement of this one; without it only weekends get the night rate.
+    Importing it takes tens of milliseconds, so only the executor calls this.
+    """
+    global _holidays  # noqa: PLW0603
+    if _holidays is None:
+        try:
+            import holidays
+        except ImportError:
+            _holidays = False
+        else:
+            _holidays = holidays
+    return _holidays or None
+
+
+@dataclass(frozen=True, slots=True)
+class Tariff:
+    """Additions to the spot price that make up the cost per kWh."""
+
+    # Grid tariff per kWh in the day hours of workdays, and at night, on
+    # weekends and on public holidays.
+    day_rate: float = 0.0
+    night_rate: float = 0.0
+    # Local hours the day rate applies in, from start up to end.
+    day_start: int = DEFAULT_TARIFF_DAY_START
+    day_end: int = DEFAULT_TARIFF_DAY_END
+    # Fixed surcharge per kWh, such as the supplier's mark-up or energy tax.
+    surcharge: float = 0.0
+    # VAT in percent, charged on the spot price and every addition.
+    vat: float = 0.0
+    # Country whose public holidays get the night rate.
+    country: str | None = None
+
+    def __bool__(self) -> bool:
+        """Return whether the tariff changes any price."""
+        return bool(self.day_rate or self.night_rate or self.surcharge or self.vat)
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any], country: str | None) -> Tariff:
+        """Return the tariff of a config entry's options."""
+        return cls(
+            float(options.get(CONF_TARIFF_DAY, 0.0)),
+            float(options.get(CONF_TARIFF_NIGHT, 0.0)),
+            int(options.get(CONF_TARIFF_DAY_START, DEFAULT_TARIFF_DAY_START)),
+            int(options.get(CONF_TARIFF_DAY_END, DEFAULT_TARIFF_DAY_END)),
+            float(options.get(CONF_SURCHARGE, 0.0)),
+            float(options.get(CONF_VAT, 0.0)),
+            country,
+        )
+
+    def apply(self, series: PriceSeries) -> PriceSeries:
+        """
+        Return the series with the effective price of every slot.
+
+        The spot price is scaled by the VAT and the addition of its slot of
+        the day is looked up in the day's row of the table; slots without a
+        price stay NaN. Additions are cached per local day.
+        """
+        factor = 1 + self.vat / 100
+        resolution = series.resolution
+        values = array("d")
+        indexes = range(len(series))
+        for day, group in groupby(indexes, series.local_days.__getitem__):
+            slots = list(group)
+            additions = _day_additions(
+                self,
+                day,
+                resolution,
+                tuple(
+                    (series.starts[index] + series.offsets[index])
+                    % SECONDS_PER_DAY
+                    // resolution
+                    for index in slots
+                ),
+            )
+            values.extend(
+                series.values[index] * factor + addition  # noqa: PD011
+                for index, addition in zip(slots, additions, strict=True)
+            )
+        return series.with_values(values)
+
+
+@lru_cache(maxsize=DAY_CACHE_SIZE)
+def _day_additions(
+    tariff: Tariff, day: int, resolution: int, slots: tuple[int, ...]
+) -> array:
+    """Return the additions of the slots of one local day."""
+    row = _table(tariff, resolution)[HOLIDAY if _is_holiday(tariff, day) else WORKDAY]
+    return array("d", (row[slot] for slot in slots))
+
+
+@lru_cache
+def _table(tariff: Tariff, resolution: int) -> tuple[array, array]:
+    """Return the additions by slot of the day on workdays and on holidays."""
+    factor = 1 + tariff.vat / 100
+    workday = array("d")
+    holiday = array("d")
+    for slot in range(-(-SECONDS_PER_DAY // resolution)):
+        hour = slot * resolution // 3600
+        day = tariff.day_start <= hour < tariff.day_end
+        rate = tariff.day_rate if day else tariff.night_rate
+        workday.append((rate + tariff.surcharge) * factor)
+        holiday.append((tariff.night_rate + tariff.surcharge) * factor)
+    return workday, holiday
+
+
+def _is_holiday(tariff: Tariff, day: int) -> bool:
+    """Return whether a local day gets the holiday row."""
+    moment = date.fromordinal(day + EPOCH_ORDINAL)
+    if moment.weekday() >= SATURDAY:
+        return True
+    return tariff.country is not None and moment in _public_holidays(
+        tariff.country, moment.year
+    )
+
+
+@lru_cache
+def _public_holidays(country: str, year: int) -> frozenset[date]:
+    """Return the public holidays of a country in a year."""
+    holidays = load_holidays()
+    if holidays is None:
+        return frozenset()
+    try:
+        return frozenset(holidays.country_holidays(country, years=year))
+    except NotImplementedError:
+        LOGGER.warning("No public holidays are known for %s", country)
+        return frozenset()
@@ -0,0 +1,128 @@
+"""Tests for the history comparison of priceanalyzer entities."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.config_entries import ConfigEntries, ConfigEntry
+from homeassistant.const import CONF_ENTITY_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import (
+    area_registry,
+    category_registry,
+    device_registry,
+    entity_registry,
+    floor_registry,
+    issue_registry,
+    label_registry,
+)
+from homeassistant.util import dt as dt_util
+
+from benchmarks.fixtures import TIME_ZONE, nordpool_attributes
+from custom_components.priceanalyzer.const import CONF_PAYLOAD_BUDGET, DOMAIN
+from custom_components.priceanalyzer.history import PriceHistory
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+RESOLUTION = 900
+
+
+async def _async_core(config: Path) -> HomeAssistant:
+    """Return a Home Assistant core with its registries and config entries."""
+    # Imported here: the loader needs homeassistant.core imported first.
+    from homeassistant import loader
+
+    hass = HomeAssistant(str(config))
+    hass.config.skip_pip = True
+    await hass.config.async_set_time_zone(str(TIME_ZONE))
+    loader.async_setup(hass)
+    await asyncio.gather(
+        *(
+            registry.async_load(hass)
+            for registry in (
+                area_registry,
+                category_registry,
+                device_registry,
+                entity_registry,
+                floor_registry,
+                issue_registry,
+                label_registry,
+            )
+        )
+    )
+    hass.config_entries = ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    return hass
+
+
+def _store_history(config: Path, until: datetime, days: int) -> None:
+    """Store `days` days of prices of sensor.nordpool ending at `until`."""
+    history = PriceHistory(
+        config / ".storage" / DOMAIN / f"nordpool_{RESOLUTION}.bin", RESOLUTION
+    )
+    history.publish(history.open())
+    stop = int(until.timestamp())
+    starts = range(stop - days * 86400, stop, RESOLUTION)
+    history.append(starts, [0.1 + (start // RESOLUTION) % 96 / 100 for start in starts])
+
+
+def _history_attribute(hass: HomeAssistant) -> Any:
+    """Return the history attribute of the entity publishing it."""
+    (history,) = (
+        state.attributes["history"]
+        for state in hass.states.async_all("sensor")
+        if "history" in state.attributes
+    )
+    return history
+
+
+async def _async_tick_into_day_without_prices(
+    config: Path, monkeypatch: pytest.MonkeyPatch
+) -> tuple[Any, Any]:
+    """Tick into a day no refresh summarized; return both history attributes."""
+    today = dt_util.start_of_local_day(datetime.now(TIME_ZONE))
+    _store_history(config, today, 400)
+    hass = await _async_core(config)
+    await hass.async_start()
+    hass.states.async_set(
+        "sensor.nordpool", "1.0", nordpool_attributes(today.date(), RESOLUTION)
+    )
+    entry = ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title="test",
+        data={CONF_ENTITY_ID: "sensor.nordpool"},
+        source="user",
+        options={CONF_PAYLOAD_BUDGET: 0},
+        unique_id=None,
+    )
+    await hass.config_entries.async_add(entry)
+    await hass.async_block_till_done()
+    # The source shows today and tomorrow; the day after has no prices, so
+    # no refresh summarizes its history windows before its first slot tick.
+    later = dt_util.start_of_local_day(today.date() + timedelta(days=2))
+    monkeypatch.setattr(dt_util, "now", lambda time_zone=None: later)  # noqa: ARG005
+    entry.runtime_data.coordinator._async_slot_tick(later)  # noqa: SLF001
+    first = _history_attribute(hass)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    second = _history_attribute(hass)
+    await hass.async_stop()
+    return first, second
+
+
+def test_new_day_shows_history_once_summarized(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The update after summarizing a new day's windows shows the comparison."""
+    first, second = asyncio.run(
+        _async_tick_into_day_without_prices(tmp_path, monkeypatch)
+    )
+    assert first == {"30d": None, "365d": None}
+    assert second["30d"]["slots"] == 30 * 86400 // RESOLUTION
+    assert second["365d"]["slots"] == 365 * 86400 // RESOLUTION